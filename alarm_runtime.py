@@ -0,0 +1,119 @@
+import heapq
+import time
+from collections import deque
+
+# Отложить сигнал по умолчанию на столько игровых минут
+DEFAULT_SNOOZE_MINUTES = 10
+
+
+class AlarmRuntime:
+    """Состояние срабатывания будильников по их стабильным id.
+
+    Несколько будильников могут звонить одновременно; если задан предел
+    max_firing, остальные ждут в очереди. Очередь не хранит повторов одного
+    id, поэтому ее размер ограничен числом будильников и сработавший
+    будильник не теряется. Все переходы пишутся в журнал ограниченного размера.
+    """
+
+    def __init__(self, max_firing=None, log_size=256, clock=time.time):
+        self.max_firing = max_firing  # None - без ограничения
+        self.clock = clock            # источник времени журнала (секунды эпохи)
+        self.firing = {}          # id -> абсолютная игровая минута начала сигнала
+        self.queue = deque()      # id, ожидающие своей очереди
+        self.queued = set()
+        self.snoozes = {}         # профиль -> куча (абсолютная игровая минута профиля, id)
+        self.snoozed = {}         # id -> абсолютная игровая минута повтора
+        self.events = deque(maxlen=log_size)
+
+    def log(self, event, alarm_id, game_minute):
+        """Записывает переход в журнал"""
+        self.events.append({
+            'event': event,
+            'id': alarm_id,
+            'game_minute': game_minute,
+            'time': self.clock(),
+        })
+
+    def can_fire(self):
+        """Проверяет, есть ли место для еще одного звонящего будильника"""
+        return self.max_firing is None or len(self.firing) < self.max_firing
+
+    def trigger(self, alarm_ids, game_minute):
+        """Запускает будильники; возвращает id тех, что начали звонить сразу"""
+        started = []
+        for alarm_id in alarm_ids:
+            if alarm_id in self.firing or alarm_id in self.queued:
+                continue  # уже звонит или ждет
+            self.snoozed.pop(alarm_id, None)
+            if self.can_fire():
+                self.firing[alarm_id] = game_minute
+                self.log('fire', alarm_id, game_minute)
+                started.append(alarm_id)
+            else:
+                self.queue.append(alarm_id)
+                self.queued.add(alarm_id)
+                self.log('queue', alarm_id, game_minute)
+        return started
+
+    def promote(self, game_minute):
+        """Запускает будильники из очереди на освободившиеся места"""
+        started = []
+        while self.queue and self.can_fire():
+            alarm_id = self.queue.popleft()
+            self.queued.discard(alarm_id)
+            self.firing[alarm_id] = game_minute
+            self.log('fire', alarm_id, game_minute)
+            started.append(alarm_id)
+        return started
+
+    def stop(self, alarm_id, game_minute):
+        """Останавливает будильник (или убирает из очереди); возвращает id запущенных из очереди"""
+        if alarm_id in self.queued:
+            self.queued.discard(alarm_id)
+            self.queue.remove(alarm_id)
+            self.log('dequeue', alarm_id, game_minute)
+            return []
+        if self.firing.pop(alarm_id, None) is None:
+            return []
+        self.log('stop', alarm_id, game_minute)
+        return self.promote(game_minute)
+
+    def snooze(self, alarm_id, game_minute, minutes=DEFAULT_SNOOZE_MINUTES, profile=None):
+        """Откладывает сигнал на заданное число игровых минут профиля будильника"""
+        promoted = self.stop(alarm_id, game_minute)
+        due = game_minute + minutes
+        self.snoozed[alarm_id] = due
+        # У каждого профиля своя шкала игровых минут - и своя куча
+        heapq.heappush(self.snoozes.setdefault(profile, []), (due, alarm_id))
+        self.log('snooze', alarm_id, game_minute)
+        return promoted
+
+    def due_snoozes(self, game_minute, profile=None):
+        """Возвращает id отложенных будильников профиля, время повтора которых наступило"""
+        due = []
+        snoozes = self.snoozes.get(profile, [])
+        while snoozes and snoozes[0][0] <= game_minute:
+            minute, alarm_id = heapq.heappop(snoozes)
+            # Запись могла устареть (будильник снова отложен или уже сработал)
+            if self.snoozed.get(alarm_id) == minute:
+                del self.snoozed[alarm_id]
+                due.append(alarm_id)
+        return due
+
+    def forget(self, alarm_id, game_minute):
+        """Убирает удаленный или выключенный будильник отовсюду"""
+        self.snoozed.pop(alarm_id, None)
+        return self.stop(alarm_id, game_minute)
+
+    def is_firing(self, alarm_id):
+        """Проверяет, звонит ли будильник"""
+        return alarm_id in self.firing
+
+    def get_state(self):
+        """Возвращает снимок состояния для диагностики"""
+        return {
+            'firing': list(self.firing),
+            'queued': list(self.queue),
+            'snoozed': dict(self.snoozed),
+            'events': list(self.events),
+        }
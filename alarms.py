@@ -0,0 +1,340 @@
+import heapq
+import uuid
+
+from game_time import MINUTES_PER_DAY
+from rules import rule_minutes, describe_rule
+
+
+_MISSING = object()
+
+# Сколько пропущенных игровых минут догоняется (позднее пробуждение, скачок часов вперед)
+CATCH_UP_MINUTES = 15
+
+# Шаг назад до стольких игровых минут - пересинхронизация часов, а не новые сутки
+BACKWARD_STEP_MINUTES = 60
+
+
+def parse_alarm_time(time_str):
+    """Преобразует строку "HH:MM" в номер игровой минуты суток (0-1439)"""
+    hour, minute = time_str.split(':')
+    hour, minute = int(hour), int(minute)
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"Некорректное время будильника: {time_str}")
+    return hour * 60 + minute
+
+
+def format_game_minute(minute_of_day):
+    """Преобразует номер игровой минуты суток в строку "HH:MM" """
+    return f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+
+
+def new_alarm_id():
+    """Создает стабильный идентификатор будильника"""
+    return uuid.uuid4().hex[:12]
+
+
+def ensure_alarm_ids(alarms):
+    """Назначает идентификаторы будильникам без них; возвращает True, если что-то изменилось"""
+    changed = False
+    seen = set()
+    for alarm in alarms:
+        if not alarm.get('id') or alarm['id'] in seen:
+            alarm['id'] = new_alarm_id()
+            changed = True
+        seen.add(alarm['id'])
+    return changed
+
+
+# Строки "HH:MM" всех минут суток и обратная таблица
+_TIMES = tuple(format_game_minute(minute) for minute in range(MINUTES_PER_DAY))
+_MINUTES = {time_str: minute for minute, time_str in enumerate(_TIMES)}
+
+
+class AlarmRecord:
+    """Будильник с фиксированным набором полей (__slots__).
+
+    Время хранится номером игровой минуты суток (minute), строка "HH:MM"
+    получается только при выводе и записи в JSON. Доступ по ключам
+    (alarm['time'], alarm.get('rule')) работает как у словаря. Неизвестные
+    ключи, значения null и нестандартная запись времени хранятся в extra,
+    поэтому to_dict(from_dict(d)) == d.
+    """
+
+    __slots__ = ('id', 'minute', 'name', 'enabled', 'rule', 'sound', 'volume', 'extra')
+    KEYS = ('id', 'name', 'enabled', 'rule', 'sound', 'volume')  # поля-слоты (None - поля нет)
+
+    def __init__(self, id=None, minute=None, name=None, enabled=None, rule=None, sound=None, volume=None):
+        self.id = id
+        self.minute = minute
+        self.name = name
+        self.enabled = enabled
+        self.rule = rule
+        self.sound = sound
+        self.volume = volume
+        self.extra = None  # прочие ключи JSON
+
+    @classmethod
+    def from_dict(cls, data):
+        """Создает будильник из словаря формата alarms.json"""
+        get = data.get
+        record = cls(get('id'), None, get('name'), get('enabled'), get('rule'), get('sound'), get('volume'))
+        present = sum(1 for key in cls.KEYS if get(key) is not None)
+        minute = _MINUTES.get(get('time'))
+        if minute is not None:
+            record.minute = minute
+            present += 1
+        if present != len(data):
+            # Редкий случай: нестандартное время, null или неизвестные ключи
+            for key, value in data.items():
+                if value is None or key not in cls.KEYS and (key != 'time' or minute is None):
+                    record[key] = value
+        return record
+
+    def to_dict(self):
+        """Возвращает словарь формата alarms.json"""
+        data = {}
+        if self.id is not None:
+            data['id'] = self.id
+        if self.minute is not None:
+            data['time'] = _TIMES[self.minute]
+        for key in self.KEYS[1:]:
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def copy(self):
+        """Возвращает независимую копию"""
+        return AlarmRecord.from_dict(self.to_dict())
+
+    def keys(self):
+        keys = [key for key in ('id',) if self.id is not None]
+        if self.minute is not None or (self.extra and 'time' in self.extra):
+            keys.append('time')
+        keys += [key for key in self.KEYS[1:] if getattr(self, key) is not None]
+        if self.extra:
+            keys += [key for key in self.extra if key not in keys]
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self.KEYS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif key == 'time' and self.minute is not None and not (self.extra and 'time' in self.extra):
+            return _TIMES[self.minute]
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __setitem__(self, key, value):
+        self.pop(key, None)
+        if key == 'time':
+            try:
+                self.minute = parse_alarm_time(value)
+                if format_game_minute(self.minute) == value:
+                    return
+            except (AttributeError, TypeError, ValueError):
+                self.minute = None
+        elif key in self.KEYS and value is not None:
+            setattr(self, key, value)
+            return
+        # Нестандартное значение сохраняется как есть
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def pop(self, key, *default):
+        """Удаляет ключ и возвращает его значение"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        if key == 'time':
+            self.minute = None
+        elif key in self.KEYS:
+            setattr(self, key, None)
+        if self.extra:
+            self.extra.pop(key, None)
+        return value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __repr__(self):
+        return f"AlarmRecord({self.to_dict()!r})"
+
+
+def alarm_minutes(alarm):
+    """Возвращает минуты суток срабатывания: по правилу ('rule') или по времени"""
+    if isinstance(alarm, AlarmRecord):
+        if alarm.rule:
+            return rule_minutes(alarm.rule)
+        if alarm.minute is None:
+            raise ValueError(f"Некорректное время будильника: {alarm.get('time')}")
+        return (alarm.minute,)
+    rule = alarm.get('rule')
+    if rule:
+        return rule_minutes(rule)
+    return (parse_alarm_time(alarm['time']),)
+
+
+def alarm_label(alarm):
+    """Возвращает подпись будильника для виджетов (у правила - само правило)"""
+    return f"{alarm.get('rule') or alarm['time']} - {alarm['name']}"
+
+
+def alarm_summary(alarm):
+    """Возвращает время или краткое описание правила для списка будильников"""
+    rule = alarm.get('rule')
+    if rule:
+        try:
+            return describe_rule(rule)
+        except ValueError:
+            return rule
+    return alarm['time']
+
+
+class AlarmIndex:
+    """Индекс включенных будильников по игровой минуте суток.
+
+    Проверка на тике - один поиск в словаре, а ближайший будильник
+    берется с вершины кучи предстоящих срабатываний. Будильник с правилом
+    стоит во всех минутах своей скомпилированной таблицы.
+    """
+
+    def __init__(self, alarms=()):
+        self.by_minute = {}     # минута суток -> список будильников
+        self.by_id = {}         # id -> будильник (только включенные)
+        self.heap = []          # (абсолютная игровая минута, минута суток)
+        self.in_heap = set()    # минуты суток, уже стоящие в куче
+        self.cursor = 0         # текущая абсолютная игровая минута
+        self.started = False    # курсор еще ни разу не ставился на текущее время
+        self.rebuild(alarms)
+
+    def rebuild(self, alarms):
+        """Полностью перестраивает индекс (используется при загрузке)"""
+        self.by_minute = {}
+        self.by_id = {}
+        self.heap = []
+        self.in_heap = set()
+        for alarm in alarms:
+            try:
+                self.add(alarm)
+            except (KeyError, ValueError) as e:
+                print(f"Ошибка индексации будильника: {e}")
+
+    def _schedule(self, minute):
+        """Ставит минуту суток в кучу на ближайшее будущее срабатывание"""
+        if minute in self.in_heap:
+            return
+        fire_at = self.cursor - self.cursor % MINUTES_PER_DAY + minute
+        if fire_at <= self.cursor:
+            fire_at += MINUTES_PER_DAY
+        heapq.heappush(self.heap, (fire_at, minute))
+        self.in_heap.add(minute)
+
+    def add(self, alarm):
+        """Добавляет будильник в индекс (выключенные не индексируются)"""
+        if not alarm.get('enabled'):
+            return
+        minutes = alarm_minutes(alarm)
+        for minute in minutes:
+            self.by_minute.setdefault(minute, []).append(alarm)
+            self._schedule(minute)
+        if 'id' in alarm:
+            self.by_id[alarm['id']] = alarm
+
+    def remove(self, alarm):
+        """Удаляет будильник из индекса (запись в куче удаляется лениво)"""
+        try:
+            minutes = alarm_minutes(alarm)
+        except (KeyError, ValueError):
+            return  # Некорректный будильник в индекс не попадал
+        for minute in minutes:
+            bucket = self.by_minute.get(minute)
+            if not bucket:
+                continue
+            for i, indexed in enumerate(bucket):
+                if indexed is alarm:
+                    bucket.pop(i)
+                    self.by_id.pop(alarm.get('id'), None)
+                    break
+            if not bucket:
+                del self.by_minute[minute]
+
+    def update(self, alarm):
+        """Обновляет будильник после изменения (например, включения/выключения)"""
+        self.remove(alarm)
+        self.add(alarm)
+
+    def advance(self, minute_of_day):
+        """Сдвигает курсор на текущую игровую минуту и возвращает будильники, время которых наступило.
+
+        Пропущенные минуты (позднее пробуждение, скачок часов вперед) догоняются,
+        но не больше CATCH_UP_MINUTES последних. Шаг назад до BACKWARD_STEP_MINUTES -
+        пересинхронизация: курсор остается на месте, и будильники не повторяются.
+        """
+        step = (minute_of_day - self.cursor) % MINUTES_PER_DAY
+        if not self.started:
+            # Первый вызов: только текущая минута
+            self.started = True
+            self.cursor += step
+            step = 1
+        elif step == 0 or step > MINUTES_PER_DAY - BACKWARD_STEP_MINUTES:
+            return ()
+        else:
+            self.cursor += step
+
+        # Прошедшие срабатывания переносим на следующие сутки
+        while self.heap and self.heap[0][0] <= self.cursor:
+            _, minute = heapq.heappop(self.heap)
+            self.in_heap.discard(minute)
+            if minute in self.by_minute:
+                self._schedule(minute)
+
+        if step == 1:
+            return self.by_minute.get(minute_of_day, ())
+        # Догоняем пропущенные минуты по порядку (будильник с правилом - один раз)
+        due = {}
+        for missed in range(minute_of_day - min(step, CATCH_UP_MINUTES) + 1, minute_of_day + 1):
+            for alarm in self.by_minute.get(missed % MINUTES_PER_DAY, ()):
+                due.setdefault(id(alarm), alarm)
+        return list(due.values())
+
+    def next_alarm(self):
+        """Возвращает (минута суток, будильники) ближайшего срабатывания или None"""
+        while self.heap:
+            _, minute = self.heap[0]
+            if minute in self.by_minute:
+                return minute, self.by_minute[minute]
+            # Устаревшая запись - все будильники этой минуты удалены
+            heapq.heappop(self.heap)
+            self.in_heap.discard(minute)
+        return None
@@ -0,0 +1,143 @@
+"""Атлас иконок: все иконки заранее уменьшены и склеены в один PNG.
+
+Запуск `python assets.py` пересобирает атлас рядом с исходными PNG и
+печатает сравнение времени загрузки атласа и отдельных файлов.
+"""
+import hashlib
+import json
+import os
+import time
+
+from PIL import Image, PngImagePlugin
+
+# (атрибут GameClock, исходный файл, размер стороны в пикселях)
+ICON_SPECS = (
+    ('day_icon', 'day.png', 40),
+    ('night_icon', 'night.png', 40),
+    ('settings_icon', 'setting.png', 20),
+    ('setting_black_icon', 'setting_black.png', 20),
+    ('signal_on_icon', 'signal_on.png', 20),
+    ('signal_off_icon', 'signal_off.png', 20),
+)
+
+ATLAS_FILENAME = 'icons_atlas.png'
+ATLAS_VERSION = 2
+MANIFEST_KEY = 'rf4-atlas'
+
+
+def sources_key(resolve_path):
+    """Вычисляет ключ атласа по размеру и времени изменения исходных файлов и целевым размерам"""
+    # Только stat, без чтения файлов: проверка ключа идет при каждом запуске
+    digest = hashlib.sha1(f"v{ATLAS_VERSION}".encode())
+    for name, filename, size in ICON_SPECS:
+        stat = os.stat(resolve_path(filename))
+        digest.update(f"{name}:{size}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def load_icon_files(resolve_path):
+    """Загружает и уменьшает каждую иконку по отдельности (исходный путь)"""
+    images = {}
+    for name, filename, size in ICON_SPECS:
+        image = Image.open(resolve_path(filename))
+        images[name] = image.resize((size, size), Image.Resampling.LANCZOS)
+    return images
+
+
+def build_atlas(resolve_path, atlas_path):
+    """Собирает атлас из исходных файлов и атомарно записывает его на диск"""
+    images = load_icon_files(resolve_path)
+    width = sum(size for _, _, size in ICON_SPECS)
+    height = max(size for _, _, size in ICON_SPECS)
+    atlas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+
+    boxes = {}
+    x = 0
+    for name, _, size in ICON_SPECS:
+        atlas.paste(images[name].convert('RGBA'), (x, 0))
+        boxes[name] = (x, 0, x + size, size)
+        x += size
+
+    # Манифест хранится в текстовом блоке PNG - атлас читается одним файлом
+    info = PngImagePlugin.PngInfo()
+    info.add_text(MANIFEST_KEY, json.dumps({
+        'key': sources_key(resolve_path),
+        'boxes': boxes,
+    }))
+    tmp_path = atlas_path + '.tmp'
+    atlas.save(tmp_path, format='PNG', pnginfo=info)
+    os.replace(tmp_path, atlas_path)
+    return images
+
+
+def load_atlas(atlas_path, expected_key=None):
+    """Загружает иконки из атласа; возвращает None, если атлас отсутствует или устарел"""
+    if not os.path.exists(atlas_path):
+        return None
+    try:
+        atlas = Image.open(atlas_path)
+        atlas.load()
+        manifest = json.loads(atlas.text[MANIFEST_KEY])
+        if expected_key is not None and manifest['key'] != expected_key:
+            return None
+        return {
+            name: atlas.crop(tuple(manifest['boxes'][name]))
+            for name, _, _ in ICON_SPECS
+        }
+    except Exception as e:
+        print(f"Ошибка загрузки атласа иконок: {e}")
+        return None
+
+
+def load_icon_images(resolve_path, cache_path, verify=True):
+    """Загружает иконки: атлас из ресурсов, затем кэш, затем отдельные файлы.
+
+    Возвращает (словарь изображений, источник). verify=False пропускает
+    проверку ключа - для сборки EXE, где атлас собран вместе с ресурсами.
+    """
+    expected_key = sources_key(resolve_path) if verify else None
+
+    for mode, path in (('atlas', resolve_path(ATLAS_FILENAME)), ('cache', cache_path)):
+        images = load_atlas(path, expected_key)
+        if images is not None:
+            return images, mode
+
+    # Атласа нет или он устарел - загружаем файлы и обновляем кэш
+    try:
+        return build_atlas(resolve_path, cache_path), 'files'
+    except OSError as e:
+        print(f"Ошибка записи кэша иконок: {e}")
+        return load_icon_files(resolve_path), 'files'
+
+
+def timing_report(resolve_path, atlas_path, repeats=20):
+    """Сравнивает среднее время загрузки атласа и отдельных файлов (мс)"""
+    def measure(load):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            load()
+        return (time.perf_counter() - start) * 1000 / repeats
+
+    return {
+        'files_ms': measure(lambda: load_icon_files(resolve_path)),
+        'atlas_ms': measure(lambda: load_atlas(atlas_path)),
+        'atlas_verified_ms': measure(lambda: load_atlas(atlas_path, sources_key(resolve_path))),
+    }
+
+
+def main():
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    resolve_path = lambda filename: os.path.join(base_path, filename)
+    atlas_path = resolve_path(ATLAS_FILENAME)
+
+    build_atlas(resolve_path, atlas_path)
+    print(f"Атлас собран: {atlas_path}")
+
+    report = timing_report(resolve_path, atlas_path)
+    print(f"Отдельные файлы:        {report['files_ms']:.2f} мс")
+    print(f"Атлас:                  {report['atlas_ms']:.2f} мс")
+    print(f"Атлас с проверкой ключа: {report['atlas_verified_ms']:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
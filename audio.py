@@ -0,0 +1,153 @@
+import threading
+import time
+
+
+class AudioBackend:
+    """Ленивая инициализация звука: pygame импортируется в фоновом потоке.
+
+    Импорт pygame и pygame.mixer.init() заметно замедляют запуск, поэтому
+    они выполняются параллельно с отрисовкой первого кадра.
+    """
+
+    def __init__(self):
+        self.pygame = None
+        self.error = None
+        self.init_ms = None
+        self.ready = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Запускает инициализацию в фоне (повторные вызовы игнорируются)"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._init, name="audio-init", daemon=True)
+            self.thread.start()
+
+    def _init(self):
+        """Импортирует pygame и инициализирует микшер"""
+        start = time.perf_counter()
+        try:
+            import pygame
+            pygame.mixer.init()
+            self.pygame = pygame
+        except Exception as e:
+            self.error = e
+            print(f"Ошибка инициализации звука: {e}")
+        finally:
+            self.init_ms = (time.perf_counter() - start) * 1000
+            self.ready.set()
+
+    def get_mixer(self, timeout=5.0):
+        """Возвращает pygame.mixer, дожидаясь инициализации не дольше timeout секунд"""
+        self.start()
+        self.ready.wait(timeout)
+        if self.pygame is None:
+            return None
+        return self.pygame.mixer
+
+
+class SoundBank:
+    """Звуки будильников, декодированные в память один раз.
+
+    Каждый сигнал играет на своем канале микшера, поэтому несколько
+    будильников звучат одновременно и останавливаются по отдельности.
+    Задержка до первого сэмпла - время от срабатывания до запуска канала
+    плюс длительность буфера микшера (раньше сэмпл на выход не попадет).
+    """
+
+    DEFAULT_SOUND = "signal.mp3"
+    CHANNELS = 16
+
+    def __init__(self, audio, resolve_path):
+        self.audio = audio
+        self.resolve_path = resolve_path  # имя файла -> путь
+        self.lock = threading.Lock()
+        self.sounds = {}      # имя файла -> pygame.mixer.Sound (None - не удалось декодировать)
+        self.channels = {}    # ключ (id будильника) -> pygame.mixer.Channel
+        self.buffer_ms = None
+        self.decode_ms = {}
+        self.latency = {'count': 0, 'last_ms': 0.0, 'max_ms': 0.0, 'total_ms': 0.0}
+
+    def _mixer(self, timeout=5.0):
+        """Возвращает готовый микшер и настраивает число каналов при первом обращении"""
+        mixer = self.audio.get_mixer(timeout)
+        if mixer is not None and self.buffer_ms is None:
+            mixer.set_num_channels(self.CHANNELS)
+            frequency = mixer.get_init()[0]
+            # Размер буфера pygame по умолчанию - 512 сэмплов
+            self.buffer_ms = 512 * 1000 / frequency
+        return mixer
+
+    def get(self, filename):
+        """Возвращает декодированный звук (декодирует при первом обращении)"""
+        with self.lock:
+            if filename in self.sounds:
+                return self.sounds[filename]
+        mixer = self._mixer()
+        sound = None
+        if mixer is not None:
+            path = self.resolve_path(filename)
+            start = time.perf_counter()
+            try:
+                sound = mixer.Sound(path)
+            except Exception as e:
+                print(f"Ошибка загрузки звука {path}: {e}")
+            self.decode_ms[filename] = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.sounds[filename] = sound
+        return sound
+
+    def preload(self, filenames=(DEFAULT_SOUND,)):
+        """Заранее декодирует звуки (можно вызывать из фонового потока)"""
+        for filename in filenames:
+            self.get(filename)
+
+    def play(self, key, filename=None, volume=1.0, loops=-1, triggered_at=None):
+        """Проигрывает звук на свободном канале; возвращает канал или None"""
+        sound = self.get(filename or self.DEFAULT_SOUND)
+        if sound is None and filename:
+            sound = self.get(self.DEFAULT_SOUND)  # неизвестный файл - стандартный сигнал
+        if sound is None:
+            return None
+
+        self.stop(key)
+        channel = sound.play(loops=loops)
+        if channel is None:
+            return None
+        channel.set_volume(max(0.0, min(1.0, volume)))
+        self.channels[key] = channel
+        if triggered_at is not None:
+            self.record_latency((time.perf_counter() - triggered_at) * 1000 + (self.buffer_ms or 0.0))
+        return channel
+
+    def stop(self, key):
+        """Останавливает звук будильника"""
+        channel = self.channels.pop(key, None)
+        if channel is not None:
+            channel.stop()
+
+    def stop_all(self):
+        """Останавливает все звуки"""
+        self.channels = {}
+        mixer = self.audio.get_mixer(timeout=0)
+        if mixer is not None:
+            mixer.stop()
+
+    def is_playing(self):
+        """Проверяет, звучит ли хотя бы один сигнал"""
+        return any(channel.get_busy() for channel in self.channels.values())
+
+    def record_latency(self, ms):
+        """Запоминает задержку от срабатывания до первого сэмпла"""
+        stats = self.latency
+        stats['count'] += 1
+        stats['last_ms'] = ms
+        stats['max_ms'] = max(stats['max_ms'], ms)
+        stats['total_ms'] += ms
+
+    def get_stats(self):
+        """Возвращает задержки запуска и время декодирования звуков"""
+        stats = dict(self.latency)
+        stats['avg_ms'] = stats['total_ms'] / stats['count'] if stats['count'] else 0.0
+        stats['buffer_ms'] = self.buffer_ms
+        stats['decode_ms'] = dict(self.decode_ms)
+        return stats
@@ -0,0 +1,310 @@
+"""Набор бенчмарков горячих путей часов с сравнением с базовой линией.
+
+Замеряются: тик update_time, check_alarms на 10..10 000 будильников,
+перестроение виджетов (create_alarm_widgets) и списка настроек
+(update_alarms_list), load_settings/save_settings на больших файлах,
+load_icons и пропускная способность real_time_to_game_time.
+
+Окно Tk создается скрытым, но ему нужен дисплей (на сервере - Xvfb):
+
+    xvfb-run python benchmarks/bench_clock.py
+
+Без дисплея выполняются только замеры, которым Tk не нужен, остальные
+помечаются пропущенными. Результаты пишутся в JSON и сравниваются с
+benchmarks/baseline.json; базовая линия сохраняется ключом
+--update-baseline на эталонной машине. Код возврата 1 - есть регрессии.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import tkinter as tk
+
+import game_time
+from alarms import AlarmIndex
+from alarm_runtime import AlarmRuntime
+from storage import JsonAlarmStore
+from bench_overlay import BenchClock, make_alarms
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+RESULTS_PATH = os.path.join(BENCH_DIR, 'results.json')
+
+CHECK_SIZES = (10, 100, 1000, 10000)
+WIDGET_SIZES = (10, 100, 500)
+LIST_SIZES = (10, 1000, 10000)
+SETTINGS_SIZES = (1000, 10000)
+CONVERSIONS = 100000
+
+
+def measure(func, repeats, setup=None):
+    """Выполняет func repeats раз и возвращает медиану и минимум (мс)"""
+    samples = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': statistics.median(samples), 'min_ms': min(samples)}
+
+
+class QuietClock(BenchClock):
+    """BenchClock без звука: сработавшие будильники не трогают микшер"""
+
+    def play_alarm_sound(self, alarm=None):
+        pass
+
+
+def bench_real_time_to_game_time(app, repeats):
+    """Пропускная способность конвертации реального времени в игровое"""
+    sync_base = game_time.sync_base_for(datetime.now())
+    instants = [sync_base + timedelta(seconds=i * 0.037) for i in range(CONVERSIONS)]
+
+    def convert():
+        for instant in instants:
+            game_time.real_time_to_game_time(instant, sync_base)
+
+    results = {'real_time_to_game_time': measure(convert, repeats)}
+
+    # Пакетная конвертация (только если установлен NumPy)
+    if importlib.util.find_spec('numpy') is not None:
+        epochs = [instant.timestamp() for instant in instants]
+        results['real_time_to_game_time[batch]'] = measure(
+            lambda: game_time.game_time_batch(epochs, sync_base), repeats)
+
+    for result in results.values():
+        result['per_call_us'] = result['median_ms'] * 1000 / CONVERSIONS
+        result['calls_per_s'] = CONVERSIONS / (result['median_ms'] / 1000)
+    return results
+
+
+def bench_settings_io(app, repeats):
+    """Чтение и атомарная запись больших файлов будильников"""
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        for count in SETTINGS_SIZES:
+            store = JsonAlarmStore(os.path.join(data_dir, f"alarms_{count}.json"))
+            alarms = make_alarms(count)
+            # save_settings только ставит снимок в очередь, запись - flush
+            results[f"save_settings[{count}]"] = measure(
+                lambda: (store.save(alarms), store.flush()), repeats)
+            results[f"load_settings[{count}]"] = measure(store.load, repeats)
+    return results
+
+
+def bench_update_time(app, repeats):
+    """Тик часов: обычное пробуждение и пробуждение на границе игровой минуты"""
+    def tick():
+        app.update_time()
+        app.root.after_cancel(app.tick_job)
+
+    def new_minute():
+        app.scheduler.reset()
+
+    return {
+        'update_time': measure(tick, repeats * 20),
+        'update_time[minute]': measure(tick, repeats * 20, setup=new_minute),
+    }
+
+
+def bench_check_alarms(app, repeats):
+    """Проверка будильников за игровые сутки (1440 вызовов) при разном их числе"""
+    results = {}
+    for count in CHECK_SIZES:
+        app.alarms = make_alarms(count)
+
+        def reset():
+            app.alarm_index = AlarmIndex(app.alarms)
+            app.runtime = AlarmRuntime()
+
+        def sweep():
+            for minute in range(game_time.MINUTES_PER_DAY):
+                app.check_alarms(*divmod(minute, 60))
+
+        result = measure(sweep, repeats, setup=reset)
+        result['per_call_us'] = result['median_ms'] * 1000 / game_time.MINUTES_PER_DAY
+        results[f"check_alarms[{count}]"] = result
+
+    app.runtime = AlarmRuntime()
+    if app.flash_job is not None:
+        app.root.after_cancel(app.flash_job)
+        app.flash_job = None
+    return results
+
+
+def bench_alarm_widgets(app, repeats):
+    """Создание виджетов с нуля и повторная синхронизация без изменений"""
+    results = {}
+    for count in WIDGET_SIZES:
+        alarms = make_alarms(count)
+
+        def clear():
+            app.alarms = []
+            app.create_alarm_widgets()
+            app.alarms = alarms
+
+        def create():
+            app.create_alarm_widgets()
+            app.root.update_idletasks()
+
+        results[f"create_alarm_widgets[{count}]"] = measure(create, repeats, setup=clear)
+        results[f"create_alarm_widgets[{count}, unchanged]"] = measure(create, repeats)
+    app.alarms = []
+    app.create_alarm_widgets()
+    return results
+
+
+def bench_alarms_list(app, repeats):
+    """Перестроение списка будильников в окне настроек"""
+    results = {}
+    app.open_settings()
+    settings_window = app.settings_list.canvas.winfo_toplevel()
+    for count in LIST_SIZES:
+        app.alarms = make_alarms(count)
+
+        def rebuild():
+            app.settings_list.set_alarms(app.alarms)
+            app.root.update_idletasks()
+
+        results[f"update_alarms_list[{count}]"] = measure(rebuild, repeats)
+    settings_window.destroy()
+    app.alarms = []
+    return results
+
+
+def bench_load_icons(app, repeats):
+    """Декодирование иконок (атлас) и создание PhotoImage"""
+    return {
+        'decode_icons': measure(app.decode_icons, repeats),
+        'load_icons': measure(app.load_icons, repeats),
+    }
+
+
+# (функция, нужен ли Tk)
+BENCHMARKS = (
+    (bench_real_time_to_game_time, False),
+    (bench_settings_io, False),
+    (bench_update_time, True),
+    (bench_check_alarms, True),
+    (bench_alarm_widgets, True),
+    (bench_alarms_list, True),
+    (bench_load_icons, True),
+)
+
+
+def start_app(data_dir):
+    """Создает часы со скрытым окном; возвращает None, если дисплея нет"""
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Tk недоступен ({e}), замеры с окнами пропущены")
+        return None
+    root.withdraw()
+    QuietClock.data_dir = data_dir
+    app = QuietClock(root)
+    while 'ready_ms' not in app.startup_timings:
+        root.update()
+    return app
+
+
+def run(repeats, only=None):
+    """Выполняет бенчмарки и возвращает результаты"""
+    metrics = {}
+    skipped = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        app = start_app(data_dir)
+        for benchmark, needs_tk in BENCHMARKS:
+            name = benchmark.__name__[len('bench_'):]
+            if only and name not in only:
+                continue
+            if needs_tk and app is None:
+                skipped.append(name)
+                continue
+            metrics.update(benchmark(app, repeats))
+        if app is not None:
+            app.shutdown()
+            app.root.destroy()
+
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'metrics': metrics,
+        'skipped': skipped,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Сравнивает медианы с базовой линией; возвращает список регрессий"""
+    regressions = []
+    print(f"{'замер':<40} {'медиана, мс':>12} {'база, мс':>10} {'изм.':>8}")
+    for name, result in results['metrics'].items():
+        current = result['median_ms']
+        base = baseline.get('metrics', {}).get(name) if baseline else None
+        if base is None:
+            print(f"{name:<40} {current:>12.3f} {'-':>10} {'-':>8}")
+            continue
+        ratio = current / base['median_ms'] if base['median_ms'] else 1.0
+        mark = ''
+        if ratio > threshold:
+            mark = '  РЕГРЕССИЯ'
+            regressions.append({'name': name, 'current_ms': current,
+                                'baseline_ms': base['median_ms'], 'ratio': ratio})
+        print(f"{name:<40} {current:>12.3f} {base['median_ms']:>10.3f} {ratio:>7.2f}x{mark}")
+    return regressions
+
+
+def parse_args(argv=None):
+    """Разбирает параметры командной строки"""
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей часов")
+    parser.add_argument('--repeats', type=int, default=5,
+                        help="повторов каждого замера (берется медиана)")
+    parser.add_argument('--only', nargs='*', default=None,
+                        help="выполнить только указанные группы (например check_alarms load_icons)")
+    parser.add_argument('--output', default=RESULTS_PATH, help="куда записать результаты JSON")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="файл базовой линии")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="во сколько раз медиана может превысить базовую (по умолчанию 1.25)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="сохранить результаты как новую базовую линию")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    os.chdir(os.path.dirname(BENCH_DIR))  # ресурсы (иконки) берутся из папки проекта
+    results = run(args.repeats, args.only)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    results['regressions'] = compare(results, baseline, args.threshold)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"Результаты: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Базовая линия обновлена: {args.baseline}")
+    elif baseline is None:
+        print("Базовой линии нет - сохраните ее ключом --update-baseline")
+
+    return 1 if results['regressions'] and not args.update_baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
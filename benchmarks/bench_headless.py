@@ -0,0 +1,119 @@
+"""Сравнение режима без окна (headless.py) с оконной версией: память и время запуска.
+
+Каждый вариант запускается в отдельном процессе с одинаковым набором из
+100 будильников. Замеряются время от старта процесса до готовности
+(включая запуск интерпретатора), RSS после запуска и число загруженных
+модулей. Оконной версии нужен дисплей (на сервере - Xvfb):
+
+    xvfb-run python benchmarks/bench_headless.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+REPEATS = 5
+ALARMS = 100
+
+PRELUDE = f"""
+import time
+started = time.perf_counter()
+import json, sys
+sys.path[:0] = [{REPO_DIR!r}, {BENCH_DIR!r}]
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return None
+
+def report():
+    print(json.dumps({{'ready_ms': (time.perf_counter() - started) * 1000,
+                      'rss_kb': rss_kb(), 'modules': len(sys.modules)}}))
+"""
+
+VARIANTS = {
+    # Пустой интерпретатор - нижняя граница
+    'python': "report()",
+    'headless': """
+import headless
+clock = headless.HeadlessClock(data_dir=sys.argv[1])
+clock.tick()
+report()
+""",
+    # Только импорты оконной версии (работает и без дисплея)
+    'gui_imports': """
+import clock
+report()
+""",
+    'gui': """
+import tkinter as tk
+from bench_overlay import BenchClock
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    print(json.dumps({'error': str(e)}))
+    sys.exit(0)
+root.withdraw()
+BenchClock.data_dir = sys.argv[1]
+app = BenchClock(root)
+while 'ready_ms' not in app.startup_timings:
+    root.update()
+report()
+app.shutdown()
+""",
+}
+
+
+def run_variant(code, data_dir):
+    """Запускает вариант в отдельном процессе; возвращает замеры или None"""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', PRELUDE + code, data_dir],
+                               cwd=REPO_DIR, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith('{'):
+            result = json.loads(line)
+            if 'error' in result:
+                print(f"  пропущено: {result['error']}")
+                return None
+            result['wall_ms'] = wall_ms
+            return result
+    print(f"  ошибка запуска: {completed.stderr.strip().splitlines()[-1:]}")
+    return None
+
+
+def main():
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        alarms = [{'id': f"bench{i:04d}", 'time': f"{i * 7 % 1440 // 60:02d}:{i * 7 % 60:02d}",
+                   'name': f"Будильник {i}", 'enabled': True} for i in range(ALARMS)]
+        with open(os.path.join(data_dir, 'alarms.json'), 'w', encoding='utf-8') as f:
+            json.dump({'alarms': alarms}, f, ensure_ascii=False)
+
+        for name, code in VARIANTS.items():
+            print(f"{name}...")
+            runs = [run_variant(code, data_dir) for _ in range(REPEATS)]
+            runs = [run for run in runs if run]
+            if not runs:
+                continue
+            results[name] = {
+                key: statistics.median(run[key] for run in runs)
+                for key in ('ready_ms', 'wall_ms', 'rss_kb', 'modules')
+            }
+
+    print(f"{'вариант':<12} {'готов, мс':>10} {'процесс, мс':>12} {'RSS, КБ':>9} {'модули':>7}")
+    for name, r in results.items():
+        print(f"{name:<12} {r['ready_ms']:>10.1f} {r['wall_ms']:>12.1f} {r['rss_kb']:>9.0f} {r['modules']:>7.0f}")
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
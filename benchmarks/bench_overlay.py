@@ -0,0 +1,108 @@
+"""Сравнение режимов отображения будильников: окно на каждый будильник и общий оверлей.
+
+Для каждого режима и числа будильников (10/100/500) измеряется прирост
+памяти процесса после создания виджетов и стоимость одного кадра
+перетаскивания главного окна вместе со столбиком будильников.
+
+Требуется дисплей (на сервере - Xvfb):
+
+    xvfb-run python benchmarks/bench_overlay.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import tkinter as tk
+
+from clock import GameClock
+from alarms import AlarmRecord, new_alarm_id
+
+SIZES = (10, 100, 500)
+MODES = ('windows', 'single')
+DRAG_FRAMES = 50
+
+
+def rss_kb():
+    """Возвращает текущий RSS процесса в КБ (Linux) или пиковый (остальные ОС)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def make_alarms(count):
+    """Создает count включенных будильников с разным временем"""
+    return [AlarmRecord(new_alarm_id(), i % 1440, f"Будильник {i}", True) for i in range(count)]
+
+
+class BenchClock(GameClock):
+    """GameClock с данными во временной папке"""
+    data_dir = None
+
+    def get_data_path(self, filename):
+        return os.path.join(self.data_dir, filename)
+
+
+def bench(mode, count):
+    """Замеряет память и перетаскивание для одного режима и числа будильников"""
+    root = tk.Tk()
+    root.withdraw()
+    app = BenchClock(root, overlay_mode=mode)
+    while 'ready_ms' not in app.startup_timings:
+        root.update()
+
+    app.alarms = make_alarms(count)
+    rss_before = rss_kb()
+    start = time.perf_counter()
+    app.create_alarm_widgets()
+    root.update()
+    create_ms = (time.perf_counter() - start) * 1000
+    rss_after = rss_kb()
+
+    # Кадры перетаскивания: главное окно и столбик будильников сдвигаются на 1 пиксель
+    main_x, main_y = app.get_main_position()
+    start = time.perf_counter()
+    for i in range(1, DRAG_FRAMES + 1):
+        app.pending_main_pos = (main_x + i, main_y)
+        app.flush_drag()
+        root.update_idletasks()
+    drag_ms = (time.perf_counter() - start) * 1000 / DRAG_FRAMES
+
+    result = {
+        'mode': mode,
+        'alarms': count,
+        'toplevels': sum(1 for w in root.winfo_children() if isinstance(w, tk.Toplevel)),
+        'rss_delta_kb': rss_after - rss_before,
+        'create_ms': create_ms,
+        'drag_frame_ms': drag_ms,
+    }
+    app.shutdown()
+    root.destroy()
+    return result
+
+
+def main():
+    os.chdir(REPO_DIR)  # ресурсы (иконки) берутся из папки проекта
+    with tempfile.TemporaryDirectory() as data_dir:
+        BenchClock.data_dir = data_dir
+        results = [bench(mode, count) for count in SIZES for mode in MODES]
+
+    print(f"{'режим':<8} {'будильники':>10} {'окна':>5} {'RSS, КБ':>9} {'создание, мс':>13} {'кадр, мс':>9}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['alarms']:>10} {r['toplevels']:>5} {r['rss_delta_kb']:>9} "
+              f"{r['create_ms']:>13.1f} {r['drag_frame_ms']:>9.3f}")
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
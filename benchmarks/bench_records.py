@@ -0,0 +1,118 @@
+"""Память и пропускная способность: будильники-словари против AlarmRecord.
+
+Для 1 000, 10 000 и 100 000 будильников замеряются память списка
+(tracemalloc), загрузка из текста alarms.json, построение AlarmIndex,
+проверка за игровые сутки (1440 вызовов advance с фильтром включенных),
+сортировка по времени и запись обратно в текст JSON.
+Дисплей не нужен:
+
+    python benchmarks/bench_records.py
+"""
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from alarms import AlarmIndex, AlarmRecord, format_game_minute, parse_alarm_time
+
+SIZES = (1000, 10000, 100000)
+REPEATS = 5
+
+
+def make_json_alarms(count):
+    """Будильники в формате alarms.json (каждый пятый выключен, у каждого десятого - звук)"""
+    alarms = []
+    for i in range(count):
+        alarm = {'id': f"{i:012x}", 'time': format_game_minute(i * 7 % 1440),
+                 'name': f"Будильник {i}", 'enabled': i % 5 != 0}
+        if i % 10 == 0:
+            alarm['sound'] = "bell.wav"
+            alarm['volume'] = 0.5
+        alarms.append(alarm)
+    return alarms
+
+
+def measure(func, repeats=REPEATS):
+    """Медиана времени выполнения func (мс)"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def memory_bytes(build):
+    """Память, занятая результатом build() (байт)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return used
+
+
+LAYOUTS = {
+    # Текущая раскладка: словарь, время строкой
+    'dict': {
+        'load': lambda data: data,
+        'dump': lambda alarms: alarms,
+        'time_key': lambda alarm: parse_alarm_time(alarm['time']),
+        'due': lambda alarms: [alarm['id'] for alarm in alarms if alarm['enabled']],
+    },
+    # Слоты, время номером игровой минуты
+    'record': {
+        'load': lambda data: [AlarmRecord.from_dict(alarm) for alarm in data],
+        'dump': lambda alarms: [alarm.to_dict() for alarm in alarms],
+        'time_key': lambda alarm: alarm.minute,
+        'due': lambda alarms: [alarm.id for alarm in alarms if alarm.enabled],
+    },
+}
+
+
+def bench_layout(layout, data):
+    """Замеры одной раскладки на наборе data"""
+    # JSON-текст разбирается заново, чтобы память не делилась со строками data
+    text = json.dumps(data, ensure_ascii=False)
+    alarms = layout['load'](json.loads(text))
+
+    def sweep():
+        index = AlarmIndex(alarms)
+        for minute in range(1440):
+            layout['due'](index.advance(minute))
+
+    return {
+        'bytes_per_alarm': memory_bytes(lambda: layout['load'](json.loads(text))) / len(data),
+        'load_ms': measure(lambda: layout['load'](json.loads(text))),
+        'index_ms': measure(lambda: AlarmIndex(alarms)),
+        'check_day_ms': measure(sweep),
+        'sort_ms': measure(lambda: sorted(alarms, key=layout['time_key'])),
+        'dump_ms': measure(lambda: json.dumps({'alarms': layout['dump'](alarms)}, ensure_ascii=False)),
+        'lossless': layout['dump'](alarms) == data,
+    }
+
+
+def main():
+    results = {}
+    for count in SIZES:
+        data = make_json_alarms(count)
+        for name, layout in LAYOUTS.items():
+            print(f"{name}[{count}]...")
+            results[f"{name}[{count}]"] = bench_layout(layout, data)
+
+    print(f"{'вариант':<16} {'Б/будильник':>11} {'загрузка, мс':>13} {'индекс, мс':>11} "
+          f"{'сутки, мс':>10} {'сортировка':>11} {'запись, мс':>11} {'без потерь':>10}")
+    for name, r in results.items():
+        print(f"{name:<16} {r['bytes_per_alarm']:>11.0f} {r['load_ms']:>13.1f} {r['index_ms']:>11.1f} "
+              f"{r['check_day_ms']:>10.1f} {r['sort_ms']:>11.1f} {r['dump_ms']:>11.1f} {str(r['lossless']):>10}")
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
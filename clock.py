@@ -1,14 +1,109 @@
+import time
+
+# Момент запуска процесса - точка отсчета для замера времени до первого кадра
+PROCESS_START = time.perf_counter()
+
 import tkinter as tk
-from datetime import datetime
 from PIL import Image, ImageTk
 import os
 import sys
-import json
-import pygame
-from tkinter import messagebox
+import math
+import argparse
+import signal
+import queue
+from concurrent.futures import ThreadPoolExecutor, Future
+from tkinter import messagebox, filedialog
+from alarms import (AlarmIndex, AlarmRecord, format_game_minute, parse_alarm_time, new_alarm_id, ensure_alarm_ids,
+                    alarm_label, alarm_summary)
+from rules import rule_minutes
+from audio import AudioBackend, SoundBank
+from alarm_runtime import AlarmRuntime, DEFAULT_SNOOZE_MINUTES
+from storage import open_store, STORE_BACKENDS
+from profiler import Profiler
+from local_api import LocalApi
+from profiles import load_profiles, ProfileScheduler, PROFILES_FILENAME
+from history import History
+from presets import merge_alarms, read_preset, write_preset, format_report
+import game_time
+import assets
+
+# Период старого опроса (мс) - для сравнения числа пробуждений
+LEGACY_POLL_MS = 100
+
+# Длительность кадра (мс): события перетаскивания применяются не чаще раза за кадр
+DRAG_FRAME_MS = 16
+
+# Методы, длительность которых замеряется при включенном профилировании
+PROFILED_METHODS = ('update_time', 'check_alarms', 'save_settings', 'play_alarm_sound')
+
+# Имя файла отчета профилирования по умолчанию
+PROFILE_FILENAME = "profile.json"
+
+# Высота основного окна и строки дополнительного профиля часов
+MAIN_HEIGHT = 100
+PROFILE_ROW_HEIGHT = 18
+
+class RenderCache:
+    """Запоминает последнее отрисованное состояние виджетов.
+    
+    В Tk отправляются только реально изменившиеся параметры: каждый вызов
+    config - это обращение к Tcl и возможная перерисовка.
+    """
+    
+    def __init__(self):
+        self.state = {}  # путь виджета Tk -> {параметр: значение}
+        self.totals = {'issued': 0, 'suppressed': 0}
+        self.window = {'issued': 0, 'suppressed': 0}
+        self.window_start = time.monotonic()
+        self.last_second = {'issued': 0, 'suppressed': 0}
+    
+    def set(self, widget, **options):
+        """Применяет параметры к виджету, пропуская неизменившиеся"""
+        rendered = self.state.setdefault(str(widget), {})
+        changes = {key: value for key, value in options.items()
+                   if key not in rendered or rendered[key] is not value and rendered[key] != value}
+        self.count('issued' if changes else 'suppressed')
+        if changes:
+            widget.config(**changes)
+            rendered.update(changes)
+        return bool(changes)
+    
+    def remember(self, widget, **options):
+        """Запоминает параметры, с которыми виджет был создан"""
+        self.state[str(widget)] = dict(options)
+    
+    def forget(self, widget):
+        """Забывает состояние уничтоженного виджета"""
+        self.state.pop(str(widget), None)
+    
+    def roll_window(self):
+        """Закрывает секундное окно счетчиков, если оно истекло"""
+        elapsed = time.monotonic() - self.window_start
+        if elapsed >= 1.0:
+            # Если прошло больше двух секунд, последняя полная секунда была пустой
+            self.last_second = self.window if elapsed < 2.0 else {'issued': 0, 'suppressed': 0}
+            self.window = {'issued': 0, 'suppressed': 0}
+            self.window_start = time.monotonic()
+    
+    def count(self, kind):
+        """Считает перерисовки в текущем окне длиной в одну секунду"""
+        self.roll_window()
+        self.window[kind] += 1
+        self.totals[kind] += 1
+    
+    def get_stats(self):
+        """Возвращает число отправленных и подавленных перерисовок за последнюю секунду и всего"""
+        self.roll_window()
+        return {
+            'issued_per_sec': self.last_second['issued'],
+            'suppressed_per_sec': self.last_second['suppressed'],
+            'issued_total': self.totals['issued'],
+            'suppressed_total': self.totals['suppressed'],
+        }
 
 class AlarmWidget:
-    def __init__(self, parent, alarm_data, on_drag_start, on_drag_stop, on_drag, on_click, signal_on_icon, signal_off_icon):
+    def __init__(self, parent, alarm_data, on_drag_start, on_drag_stop, on_drag, on_click, signal_on_icon, signal_off_icon,
+                 render=None, on_snooze=None):
         self.parent = parent
         self.alarm_data = alarm_data
         self.on_drag_start = on_drag_start
@@ -17,6 +112,12 @@ class AlarmWidget:
         self.on_click = on_click
         self.signal_on_icon = signal_on_icon
         self.signal_off_icon = signal_off_icon
+        self.render = render or RenderCache()
+        self.on_snooze = on_snooze
+        
+        # Текущая позиция и смещение, заданное пользователем перетаскиванием
+        self.position = None
+        self.custom_offset = None
         
         self.create_widget()
     
@@ -42,11 +143,13 @@ class AlarmWidget:
             bg='#2b2b2b'
         )
         self.icon_label.pack(side='left', padx=(0, 10))
+        self.render.remember(self.icon_label, image=self.signal_off_icon)
         
         # Метка с информацией о будильнике
+        self.label_text = alarm_label(self.alarm_data)
         self.alarm_label = tk.Label(
             main_frame,
-            text=f"{self.alarm_data['time']} - {self.alarm_data['name']}",
+            text=self.label_text,
             font=("Arial", 10),
             fg='#ffffff',
             bg='#2b2b2b',
@@ -58,45 +161,408 @@ class AlarmWidget:
         self.bind_drag_events()
         
         # Привязываем клик для остановки
-        self.alarm_label.bind("<Button-1>", self.on_click)
-        self.icon_label.bind("<Button-1>", self.on_click)
+        self.alarm_label.bind("<Button-1>", lambda e: self.on_click(e, self))
+        self.icon_label.bind("<Button-1>", lambda e: self.on_click(e, self))
+        
+        # Правый клик откладывает сигнал
+        if self.on_snooze:
+            self.alarm_label.bind("<Button-3>", lambda e: self.on_snooze(e, self))
+            self.icon_label.bind("<Button-3>", lambda e: self.on_snooze(e, self))
     
     def bind_drag_events(self):
         """Привязывает события перемещения к виджету"""
-        self.alarm_label.bind("<ButtonPress-1>", self.on_drag_start)
-        self.alarm_label.bind("<ButtonRelease-1>", self.on_drag_stop)
-        self.alarm_label.bind("<B1-Motion>", self.on_drag)
-        
-        self.icon_label.bind("<ButtonPress-1>", self.on_drag_start)
-        self.icon_label.bind("<ButtonRelease-1>", self.on_drag_stop)
-        self.icon_label.bind("<B1-Motion>", self.on_drag)
-        
-        self.widget.bind("<ButtonPress-1>", self.on_drag_start)
-        self.widget.bind("<ButtonRelease-1>", self.on_drag_stop)
-        self.widget.bind("<B1-Motion>", self.on_drag)
+        # Обработчики получают сам виджет будильника вторым аргументом
+        on_drag_start = lambda e: self.on_drag_start(e, self)
+        on_drag_stop = lambda e: self.on_drag_stop(e, self)
+        on_drag = lambda e: self.on_drag(e, self)
+        
+        self.alarm_label.bind("<ButtonPress-1>", on_drag_start)
+        self.alarm_label.bind("<ButtonRelease-1>", on_drag_stop)
+        self.alarm_label.bind("<B1-Motion>", on_drag)
+        
+        self.icon_label.bind("<ButtonPress-1>", on_drag_start)
+        self.icon_label.bind("<ButtonRelease-1>", on_drag_stop)
+        self.icon_label.bind("<B1-Motion>", on_drag)
+        
+        self.widget.bind("<ButtonPress-1>", on_drag_start)
+        self.widget.bind("<ButtonRelease-1>", on_drag_stop)
+        self.widget.bind("<B1-Motion>", on_drag)
+    
+    def set_alarm_data(self, alarm_data):
+        """Обновляет данные будильника; возвращает True, если подпись изменилась"""
+        self.alarm_data = alarm_data
+        new_label = alarm_label(alarm_data)
+        if new_label == self.label_text:
+            return False
+        self.label_text = new_label
+        self.widget.title(f"Будильник {alarm_data['time']}")
+        self.alarm_label.config(text=new_label)
+        return True
     
     def update_position(self, x, y):
         """Обновляет позицию виджета"""
+        if self.position == (x, y):
+            return
+        self.position = (x, y)
         self.widget.geometry(f"+{x}+{y}")
     
     def destroy(self):
         """Уничтожает виджет"""
+        self.render.forget(self.icon_label)
         self.widget.destroy()
     
     def set_alarm_active(self, active):
         """Устанавливает состояние активного будильника через смену иконок"""
         if active:
             # Включенное состояние - красная иконка
-            self.icon_label.config(image=self.signal_on_icon)
+            self.render.set(self.icon_label, image=self.signal_on_icon)
         else:
             # Выключенное состояние - белая иконка
-            self.icon_label.config(image=self.signal_off_icon)
+            self.render.set(self.icon_label, image=self.signal_off_icon)
+
+class OverlayRow:
+    """Строка будильника в общем окне-оверлее (аналог AlarmWidget)"""
+    
+    def __init__(self, overlay, alarm_data):
+        self.overlay = overlay
+        self.alarm_data = alarm_data
+        self.index = None
+        self.active = False
+        
+        canvas = overlay.canvas
+        self.label_text = alarm_label(alarm_data)
+        self.rect_item = canvas.create_rectangle(0, 0, AlarmOverlay.WIDTH, AlarmOverlay.ROW_HEIGHT,
+                                                 fill='#2b2b2b', outline='')
+        self.icon_item = canvas.create_image(10, AlarmOverlay.ROW_HEIGHT // 2, anchor='w',
+                                             image=overlay.signal_off_icon)
+        self.text_item = canvas.create_text(40, AlarmOverlay.ROW_HEIGHT // 2, anchor='w',
+                                            text=self.label_text, font=("Arial", 10), fill='#ffffff')
+    
+    def move_to(self, index):
+        """Перемещает строку на заданную позицию в столбике"""
+        if self.index == index:
+            return
+        dy = (index - (self.index or 0)) * AlarmOverlay.ROW_PITCH
+        self.index = index
+        for item in (self.rect_item, self.icon_item, self.text_item):
+            self.overlay.canvas.move(item, 0, dy)
+    
+    def set_alarm_data(self, alarm_data):
+        """Обновляет данные будильника; возвращает True, если подпись изменилась"""
+        self.alarm_data = alarm_data
+        new_label = alarm_label(alarm_data)
+        if new_label == self.label_text:
+            return False
+        self.label_text = new_label
+        self.overlay.canvas.itemconfigure(self.text_item, text=new_label)
+        return True
+    
+    def set_alarm_active(self, active):
+        """Мигание строки сменой иконки (только при реальном изменении)"""
+        if self.active == active:
+            self.overlay.render.count('suppressed')
+            return
+        self.active = active
+        self.overlay.render.count('issued')
+        icon = self.overlay.signal_on_icon if active else self.overlay.signal_off_icon
+        self.overlay.canvas.itemconfigure(self.icon_item, image=icon)
+    
+    def destroy(self):
+        """Удаляет элементы строки с canvas"""
+        self.overlay.canvas.delete(self.rect_item, self.icon_item, self.text_item)
+
+class AlarmOverlay:
+    """Одно окно-оверлей, в котором все активные будильники нарисованы строками на canvas.
+    
+    Заменяет отдельный Toplevel на каждый будильник: окно одно, поэтому
+    меньше работы оконному менеджеру и композитору, а перетаскивание
+    двигает одно окно.
+    """
+    WIDTH = 200
+    ROW_HEIGHT = 40
+    SPACING = 5
+    ROW_PITCH = ROW_HEIGHT + SPACING
+    GAP_COLOR = '#010203'  # цвет промежутков между строками (прозрачный в Windows)
+    
+    def __init__(self, parent, on_drag_start, on_drag_stop, on_drag, on_click,
+                 signal_on_icon, signal_off_icon, render=None, on_snooze=None):
+        self.on_click = on_click
+        self.on_snooze = on_snooze
+        self.signal_on_icon = signal_on_icon
+        self.signal_off_icon = signal_off_icon
+        self.render = render or RenderCache()
+        self.rows = []
+        self.height = None
+        self.visible = True
+        
+        # Позиция окна и смещение, заданное пользователем (как у AlarmWidget)
+        self.position = None
+        self.custom_offset = None
+        
+        self.widget = tk.Toplevel(parent)
+        self.widget.title("Будильники")
+        self.widget.resizable(False, False)
+        self.widget.overrideredirect(True)
+        self.widget.attributes('-topmost', True)
+        self.widget.attributes('-alpha', 0.9)
+        
+        gap_color = '#2b2b2b'
+        try:
+            # Промежутки между строками выглядят как отдельные окна
+            self.widget.attributes('-transparentcolor', self.GAP_COLOR)
+            gap_color = self.GAP_COLOR
+        except tk.TclError:
+            pass
+        
+        self.canvas = tk.Canvas(self.widget, width=self.WIDTH, height=self.ROW_HEIGHT,
+                                bg=gap_color, highlightthickness=0, bd=0, cursor="hand2")
+        self.canvas.pack(fill='both', expand=True)
+        
+        def on_press(event):
+            on_drag_start(event, self)
+            # Клик по строке останавливает ее будильник
+            row = self.row_at(event.y)
+            if row is not None:
+                self.on_click(event, row)
+        
+        self.canvas.bind("<ButtonPress-1>", on_press)
+        self.canvas.bind("<ButtonRelease-1>", lambda e: on_drag_stop(e, self))
+        self.canvas.bind("<B1-Motion>", lambda e: on_drag(e, self))
+        
+        def on_right_click(event):
+            # Правый клик по строке откладывает ее сигнал
+            row = self.row_at(event.y)
+            if row is not None and self.on_snooze:
+                self.on_snooze(event, row)
+        
+        self.canvas.bind("<Button-3>", on_right_click)
+    
+    def add_row(self, alarm_data):
+        """Создает строку будильника (место в столбике назначает sync)"""
+        return OverlayRow(self, alarm_data)
+    
+    def row_at(self, y):
+        """Находит строку под точкой y (промежутки между строками не считаются)"""
+        index, offset = divmod(int(y), self.ROW_PITCH)
+        if 0 <= index < len(self.rows) and offset < self.ROW_HEIGHT:
+            return self.rows[index]
+        return None
+    
+    def sync(self, rows):
+        """Раскладывает строки по порядку и подгоняет высоту окна"""
+        self.rows = rows
+        for index, row in enumerate(rows):
+            row.move_to(index)
+        
+        if not rows:
+            if self.visible:
+                self.widget.withdraw()
+                self.visible = False
+            return
+        if not self.visible:
+            self.widget.deiconify()
+            self.visible = True
+        
+        height = len(rows) * self.ROW_PITCH - self.SPACING
+        if height != self.height:
+            self.height = height
+            self.canvas.configure(height=height)
+            self.widget.geometry(f"{self.WIDTH}x{height}")
+    
+    def destroy(self):
+        """Уничтожает окно-оверлей"""
+        self.widget.destroy()
+
+class VirtualAlarmList:
+    """Виртуализированный список будильников для окна настроек.
+    
+    Виджеты создаются только для строк, видимых в области canvas,
+    и переиспользуются при прокрутке.
+    """
+    ROW_HEIGHT = 26
+    
+    # Варианты сортировки: ключ -> функция ключа (None - порядок добавления)
+    SORT_KEYS = {
+        'added': None,
+        'time': lambda alarm: (VirtualAlarmList.time_key(alarm), alarm['name'].casefold()),
+        'name': lambda alarm: (alarm['name'].casefold(), VirtualAlarmList.time_key(alarm)),
+    }
+    
+    def __init__(self, parent, on_toggle, on_delete, height=150):
+        self.on_toggle = on_toggle
+        self.on_delete = on_delete
+        self.height = height
+        
+        self.alarms = []        # все будильники
+        self.view = []          # отфильтрованные и отсортированные
+        self.filter_text = ''
+        self.sort_key = 'added'
+        self.rows = []          # пул строк, переиспользуемых при прокрутке
+        self.region_rows = None
+        
+        self.canvas = tk.Canvas(parent, bg='#1a1a1a', height=height)
+        self.scrollbar = tk.Scrollbar(parent, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.empty_label = tk.Label(self.canvas, text="Нет будильников",
+                                    fg='#888888', bg='#1a1a1a')
+        self.empty_item = self.canvas.create_window((10, 10), window=self.empty_label,
+                                                    anchor="nw", state='hidden')
+        
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+    
+    @staticmethod
+    def time_key(alarm):
+        """Ключ сортировки по времени (некорректное время - в конец)"""
+        return alarm.minute if alarm.minute is not None else 24 * 60
+    
+    def set_alarms(self, alarms):
+        """Задает список будильников и перестраивает представление"""
+        self.alarms = alarms
+        self.rebuild_view()
+    
+    def set_filter(self, text):
+        """Фильтрует список по подстроке в названии или времени"""
+        self.filter_text = text.strip().casefold()
+        self.rebuild_view()
+    
+    def set_sort(self, sort_key):
+        """Сортирует список по времени, названию или порядку добавления"""
+        self.sort_key = sort_key
+        self.rebuild_view()
+    
+    def rebuild_view(self):
+        """Пересчитывает отфильтрованное и отсортированное представление"""
+        if self.filter_text:
+            needle = self.filter_text
+            view = [alarm for alarm in self.alarms
+                    if needle in alarm['name'].casefold() or needle in alarm['time']
+                    or needle in alarm.get('rule', '')]
+        else:
+            view = list(self.alarms)
+        
+        key = self.SORT_KEYS.get(self.sort_key)
+        if key is not None:
+            view.sort(key=key)
+        
+        self.view = view
+        self.refresh()
+    
+    def update_alarm(self, alarm):
+        """Перерисовывает только строку измененного будильника"""
+        for row in self.rows:
+            if row['alarm'] is alarm:
+                self.fill_row(row, row['index'])
+    
+    def remove_alarm(self, alarm):
+        """Убирает будильник из представления без полной перестройки"""
+        for i, shown in enumerate(self.view):
+            if shown is alarm:
+                self.view.pop(i)
+                break
+        self.refresh()
+    
+    def refresh(self):
+        """Обновляет область прокрутки и видимые строки"""
+        count = len(self.view)
+        if count != self.region_rows:
+            self.region_rows = count
+            self.canvas.configure(scrollregion=(0, 0, 0, count * self.ROW_HEIGHT))
+        self.canvas.itemconfigure(self.empty_item, state='hidden' if self.alarms else 'normal')
+        self.render_rows()
+    
+    def render_rows(self):
+        """Раскладывает пул строк по видимой области canvas"""
+        count = len(self.view)
+        height = max(self.canvas.winfo_height(), self.height)
+        first = max(0, int(self.canvas.canvasy(0) // self.ROW_HEIGHT))
+        visible = min(math.ceil(height / self.ROW_HEIGHT) + 1, count)
+        
+        while len(self.rows) < visible:
+            self.rows.append(self.create_row())
+        
+        for slot, row in enumerate(self.rows):
+            index = first + slot
+            if index < count:
+                self.fill_row(row, index)
+            elif row['index'] is not None:
+                self.canvas.itemconfigure(row['item'], state='hidden')
+                row['index'] = None
+                row['alarm'] = None
+    
+    def create_row(self):
+        """Создает строку списка (вызывается только при росте видимой области)"""
+        frame = tk.Frame(self.canvas, bg='#1a1a1a')
+        row = {'frame': frame, 'alarm': None, 'index': None, 'text': None}
+        
+        row['label'] = tk.Label(frame, fg='white', bg='#1a1a1a', font=("Arial", 9))
+        row['label'].pack(side='left')
+        
+        btn_frame = tk.Frame(frame, bg='#1a1a1a')
+        btn_frame.pack(side='right')
+        
+        tk.Button(btn_frame, text="Вкл/Выкл", command=lambda: self.on_toggle(row['alarm']),
+                 bg='#FF9800', fg='white', font=("Arial", 7)).pack(side='left', padx=2)
+        
+        tk.Button(btn_frame, text="Удалить", command=lambda: self.on_delete(row['alarm']),
+                 bg='#f44336', fg='white', font=("Arial", 7)).pack(side='left', padx=2)
+        
+        # Прокрутка колесом работает и поверх строк
+        for widget in (frame, row['label'], btn_frame):
+            widget.bind("<MouseWheel>", self.on_mousewheel)
+        
+        row['item'] = self.canvas.create_window(
+            (0, 0), window=frame, anchor="nw",
+            width=max(self.canvas.winfo_width(), 1), height=self.ROW_HEIGHT
+        )
+        return row
+    
+    def fill_row(self, row, index):
+        """Заполняет строку данными будильника, трогая Tk только при изменениях"""
+        alarm = self.view[index]
+        row['alarm'] = alarm
+        if row['index'] != index:
+            if row['index'] is None:
+                self.canvas.itemconfigure(row['item'], state='normal')
+            self.canvas.coords(row['item'], 0, index * self.ROW_HEIGHT)
+            row['index'] = index
+        
+        status = "🔔" if alarm['enabled'] else "🔕"
+        text = f"{status} {alarm_summary(alarm)} - {alarm['name']}"
+        if row['text'] != text:
+            row['label'].config(text=text)
+            row['text'] = text
+    
+    def on_scroll(self, first, last):
+        """Синхронизирует полосу прокрутки и видимые строки"""
+        self.scrollbar.set(first, last)
+        self.render_rows()
+    
+    def on_resize(self, event):
+        """Подгоняет ширину строк под canvas"""
+        for row in self.rows:
+            self.canvas.itemconfigure(row['item'], width=event.width)
+        self.render_rows()
+    
+    def on_mousewheel(self, event):
+        """Прокручивает список колесом мыши"""
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
 
 class GameClock:
-    def __init__(self, root):
+    def __init__(self, root, tick_resolution_ms=None, store_backend='json', overlay_mode='windows',
+                 max_firing=None, profile=None, api_port=None, time_source=None):
         self.root = root
         self.root.title("Игровые часы")
-        self.root.geometry("200x100")
+        
+        # Профили часов (profiles.json): первый - основной, его время в главном окне,
+        # остальные показываются строками под ним
+        profiles = load_profiles(self.get_data_path(PROFILES_FILENAME))
+        self.main_height = MAIN_HEIGHT + PROFILE_ROW_HEIGHT * (len(profiles) - 1)
+        self.root.geometry(f"200x{self.main_height}")
         self.root.resizable(False, False)
         self.root.configure(bg='#2b2b2b')
         
@@ -106,37 +572,193 @@ class GameClock:
         # Всегда поверх всех окон
         self.root.attributes('-topmost', True)
         
+        # Замеры времени запуска (мс)
+        self.startup_timings = {}
+        
+        # Профилирование главного цикла (--profile или RF4_CLOCK_PROFILE);
+        # выключенное ничего не оборачивает
+        self.profiler = Profiler(self.get_data_path(profile) if profile else None)
+        self.profiler.instrument_after(self.root)
+        self.profiler.instrument(self, PROFILED_METHODS)
+        if self.profiler.enabled:
+            # Отчет по требованию: Ctrl+P или сигнал SIGUSR1
+            self.root.bind_all('<Control-p>', lambda e: self.dump_profile())
+            if hasattr(signal, 'SIGUSR1'):
+                signal.signal(signal.SIGUSR1, lambda signum, frame: self.root.after_idle(self.dump_profile))
+        
+        # Время, тики, будильники и их срабатывание - общее с часами без окна;
+        # история срабатываний и тиков - кольцевой буфер фиксированного размера
+        self.init_clock_state(profiles, time_source, tick_resolution_ms, max_firing,
+                              History(self.get_data_path))
+        self.profiler.add_section('ticks', self.get_tick_stats)
+        self.profiler.add_section('render', self.render.get_stats)
+        
+        # Звук инициализируется в фоне (импорт pygame - самая дорогая часть запуска)
+        self.audio = AudioBackend()
+        self.audio.start()
+        
+        # Звуки будильников декодируются в память один раз и играют на отдельных каналах
+        self.sounds = SoundBank(self.audio, self.get_sound_path)
+        self.profiler.add_section('sound_latency', self.sounds.get_stats)
+        
+        # Режим отображения будильников: 'windows' - окно на каждый будильник,
+        # 'single' - все будильники строками в одном окне-оверлее
+        self.overlay_mode = overlay_mode
+        self.overlay = None
+        self.widget_churn = {'created': 0, 'destroyed': 0, 'relabeled': 0, 'reused': 0}
+        self.profiler.add_section('widget_churn', self.get_widget_churn)
+        
+        # Переменные для перемещения
+        self.drag_data = {"x": 0, "y": 0, "widget": None}
+        
+        # Позиции окон храним локально, чтобы не спрашивать Tk на каждое движение мыши;
+        # движения мыши копятся и применяются одним пакетом раз в кадр
+        self.x = None
+        self.y = None
+        self.drag_origin = None
+        self.main_pos = None
+        self.pending_main_pos = None
+        self.pending_widget_pos = {}  # AlarmWidget -> (x, y)
+        self.drag_job = None
+        self.drag_stats = {'motion_events': 0, 'frames': 0}
+        self.profiler.add_section('drag', self.get_drag_stats)
+        
+        # Хранилище будильников с отложенной атомарной записью
+        # (alarms.json по умолчанию или база SQLite)
+        self.store_backend = store_backend
+        self.store = open_store(store_backend, self.get_data_path)
+        
+        # Настройки и иконки читаются и декодируются параллельно,
+        # пока главный поток рисует первый кадр
+        self.startup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+        self.settings_future = self.startup_executor.submit(self.load_settings)
+        self.icons_future = self.startup_executor.submit(self.decode_icons)
+        self.profiles_future = self.startup_executor.submit(self.load_profile_alarms)
+        # Последней: ждет инициализации звука и не задерживает остальные задачи
+        self.startup_executor.submit(self.sounds.preload)
+        
+        # Вызовы из фоновых потоков (локальный API), выполняемые в главном потоке Tk
+        self.main_thread_calls = queue.Queue()
+        self.root.bind('<<MainThreadCall>>', self.run_main_thread_calls)
+        
+        # Локальный API на 127.0.0.1 запускается, когда будильники загружены и проиндексированы
+        self.api_port = api_port
+        
+        # Первый кадр: окно с текущим игровым временем, без иконок
+        self.create_widgets()
+        game_hour, game_minute = self.real_time_to_game_time(self.time_source.now())
+        self.render.set(self.game_time_label, text=f"{game_hour:02d}:{game_minute:02d}")
+        
+        # Добавляем возможность перемещения окна
+        self.bind_drag_events()
+        
+        # Idle-обработчики перерисовки Tk уже поставлены в очередь,
+        # поэтому этот колбэк выполнится после отрисовки первого кадра
+        self.root.after_idle(self.on_first_frame)
+    
+    def on_first_frame(self):
+        """Фиксирует время до первого кадра и завершает запуск"""
+        self.startup_timings['first_frame_ms'] = (time.perf_counter() - PROCESS_START) * 1000
+        self.root.after_idle(self.finish_startup)
+    
+    def init_clock_state(self, profiles, time_source=None, tick_resolution_ms=None, max_firing=None,
+                         history=None):
+        """Создает состояние часов, не зависящее от окна: время, тики, будильники, срабатывания.
+        
+        Вызывается из __init__ и из часов без окна (simulation.SimulatedClock),
+        поэтому здесь не создаются виджеты и не открываются файлы.
+        """
+        self.profiles = profiles
+        self.profile = self.profiles[0]
+        self.profile_labels = {}
+        
+        # Отрисовка только изменений (текст и иконки виджетов)
+        self.render = RenderCache()
+        
         # Настройки времени
-        self.real_time_ratio = 2.5  # 2.5 реальных минуты = 1 игровой час
+        self.real_time_ratio = self.profile.ratio  # 2.5 реальных минуты = 1 игровой час
+        
+        # Источник времени на монотонных часах с пересинхронизацией
+        # (подменяется, например, виртуальным временем симуляции)
+        self.time_source = time_source or game_time.MonotonicTimeSource()
         
         # База для синхронизации - начало текущего реального часа
-        self.sync_base = datetime.now().replace(minute=0, second=0, microsecond=0)
+        self.sync_base = game_time.sync_base_for(self.time_source.now())
         
-        # Инициализация pygame для звука
-        pygame.mixer.init()
+        # Задержка срабатывания будильника: от границы игровой минуты профиля до звука
+        self.alarm_latency = {'count': 0, 'last': 0.0, 'max': 0.0, 'total': 0.0}
         
-        # Настройки будильника
+        # Планировщик тиков: None - просыпаемся ровно на границе игровой минуты,
+        # число - резервный режим опроса с заданным периодом (мс)
+        self.tick_resolution_ms = tick_resolution_ms
+        self.tick_job = None
+        # Один таймер на все профили: пробуждение на ближайшей границе игровой минуты
+        self.scheduler = ProfileScheduler(self.profiles)
+        self.tick_stats = {'wakeups': 0, 'minute_ticks': 0}
+        self.tick_started = time.monotonic()
+        
+        # Настройки будильника (индекс перестраивается после загрузки)
         self.alarms = []
-        self.alarm_widgets = []
+        self.alarm_index = AlarmIndex(self.alarms)
+        self.alarm_widgets = {}  # id будильника -> AlarmWidget (или OverlayRow)
+        self.settings_list = None  # VirtualAlarmList открытого окна настроек
+        self.fire_started = None
         self.sound_playing = False
-        self.active_alarm = None
         self.flash_state = False
+        self.flash_job = None
         
-        # Переменные для перемещения
-        self.drag_data = {"x": 0, "y": 0, "widget": None}
+        # Состояние срабатывания: несколько будильников одновременно,
+        # очередь сверх max_firing и отложенные сигналы
+        self.runtime = self.create_runtime(max_firing)
+        self.history = history or History()
+        
+        # Локальный API (включается --api-port) запускается, когда будильники загружены
+        self.api_port = None
+        self.api = None
+    
+    def create_runtime(self, max_firing):
+        """Создает состояние срабатывания будильников"""
+        return AlarmRuntime(max_firing=max_firing, clock=self.time_source.now_epoch)
+    
+    def finish_startup(self):
+        """Вторая стадия запуска: будильники, иконки и тики часов"""
+        self.settings_future.result()
+        self.profiles_future.result()
         
-        # Загружаем настройки
-        self.load_settings()
+        # Индекс будильников по игровой минуте суток
+        self.alarm_index = AlarmIndex(self.alarms)
         
         # Загружаем иконки
-        self.load_icons()
+        self.load_icons(self.icons_future.result())
+        self.startup_executor.shutdown(wait=False)
         
-        self.create_widgets()
+        self.settings_btn.config(image=self.settings_icon)
         self.create_alarm_widgets()
+        self.start_api()
         self.update_time()
         
-        # Добавляем возможность перемещения окна
-        self.bind_drag_events()
+        self.startup_timings['ready_ms'] = (time.perf_counter() - PROCESS_START) * 1000
+        if os.environ.get('RF4_CLOCK_STARTUP_REPORT'):
+            self.root.after(1000, lambda: print(self.get_startup_report()))
+    
+    def start_api(self):
+        """Запускает локальный API (после загрузки и индексации будильников)"""
+        if self.api_port is None:
+            return
+        try:
+            api = LocalApi(self.api_port, self.apply_alarm_batch, self.call_in_main_thread,
+                           history=self.history, game_clock=self.get_game_clock)
+            api.set_alarms(self.alarms)
+            self.api = api.start()
+            print(f"Локальный API: http://127.0.0.1:{self.api.port}")
+        except OSError as e:
+            print(f"Ошибка запуска локального API: {e}")
+    
+    def get_startup_report(self):
+        """Возвращает замеры времени запуска (мс)"""
+        report = dict(self.startup_timings)
+        report['audio_init_ms'] = self.audio.init_ms
+        return report
     
     def get_resource_path(self, relative_path):
         """Получает правильный путь к ресурсам как в EXE так и в скрипте"""
@@ -159,50 +781,40 @@ class GameClock:
         
         return os.path.join(base_path, filename)
     
-    def load_icons(self):
-        """Загружает иконки дня и ночи"""
+    def decode_icons(self):
+        """Читает и декодирует иконки (безопасно вызывать из фонового потока)"""
+        start = time.perf_counter()
         try:
-            # Используем правильные пути для ресурсов
-            day_path = self.get_resource_path("day.png")
-            night_path = self.get_resource_path("night.png")
-            settings_path = self.get_resource_path("setting.png")
-            setting_black_path = self.get_resource_path("setting_black.png")
-            signal_on_path = self.get_resource_path("signal_on.png")
-            signal_off_path = self.get_resource_path("signal_off.png")
-            
-            # Загружаем иконку дня
-            day_image = Image.open(day_path)
-            day_image = day_image.resize((40, 40), Image.Resampling.LANCZOS)
-            self.day_icon = ImageTk.PhotoImage(day_image)
-            
-            # Загружаем иконку ночи
-            night_image = Image.open(night_path)
-            night_image = night_image.resize((40, 40), Image.Resampling.LANCZOS)
-            self.night_icon = ImageTk.PhotoImage(night_image)
-            
-            # Загружаем иконку настроек (белую)
-            settings_image = Image.open(settings_path)
-            settings_image = settings_image.resize((20, 20), Image.Resampling.LANCZOS)
-            self.settings_icon = ImageTk.PhotoImage(settings_image)
-            
-            # Загружаем иконку настроек (черную)
-            setting_black_image = Image.open(setting_black_path)
-            setting_black_image = setting_black_image.resize((20, 20), Image.Resampling.LANCZOS)
-            self.setting_black_icon = ImageTk.PhotoImage(setting_black_image)
-            
-            # Загружаем иконки сигнала для будильников
-            signal_on_image = Image.open(signal_on_path)
-            signal_on_image = signal_on_image.resize((20, 20), Image.Resampling.LANCZOS)
-            self.signal_on_icon = ImageTk.PhotoImage(signal_on_image)
-            
-            signal_off_image = Image.open(signal_off_path)
-            signal_off_image = signal_off_image.resize((20, 20), Image.Resampling.LANCZOS)
-            self.signal_off_icon = ImageTk.PhotoImage(signal_off_image)
-            
+            # Иконки берутся из готового атласа (один файл), а при его
+            # отсутствии - из отдельных PNG с пересборкой кэша
+            images, source = assets.load_icon_images(
+                self.get_resource_path,
+                self.get_data_path(assets.ATLAS_FILENAME),
+                verify=not getattr(sys, 'frozen', False)
+            )
         except Exception as e:
             print(f"Ошибка загрузки иконок: {e}")
+            images, source = {}, 'fallback'
+        
+        self.startup_timings['decode_icons_ms'] = (time.perf_counter() - start) * 1000
+        self.startup_timings['icons_source'] = source
+        return images
+    
+    def load_icons(self, images=None):
+        """Загружает иконки дня и ночи"""
+        start = time.perf_counter()
+        if images is None:
+            images = self.decode_icons()
+        
+        if not images:
             # Создаем заглушки если иконки не найдены
             self.create_fallback_icons()
+        else:
+            # PhotoImage создаются только в главном потоке Tk
+            for name, image in images.items():
+                setattr(self, name, ImageTk.PhotoImage(image))
+        
+        self.startup_timings['load_icons_ms'] = (time.perf_counter() - start) * 1000
     
     def create_fallback_icons(self):
         """Создает простые иконки если файлы не найдены"""
@@ -232,170 +844,555 @@ class GameClock:
     def load_settings(self):
         """Загружает настройки будильника из файла"""
         try:
-            settings_path = self.get_data_path("alarms.json")
-            if os.path.exists(settings_path):
-                with open(settings_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.alarms = data.get('alarms', [])
-                    
-                    # Обновляем старые будильники, добавляя поле name
-                    for alarm in self.alarms:
-                        if 'name' not in alarm:
-                            alarm['name'] = "Будильник"  # Добавляем поле по умолчанию
+            alarms = self.store.load()
+            if alarms is not None:
+                self.alarms = [AlarmRecord.from_dict(alarm) for alarm in alarms]
+                
+                # Обновляем старые будильники, добавляя поле name
+                for alarm in self.alarms:
+                    if 'name' not in alarm:
+                        alarm['name'] = "Будильник"  # Добавляем поле по умолчанию
+                
+                # Назначаем стабильные идентификаторы старым будильникам
+                if ensure_alarm_ids(self.alarms):
+                    self.save_settings()
             else:
                 # Если файла не существует, создаем пустой
                 self.alarms = []
                 self.save_settings()
                     
         except Exception as e:
+            # Поврежденный файл (и его резервная копия) не перезаписываем
+            # пустым списком - его еще можно восстановить вручную
             print(f"Ошибка загрузки настроек: {e}")
             self.alarms = []
-            # Пытаемся создать файл с пустыми настройками
-            try:
-                self.save_settings()
-            except:
-                pass
     
     def save_settings(self):
-        """Сохраняет настройки будильника в файл"""
+        """Сохраняет настройки будильника в файл (запись выполняется в фоне)"""
         try:
-            settings_path = self.get_data_path("alarms.json")
-            with open(settings_path, 'w', encoding='utf-8') as f:
-                json.dump({'alarms': self.alarms}, f, ensure_ascii=False, indent=2)
+            self.store.save(self.alarms)
         except Exception as e:
             print(f"Ошибка сохранения настроек: {e}")
     
+    def load_profile_alarms(self):
+        """Загружает будильники дополнительных профилей (у каждого свое хранилище)"""
+        for profile in self.profiles[1:]:
+            try:
+                profile.store = open_store(self.store_backend, self.get_data_path, profile=profile.name)
+                alarms = [AlarmRecord.from_dict(alarm) for alarm in profile.store.load() or []]
+                for alarm in alarms:
+                    alarm.setdefault('name', "Будильник")
+                if ensure_alarm_ids(alarms):
+                    profile.store.save(alarms)
+                profile.set_alarms(alarms)
+            except Exception as e:
+                print(f"Ошибка загрузки будильников профиля {profile.name}: {e}")
+    
+    def find_alarm(self, alarm_id):
+        """Находит включенный будильник по id среди всех профилей"""
+        profile = self.alarm_profile(alarm_id)
+        return self.profile_index(profile).by_id[alarm_id] if profile is not None else None
+    
+    def alarm_profile(self, alarm_id):
+        """Возвращает профиль, которому принадлежит будильник (или None)"""
+        if alarm_id in self.alarm_index.by_id:
+            return self.profile
+        for profile in self.profiles[1:]:
+            if alarm_id in profile.alarm_index.by_id:
+                return profile
+        return None
+    
+    def profile_index(self, profile):
+        """Возвращает индекс будильников профиля (у основного профиля - индекс часов)"""
+        return self.alarm_index if profile is self.profile else profile.alarm_index
+    
+    def alarm_cursor(self, alarm_id):
+        """Возвращает абсолютную игровую минуту профиля будильника"""
+        profile = self.alarm_profile(alarm_id) or self.profile
+        return self.profile_index(profile).cursor
+    
+    def shutdown(self):
+        """Дописывает отложенные изменения перед выходом"""
+        if self.api is not None:
+            self.api.stop()
+        self.store.flush()
+        for profile in self.profiles[1:]:
+            if profile.store is not None:
+                profile.store.flush()
+        self.history.close()
+        self.dump_profile()
+    
+    def dump_profile(self):
+        """Записывает отчет профилирования в файл (если профилирование включено)"""
+        path = self.profiler.dump()
+        if path:
+            print(f"Профиль записан: {path}")
+    
     def create_alarm_widgets(self):
-        """Создает отдельные виджеты для активных будильников"""
-        # Удаляем старые виджеты
-        for widget in self.alarm_widgets:
-            widget.destroy()
-        self.alarm_widgets = []
+        """Синхронизирует виджеты с активными будильниками.
         
+        Создаются, удаляются и переподписываются только изменившиеся виджеты,
+        остальные (вместе с пользовательскими позициями) сохраняются.
+        """
         # Создаем виджеты только для активных будильников
-        active_alarms = [alarm for alarm in self.alarms if alarm['enabled']]
-        
-        # Позиционируем виджеты внизу под основным окном с меньшим отступом
-        main_x = self.root.winfo_x()
-        main_y = self.root.winfo_y()
-        main_height = 100
-        spacing = 5  # Уменьшенный отступ между виджетами
-        
-        for i, alarm in enumerate(active_alarms):
-            widget = AlarmWidget(
-                self.root,
-                alarm,
-                self.start_widget_drag,
-                self.stop_widget_drag,
-                self.do_widget_drag,
-                lambda e, alarm=alarm: self.stop_alarm(alarm),
-                self.signal_on_icon,
-                self.signal_off_icon
-            )
-            
-            # Позиционируем виджеты внизу под основным окном
-            widget_x = main_x
-            widget_y = main_y + main_height + spacing + (i * (40 + spacing))  # 40 - высота виджета
-            
-            widget.update_position(widget_x, widget_y)
-            self.alarm_widgets.append(widget)
+        active_alarms = [alarm for alarm in self.alarms if alarm.enabled]
+        active_ids = {alarm.id for alarm in active_alarms}
+        
+        # Удаляем виджеты выключенных и удаленных будильников
+        for alarm_id in [alarm_id for alarm_id in self.alarm_widgets if alarm_id not in active_ids]:
+            self.alarm_widgets.pop(alarm_id).destroy()
+            self.widget_churn['destroyed'] += 1
+            self.forget_alarm(alarm_id)
+        
+        widgets = {}
+        for alarm in active_alarms:
+            widget = self.alarm_widgets.get(alarm['id'])
+            if widget is None:
+                widget = self.make_alarm_widget(alarm)
+                self.widget_churn['created'] += 1
+            elif widget.set_alarm_data(alarm):
+                self.widget_churn['relabeled'] += 1
+            else:
+                self.widget_churn['reused'] += 1
+            widgets[alarm['id']] = widget
+        self.alarm_widgets = widgets
+        if self.overlay is not None:
+            self.overlay.sync(list(widgets.values()))
+        
+        # Позиционируем виджеты внизу под основным окном
+        self.update_alarm_widgets_position(*self.get_main_position())
+        
+        # Снимок для локального API (запросы не обращаются к диску)
+        if self.api is not None:
+            self.api.set_alarms(self.alarms)
     
-    def start_widget_drag(self, event):
+    def make_alarm_widget(self, alarm):
+        """Создает виджет будильника: отдельное окно или строку общего оверлея"""
+        on_click = lambda e, widget: self.stop_alarm(widget.alarm_data)
+        on_snooze = lambda e, widget: self.snooze_alarm(widget.alarm_data)
+        if self.overlay_mode == 'single':
+            if self.overlay is None:
+                self.overlay = AlarmOverlay(
+                    self.root,
+                    self.start_widget_drag,
+                    self.stop_widget_drag,
+                    self.do_widget_drag,
+                    on_click,
+                    self.signal_on_icon,
+                    self.signal_off_icon,
+                    render=self.render,
+                    on_snooze=on_snooze
+                )
+            return self.overlay.add_row(alarm)
+        
+        return AlarmWidget(
+            self.root,
+            alarm,
+            self.start_widget_drag,
+            self.stop_widget_drag,
+            self.do_widget_drag,
+            on_click,
+            self.signal_on_icon,
+            self.signal_off_icon,
+            render=self.render,
+            on_snooze=on_snooze
+        )
+    
+    def get_widget_churn(self):
+        """Возвращает счетчики созданных, удаленных и переиспользованных виджетов"""
+        return dict(self.widget_churn, alive=len(self.alarm_widgets))
+    
+    def get_main_position(self):
+        """Возвращает позицию главного окна (у Tk спрашиваем только один раз)"""
+        if self.main_pos is None:
+            self.main_pos = (self.root.winfo_x(), self.root.winfo_y())
+        return self.main_pos
+    
+    def start_widget_drag(self, event, alarm_widget):
         """Начало перемещения виджета"""
         self.drag_data["x"] = event.x_root
         self.drag_data["y"] = event.y_root
-        # Получаем Toplevel окно виджета
-        widget = event.widget
-        while not isinstance(widget, tk.Toplevel) and widget.master:
-            widget = widget.master
-        self.drag_data["widget"] = widget
+        self.drag_data["widget"] = alarm_widget.widget
+        self.drag_data["moved"] = False
+        if alarm_widget.position is None:
+            alarm_widget.position = (alarm_widget.widget.winfo_x(), alarm_widget.widget.winfo_y())
+        self.drag_data["origin"] = alarm_widget.position
     
-    def stop_widget_drag(self, event):
+    def stop_widget_drag(self, event, alarm_widget):
         """Конец перемещения виджета"""
+        self.flush_drag()
+        if self.drag_data["widget"] is not None and self.drag_data.get("moved"):
+            # Запоминаем позицию относительно главного окна - она сохранится
+            # при обновлении списка будильников и перемещении часов
+            x, y = alarm_widget.position
+            main_x, main_y = self.get_main_position()
+            alarm_widget.custom_offset = (x - main_x, y - main_y)
         self.drag_data["widget"] = None
     
-    def do_widget_drag(self, event):
+    def do_widget_drag(self, event, alarm_widget):
         """Перемещение виджета"""
         if self.drag_data["widget"]:
-            deltax = event.x_root - self.drag_data["x"]
-            deltay = event.y_root - self.drag_data["y"]
+            # Новая позиция считается от начала перетаскивания без запросов к Tk
+            origin_x, origin_y = self.drag_data["origin"]
+            new_x = origin_x + event.x_root - self.drag_data["x"]
+            new_y = origin_y + event.y_root - self.drag_data["y"]
             
-            # Получаем текущую позицию виджета
-            widget_x = self.drag_data["widget"].winfo_x()
-            widget_y = self.drag_data["widget"].winfo_y()
-            
-            # Обновляем позицию
-            new_x = widget_x + deltax
-            new_y = widget_y + deltay
-            
-            self.drag_data["widget"].geometry(f"+{new_x}+{new_y}")
-            
-            self.drag_data["x"] = event.x_root
-            self.drag_data["y"] = event.y_root
+            self.pending_widget_pos[alarm_widget] = (new_x, new_y)
+            self.drag_data["moved"] = True
+            self.schedule_drag_flush()
+    
+    def schedule_drag_flush(self):
+        """Планирует применение накопленных перемещений в следующем кадре"""
+        self.drag_stats['motion_events'] += 1
+        if self.drag_job is None:
+            self.drag_job = self.root.after(DRAG_FRAME_MS, self.flush_drag)
     
-    def play_alarm_sound(self):
-        """Проигрывает звук будильника"""
+    def flush_drag(self):
+        """Применяет накопленные перемещения одним пакетом"""
+        if self.drag_job is not None:
+            self.root.after_cancel(self.drag_job)
+            self.drag_job = None
+        if self.pending_main_pos is None and not self.pending_widget_pos:
+            return
+        
+        moves = []
+        if self.pending_main_pos is not None:
+            self.main_pos = self.pending_main_pos
+            self.pending_main_pos = None
+            moves.append((self.root, self.main_pos))
+            moves.extend(self.alarm_widgets_layout(*self.main_pos))
+        for widget, position in self.pending_widget_pos.items():
+            moves.append((widget, position))
+        self.pending_widget_pos = {}
+        
+        self.move_windows(moves)
+        self.drag_stats['frames'] += 1
+    
+    def move_windows(self, moves):
+        """Перемещает окна одним обращением к Tcl вместо вызова geometry для каждого"""
+        commands = []
+        for window, (x, y) in moves:
+            if isinstance(window, (AlarmWidget, AlarmOverlay)):
+                if window.position == (x, y):
+                    continue
+                window.position = (x, y)
+                window = window.widget
+            commands.append(f"wm geometry {window} +{x}+{y}")
+        if commands:
+            self.root.tk.eval("\n".join(commands))
+    
+    def get_drag_stats(self):
+        """Возвращает число событий движения мыши и примененных кадров"""
+        stats = dict(self.drag_stats)
+        stats['coalesced'] = stats['motion_events'] - stats['frames']
+        return stats
+    
+    def get_sound_path(self, filename):
+        """Путь к звуку: сначала папка данных (свои звуки), затем ресурсы приложения"""
+        data_path = self.get_data_path(filename)
+        if os.path.exists(data_path):
+            return data_path
+        return self.get_resource_path(filename)
+    
+    def list_sounds(self):
+        """Возвращает имена доступных звуков (mp3/wav/ogg в ресурсах и папке данных)"""
+        names = {SoundBank.DEFAULT_SOUND}
+        for folder in {os.path.dirname(self.get_resource_path("x")), os.path.dirname(self.get_data_path("x"))}:
+            try:
+                names.update(name for name in os.listdir(folder)
+                             if name.lower().endswith(('.mp3', '.wav', '.ogg')))
+            except OSError:
+                pass
+        return sorted(names)
+    
+    def play_alarm_sound(self, alarm=None):
+        """Проигрывает звук будильника (свой звук и громкость, если заданы)"""
+        alarm = alarm or {}
         try:
-            sound_path = self.get_resource_path("signal.mp3")
-            if os.path.exists(sound_path):
-                pygame.mixer.music.load(sound_path)
-                pygame.mixer.music.play(-1)  # -1 для повторения
+            channel = self.sounds.play(alarm.get('id'), alarm.get('sound'), alarm.get('volume', 1.0),
+                                       triggered_at=self.fire_started)
+            if channel is not None:
                 self.sound_playing = True
         except Exception as e:
             print(f"Ошибка воспроизведения звука: {e}")
     
+    def record_alarm_latency(self, minute_boundary):
+        """Запоминает задержку от границы игровой минуты профиля до запуска звука"""
+        if minute_boundary is None:
+            return
+        latency = self.time_source.now_epoch() - minute_boundary
+        stats = self.alarm_latency
+        stats['count'] += 1
+        stats['last'] = latency
+        stats['max'] = max(stats['max'], latency)
+        stats['total'] += latency
+    
+    def get_alarm_latency_stats(self):
+        """Возвращает статистику задержки срабатывания будильников (в секундах)"""
+        stats = dict(self.alarm_latency)
+        stats['avg'] = stats['total'] / stats['count'] if stats['count'] else 0.0
+        return stats
+    
     def stop_alarm_sound(self):
         """Останавливает звук будильника"""
         try:
-            pygame.mixer.music.stop()
+            self.sounds.stop_all()
             self.sound_playing = False
-            self.active_alarm = None
             
             # Сбрасываем подсветку всех виджетов
-            for widget in self.alarm_widgets:
+            for widget in self.alarm_widgets.values():
                 widget.set_alarm_active(False)
+            for profile in self.profiles[1:]:
+                self.render_profile_row(profile)
                 
         except Exception as e:
             print(f"Ошибка остановки звука: {e}")
     
+    def fire_alarms(self, alarm_ids, profile=None):
+        """Запускает сработавшие будильники профиля (сверх предела они ждут в очереди)"""
+        self.fire_started = time.perf_counter()
+        started = self.runtime.trigger(alarm_ids, self.profile_index(profile or self.profile).cursor)
+        if started:
+            self.on_alarms_started(started)
+    
+    def on_alarms_started(self, alarm_ids):
+        """Включает звук и мигание для начавших звонить будильников"""
+        now = self.time_source.now_epoch()
+        for alarm_id in alarm_ids:
+            profile = self.alarm_profile(alarm_id)
+            if profile is None:
+                continue
+            # Минута и задержка - по часам профиля, которому принадлежит будильник
+            index = self.profile_index(profile)
+            alarm = index.by_id[alarm_id]
+            minute_of_day = index.cursor % game_time.MINUTES_PER_DAY
+            boundary = profile.minute_boundary
+            latency_ms = (now - boundary) * 1000 if boundary is not None else 0.0
+            self.history.record_fire(alarm_id, now, minute_of_day, latency_ms)
+            if self.api is not None:
+                self.api.publish_fire(alarm, minute_of_day)
+            self.record_alarm_latency(boundary)
+            self.play_alarm_sound(alarm)
+        self.history.flush_fires()
+        if self.flash_job is None:
+            self.start_alarm_flash()
+    
+    def after_alarm_stopped(self, alarm_id, promoted, outcome='stop'):
+        """Гасит виджет остановленного будильника и запускает следующие из очереди"""
+        self.history.record_stop(alarm_id, self.time_source.now_epoch(), outcome)
+        self.sounds.stop(alarm_id)
+        widget = self.alarm_widgets.get(alarm_id)
+        if widget is not None:
+            widget.set_alarm_active(False)
+        if promoted:
+            self.fire_started = time.perf_counter()
+            self.on_alarms_started(promoted)
+        elif not self.runtime.firing:
+            self.stop_alarm_sound()
+    
     def stop_alarm(self, alarm):
         """Останавливает конкретный будильник"""
-        if self.active_alarm and self.active_alarm['time'] == alarm['time'] and self.active_alarm['name'] == alarm['name']:
-            self.stop_alarm_sound()
+        alarm_id = alarm['id']
+        if self.runtime.is_firing(alarm_id):
+            self.after_alarm_stopped(alarm_id, self.runtime.stop(alarm_id, self.alarm_cursor(alarm_id)))
     
-    def check_alarms(self, game_hour, game_minute):
-        """Проверяет срабатывание будильников"""
-        if self.active_alarm:
-            return  # Уже есть активный будильник
-            
-        current_time_str = f"{game_hour:02d}:{game_minute:02d}"
+    def snooze_alarm(self, alarm, minutes=DEFAULT_SNOOZE_MINUTES):
+        """Откладывает сигнал будильника на заданное число игровых минут"""
+        alarm_id = alarm['id']
+        if self.runtime.is_firing(alarm_id):
+            # Повтор отсчитывается по игровым минутам профиля будильника
+            profile = self.alarm_profile(alarm_id) or self.profile
+            promoted = self.runtime.snooze(alarm_id, self.profile_index(profile).cursor, minutes, profile.name)
+            self.after_alarm_stopped(alarm_id, promoted, 'snooze')
+    
+    def forget_alarm(self, alarm_id):
+        """Снимает выключенный или удаленный будильник со срабатывания"""
+        was_firing = self.runtime.is_firing(alarm_id)
+        promoted = self.runtime.forget(alarm_id, self.alarm_cursor(alarm_id))
+        if was_firing:
+            self.after_alarm_stopped(alarm_id, promoted, 'forget')
+    
+    def check_alarms(self, game_hour, game_minute, profile=None):
+        """Проверяет срабатывание будильников профиля (по умолчанию основного)"""
+        profile = profile or self.profile
+        index = self.profile_index(profile)
+        due_alarms = index.advance(game_hour * 60 + game_minute)
+        due_ids = [alarm.id for alarm in due_alarms if alarm.enabled]
+        
+        # Отложенные сигналы профиля, время которых наступило (если будильник еще включен)
+        for alarm_id in self.runtime.due_snoozes(index.cursor, profile.name):
+            if alarm_id in index.by_id:
+                due_ids.append(alarm_id)
+        
+        if due_ids:
+            self.fire_alarms(due_ids, profile)
+        return bool(due_ids)
+    
+    def get_next_alarm(self):
+        """Возвращает (время "HH:MM", будильники) ближайшего срабатывания или None"""
+        upcoming = self.alarm_index.next_alarm()
+        if upcoming is None:
+            return None
+        minute, alarms = upcoming
+        return format_game_minute(minute), list(alarms)
+    
+    def profile_is_firing(self, profile):
+        """Проверяет, звонит ли будильник профиля"""
+        return any(alarm_id in profile.alarm_index.by_id for alarm_id in self.runtime.firing)
+    
+    def stop_profile_alarms(self, profile):
+        """Останавливает звонящие будильники профиля (клик по строке профиля)"""
+        for alarm_id in list(self.runtime.firing):
+            alarm = profile.alarm_index.by_id.get(alarm_id)
+            if alarm is not None:
+                self.stop_alarm(alarm)
+        self.render_profile_row(profile)
+    
+    def start_alarm_flash(self):
+        """Запускает мигание звонящих будильников через смену иконок"""
+        self.flash_job = None
+        if not self.runtime.firing:
+            return
+        self.flash_state = not self.flash_state
+        
+        # Виджеты звонящих будильников находим по id
+        for alarm_id in self.runtime.firing:
+            widget = self.alarm_widgets.get(alarm_id)
+            if widget is not None:
+                widget.set_alarm_active(self.flash_state)
+        
+        # Строки профилей, у которых звонит будильник
+        for profile in self.profiles[1:]:
+            self.render_profile_row(profile)
+        
+        self.flash_job = self.root.after(500, self.start_alarm_flash)
+    
+    def call_in_main_thread(self, func, timeout=5.0):
+        """Выполняет func в главном потоке Tk и возвращает результат (для фоновых потоков)"""
+        done = Future()
+        self.main_thread_calls.put((func, done))
+        # Tkinter передает event_generate из чужого потока в главный
+        self.root.event_generate('<<MainThreadCall>>', when='tail')
+        return done.result(timeout)
+    
+    def run_main_thread_calls(self, event=None):
+        """Выполняет накопившиеся вызовы из фоновых потоков"""
+        while True:
+            try:
+                func, done = self.main_thread_calls.get_nowait()
+            except queue.Empty:
+                return
+            if not done.set_running_or_notify_cancel():
+                continue
+            try:
+                done.set_result(func())
+            except Exception as e:
+                done.set_exception(e)
+    
+    def apply_alarm_batch(self, operations):
+        """Применяет пакет операций над будильниками (главный поток).
+        
+        Операции: {'op': 'add', 'time': 'HH:MM', 'name': ..., 'enabled': ...},
+        {'op': 'toggle', 'id': ..., 'enabled': ...} (без enabled - переключить),
+        {'op': 'delete', 'id': ...}. Сохранение и обновление виджетов -
+        один раз на весь пакет.
+        """
+        results = []
+        changed = False
+        existing = {(alarm.get('rule') or alarm['time'], alarm['name']) for alarm in self.alarms}
+        by_id = {alarm['id']: alarm for alarm in self.alarms}
+        for operation in operations:
+            try:
+                op = operation.get('op')
+                if op == 'add':
+                    rule = str(operation.get('rule') or '').strip()
+                    minute = rule_minutes(rule)[0] if rule else parse_alarm_time(operation['time'])
+                    name = str(operation.get('name') or "Будильник").strip() or "Будильник"
+                    if (rule or format_game_minute(minute), name) in existing:
+                        raise ValueError("будильник с таким временем и названием уже существует")
+                    alarm = AlarmRecord(new_alarm_id(), minute, name, bool(operation.get('enabled', True)),
+                                        rule=rule or None)
+                    if operation.get('sound'):
+                        alarm.sound = str(operation['sound'])
+                    if 'volume' in operation:
+                        alarm.volume = max(0.0, min(1.0, float(operation['volume'])))
+                    self.alarm_index.add(alarm)
+                    self.alarms.append(alarm)
+                    existing.add((rule or alarm['time'], name))
+                    by_id[alarm['id']] = alarm
+                elif op in ('toggle', 'delete'):
+                    alarm = by_id.get(operation.get('id'))
+                    if alarm is None:
+                        raise ValueError(f"будильник {operation.get('id')} не найден")
+                    if op == 'toggle':
+                        alarm['enabled'] = bool(operation.get('enabled', not alarm['enabled']))
+                        self.alarm_index.update(alarm)
+                    else:
+                        self.alarms.remove(alarm)
+                        self.alarm_index.remove(alarm)
+                        del by_id[alarm['id']]
+                        existing.discard((alarm.get('rule') or alarm['time'], alarm['name']))
+                else:
+                    raise ValueError(f"неизвестная операция: {op}")
+                results.append({'ok': True, 'id': alarm['id']})
+                changed = True
+            except (KeyError, ValueError, TypeError, AttributeError) as e:
+                results.append({'ok': False, 'error': str(e)})
         
+        if changed:
+            self.save_settings()
+            self.create_alarm_widgets()
+            if self.settings_list is not None:
+                self.settings_list.set_alarms(self.alarms)
+        return results
+    
+    def import_alarms(self, entries, mode='merge'):
+        """Импортирует набор будильников (merge - добавить, replace - заменить).
+        
+        Набор проверяется за один проход, затем индекс перестраивается,
+        будильники сохраняются и виджеты обновляются по одному разу.
+        """
+        alarms, report = merge_alarms(self.alarms, entries, mode)
+        if report['aborted']:
+            return report
+        
+        # Замененные будильники снимаются со срабатывания
+        kept = {alarm.id for alarm in alarms}
         for alarm in self.alarms:
-            if alarm['time'] == current_time_str and alarm['enabled']:
-                if not self.sound_playing:
-                    self.active_alarm = alarm
-                    self.play_alarm_sound()
-                    self.start_alarm_flash()
-                return
+            if alarm.id not in kept:
+                self.forget_alarm(alarm.id)
+        
+        self.alarms = alarms
+        self.alarm_index.rebuild(self.alarms)
+        self.save_settings()
+        self.create_alarm_widgets()
+        if self.settings_list is not None:
+            self.settings_list.set_alarms(self.alarms)
+        return report
     
-    def start_alarm_flash(self):
-        """Запускает мигание активного будильника через смену иконок"""
-        if self.active_alarm and self.sound_playing:
-            self.flash_state = not self.flash_state
-            
-            # Находим виджет активного будильника и мигаем им
-            for widget in self.alarm_widgets:
-                if (widget.alarm_data['time'] == self.active_alarm['time'] and 
-                    widget.alarm_data['name'] == self.active_alarm['name']):
-                    widget.set_alarm_active(self.flash_state)
-            
-            self.root.after(500, self.start_alarm_flash)
+    def import_preset(self, path, mode='merge'):
+        """Импортирует будильники из файла пресета; возвращает отчет или None"""
+        try:
+            entries = read_preset(path)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка чтения пресета: {e}")
+            return None
+        return self.import_alarms(entries, mode)
+    
+    def export_preset(self, path):
+        """Экспортирует будильники в файл пресета (CSV или JSON по расширению)"""
+        try:
+            write_preset(path, self.alarms)
+            return True
+        except OSError as e:
+            print(f"Ошибка экспорта будильников: {e}")
+            return False
     
     def open_settings(self):
         """Открывает окно настроек будильника"""
         settings_window = tk.Toplevel(self.root)
         settings_window.title("Настройки будильника")
-        settings_window.geometry("350x450")
+        settings_window.geometry("350x610")
         settings_window.configure(bg='#2b2b2b')
         settings_window.attributes('-topmost', True)
         settings_window.resizable(False, False)
@@ -467,6 +1464,46 @@ class GameClock:
                                    bg='#1a1a1a', fg='white', buttonbackground='#1a1a1a')
         minute_spinbox.pack(side='left', padx=5)
         
+        # Правило повторения (необязательно): вместо времени из полей выше
+        rule_frame = tk.Frame(add_frame, bg='#2b2b2b')
+        rule_frame.pack(fill='x', pady=5)
+        
+        tk.Label(rule_frame, text="Правило:", fg='white', bg='#2b2b2b').pack(side='left')
+        rule_var = tk.StringVar()
+        tk.Entry(rule_frame, textvariable=rule_var, bg='#1a1a1a', fg='white',
+                 insertbackground='white', width=20).pack(side='left', padx=5)
+        tk.Label(add_frame, text="например 04:00-07:00/20, night-15, */30",
+                 fg='#888888', bg='#2b2b2b', font=("Arial", 8)).pack(anchor='w')
+        
+        # Звук и громкость нового будильника
+        sound_frame = tk.Frame(add_frame, bg='#2b2b2b')
+        sound_frame.pack(fill='x', pady=5)
+        
+        tk.Label(sound_frame, text="Звук:", fg='white', bg='#2b2b2b').pack(side='left')
+        sound_var = tk.StringVar(value=SoundBank.DEFAULT_SOUND)
+        sound_menu = tk.OptionMenu(sound_frame, sound_var, *self.list_sounds())
+        sound_menu.config(bg='#1a1a1a', fg='white', highlightthickness=0, width=10)
+        sound_menu.pack(side='left', padx=5)
+        
+        tk.Label(sound_frame, text="Громкость:", fg='white', bg='#2b2b2b').pack(side='left')
+        volume_var = tk.StringVar(value="100")
+        tk.Spinbox(sound_frame, from_=0, to=100, increment=10, width=4, textvariable=volume_var,
+                   bg='#1a1a1a', fg='white', buttonbackground='#1a1a1a').pack(side='left', padx=5)
+        
+        def store_alarm(alarm):
+            """Сохраняет новый будильник и обновляет список и виджеты"""
+            # Звук и громкость сохраняются, только если отличаются от стандартных
+            if sound_var.get() != SoundBank.DEFAULT_SOUND:
+                alarm.sound = sound_var.get()
+            volume = max(0, min(100, int(volume_var.get())))
+            if volume != 100:
+                alarm.volume = volume / 100
+            self.alarms.append(alarm)
+            self.alarm_index.add(alarm)
+            self.save_settings()
+            update_alarms_list()
+            self.create_alarm_widgets()  # Обновляем только изменившиеся виджеты
+        
         def add_alarm():
             """Добавляет новый будильник"""
             try:
@@ -475,20 +1512,28 @@ class GameClock:
                 name = name_var.get().strip()
                 if not name:
                     name = "Будильник"
+                
+                # Будильник по правилу компилируется сразу, чтобы показать ошибку
+                rule = rule_var.get().strip()
+                if rule:
+                    try:
+                        first_minute = rule_minutes(rule)[0]
+                    except ValueError as e:
+                        messagebox.showerror("Ошибка", str(e))
+                        return
+                    if any(alarm.rule == rule and alarm.name == name for alarm in self.alarms):
+                        messagebox.showwarning("Внимание", "Будильник с таким правилом и названием уже существует!")
+                        return
+                    store_alarm(AlarmRecord(new_alarm_id(), first_minute, name, True, rule=rule))
+                    return
                     
                 if 0 <= hour <= 23 and 0 <= minute <= 59:
-                    time_str = f"{hour:02d}:{minute:02d}"
+                    game_minute = hour * 60 + minute
                     
                     # Проверяем, нет ли уже такого будильника
-                    if not any(alarm['time'] == time_str and alarm['name'] == name for alarm in self.alarms):
-                        self.alarms.append({
-                            'time': time_str,
-                            'name': name,
-                            'enabled': True
-                        })
-                        self.save_settings()
-                        update_alarms_list()
-                        self.create_alarm_widgets()  # Пересоздаем виджеты
+                    if not any(alarm.minute == game_minute and alarm.name == name and not alarm.rule
+                               for alarm in self.alarms):
+                        store_alarm(AlarmRecord(new_alarm_id(), game_minute, name, True))
                     else:
                         messagebox.showwarning("Внимание", "Будильник с таким временем и названием уже существует!")
                 else:
@@ -506,63 +1551,93 @@ class GameClock:
         tk.Label(list_frame, text="Мои будильники:", 
                 font=("Arial", 10), fg='white', bg='#2b2b2b').pack(anchor='w')
         
-        # Создаем canvas и scrollbar для списка будильников
-        canvas = tk.Canvas(list_frame, bg='#1a1a1a', height=150)
-        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg='#1a1a1a')
+        # Фильтр и сортировка списка
+        filter_frame = tk.Frame(list_frame, bg='#2b2b2b')
+        filter_frame.pack(fill='x', pady=(0, 5))
         
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        tk.Label(filter_frame, text="Поиск:", fg='white', bg='#2b2b2b').pack(side='left')
+        filter_var = tk.StringVar()
+        tk.Entry(filter_frame, textvariable=filter_var, bg='#1a1a1a', fg='white',
+                 insertbackground='white', width=10).pack(side='left', padx=5)
         
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        sort_var = tk.StringVar(value='added')
+        for value, text in (('added', "Порядок"), ('time', "Время"), ('name', "Имя")):
+            tk.Radiobutton(filter_frame, text=text, value=value, variable=sort_var,
+                           command=lambda: alarms_list.set_sort(sort_var.get()),
+                           fg='white', bg='#2b2b2b', selectcolor='#1a1a1a',
+                           activebackground='#2b2b2b', font=("Arial", 8)).pack(side='left')
         
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # Виртуализированный список: виджеты только для видимых строк
+        list_body = tk.Frame(list_frame, bg='#2b2b2b')
+        list_body.pack(fill='both', expand=True)
         
         def update_alarms_list():
             """Обновляет список будильников в настройках"""
-            # Очищаем фрейм
-            for widget in scrollable_frame.winfo_children():
-                widget.destroy()
-            
-            if not self.alarms:
-                tk.Label(scrollable_frame, text="Нет будильников", 
-                        fg='#888888', bg='#1a1a1a').pack(pady=10)
-                return
-            
-            for i, alarm in enumerate(self.alarms):
-                alarm_frame = tk.Frame(scrollable_frame, bg='#1a1a1a')
-                alarm_frame.pack(fill='x', pady=2)
-                
-                status = "🔔" if alarm['enabled'] else "🔕"
-                tk.Label(alarm_frame, text=f"{status} {alarm['time']} - {alarm['name']}", 
-                        fg='white', bg='#1a1a1a', font=("Arial", 9)).pack(side='left')
-                
-                btn_frame = tk.Frame(alarm_frame, bg='#1a1a1a')
-                btn_frame.pack(side='right')
-                
-                tk.Button(btn_frame, text="Вкл/Выкл", command=lambda idx=i: toggle_alarm(idx),
-                         bg='#FF9800', fg='white', font=("Arial", 7)).pack(side='left', padx=2)
-                
-                tk.Button(btn_frame, text="Удалить", command=lambda idx=i: delete_alarm(idx),
-                         bg='#f44336', fg='white', font=("Arial", 7)).pack(side='left', padx=2)
+            alarms_list.set_alarms(self.alarms)
         
-        def toggle_alarm(index):
+        def toggle_alarm(alarm):
             """Включает/выключает будильник"""
-            self.alarms[index]['enabled'] = not self.alarms[index]['enabled']
+            if alarm is None:
+                return
+            alarm['enabled'] = not alarm['enabled']
+            self.alarm_index.update(alarm)
             self.save_settings()
-            update_alarms_list()
-            self.create_alarm_widgets()  # Пересоздаем виджеты
+            alarms_list.update_alarm(alarm)
+            self.create_alarm_widgets()  # Обновляем только изменившиеся виджеты
         
-        def delete_alarm(index):
+        def delete_alarm(alarm):
             """Удаляет будильник"""
-            self.alarms.pop(index)
+            if alarm is None:
+                return
+            self.alarms.remove(alarm)
+            self.alarm_index.remove(alarm)
             self.save_settings()
-            update_alarms_list()
-            self.create_alarm_widgets()  # Пересоздаем виджеты
+            alarms_list.remove_alarm(alarm)
+            self.create_alarm_widgets()  # Обновляем только изменившиеся виджеты
+        
+        alarms_list = VirtualAlarmList(list_body, toggle_alarm, delete_alarm)
+        self.settings_list = alarms_list  # открытый список (для бенчмарков и обновлений извне)
+        
+        def on_settings_destroy(event):
+            if event.widget is settings_window and self.settings_list is alarms_list:
+                self.settings_list = None
+        
+        settings_window.bind('<Destroy>', on_settings_destroy)
+        filter_var.trace_add('write', lambda *args: alarms_list.set_filter(filter_var.get()))
+        
+        # Импорт и экспорт наборов будильников
+        preset_types = [("Набор будильников", "*.json *.csv"), ("JSON", "*.json"), ("CSV", "*.csv")]
+        
+        def import_preset():
+            """Импортирует набор будильников из файла"""
+            path = filedialog.askopenfilename(parent=settings_window, title="Импорт будильников",
+                                              filetypes=preset_types)
+            if not path:
+                return
+            replace = messagebox.askyesnocancel(
+                "Импорт", "Заменить текущие будильники?\n\nДа - заменить, Нет - добавить к текущим",
+                parent=settings_window)
+            if replace is None:
+                return
+            report = self.import_preset(path, 'replace' if replace else 'merge')
+            if report is None:
+                messagebox.showerror("Ошибка", "Не удалось прочитать файл набора", parent=settings_window)
+            else:
+                messagebox.showinfo("Импорт", format_report(report), parent=settings_window)
+        
+        def export_preset():
+            """Экспортирует будильники в файл"""
+            path = filedialog.asksaveasfilename(parent=settings_window, title="Экспорт будильников",
+                                                defaultextension=".json", filetypes=preset_types)
+            if path and not self.export_preset(path):
+                messagebox.showerror("Ошибка", "Не удалось записать файл", parent=settings_window)
+        
+        preset_frame = tk.Frame(settings_window, bg='#2b2b2b')
+        preset_frame.pack(pady=(10, 0))
+        tk.Button(preset_frame, text="Импорт...", command=import_preset,
+                 bg='#455A64', fg='white', width=12).pack(side='left', padx=5)
+        tk.Button(preset_frame, text="Экспорт...", command=export_preset,
+                 bg='#455A64', fg='white', width=12).pack(side='left', padx=5)
         
         # Кнопка закрытия
         tk.Button(settings_window, text="Закрыть", command=settings_window.destroy,
@@ -580,7 +1655,8 @@ class GameClock:
         time_frame.pack(expand=True)
         
         # Метка для иконки дня/ночи
-        self.icon_label = tk.Label(time_frame, image=self.day_icon, bg='#2b2b2b')
+        # (иконки назначаются после их загрузки, на второй стадии запуска)
+        self.icon_label = tk.Label(time_frame, bg='#2b2b2b')
         self.icon_label.pack(side='left', padx=(0, 10))
         
         # Метка для игрового времени
@@ -596,7 +1672,6 @@ class GameClock:
         # Кнопка настроек (маленькая иконка справа от времени)
         self.settings_btn = tk.Label(
             time_frame,
-            image=self.settings_icon,
             bg='#2b2b2b',
             cursor="hand2"
         )
@@ -607,6 +1682,15 @@ class GameClock:
         self.settings_btn.bind("<Enter>", lambda e: self.settings_btn.config(bg='#3b3b3b'))
         self.settings_btn.bind("<Leave>", lambda e: self.settings_btn.config(bg='#2b2b2b'))
         
+        # Строки дополнительных профилей: название, время и ночь (☾);
+        # клик останавливает звонящие будильники профиля
+        self.profile_labels = {}
+        for profile in self.profiles[1:]:
+            label = tk.Label(main_frame, font=("Arial", 9), fg='#cccccc', bg='#2b2b2b', anchor='w')
+            label.pack(fill='x')
+            label.bind("<Button-1>", lambda e, profile=profile: self.stop_profile_alarms(profile))
+            self.profile_labels[profile.name] = label
+        
         # Кнопка закрытия (в углу)
         close_btn = tk.Label(
             self.root, 
@@ -626,22 +1710,24 @@ class GameClock:
     def bind_drag_events(self):
         """Добавляет возможность перемещения окна"""
         def start_move(event):
-            self.x = event.x
-            self.y = event.y
+            self.x = event.x_root
+            self.y = event.y_root
+            self.drag_origin = self.get_main_position()
         
         def stop_move(event):
+            self.flush_drag()
             self.x = None
             self.y = None
         
         def do_move(event):
-            deltax = event.x - self.x
-            deltay = event.y - self.y
-            x = self.root.winfo_x() + deltax
-            y = self.root.winfo_y() + deltay
-            self.root.geometry(f"+{x}+{y}")
-            
-            # Перемещаем все виджеты будильников вместе с основным окном
-            self.update_alarm_widgets_position(x, y)
+            if self.x is None:
+                return
+            # Позиция считается от начала перетаскивания без запросов к Tk;
+            # главное окно и все виджеты будильников сдвигаются раз в кадр
+            x = self.drag_origin[0] + event.x_root - self.x
+            y = self.drag_origin[1] + event.y_root - self.y
+            self.pending_main_pos = (x, y)
+            self.schedule_drag_flush()
         
         # Привязываем события ко всему окну кроме кнопки закрытия
         self.root.bind("<ButtonPress-1>", start_move)
@@ -657,58 +1743,165 @@ class GameClock:
         self.icon_label.bind("<ButtonRelease-1>", stop_move)
         self.icon_label.bind("<B1-Motion>", do_move)
     
-    def update_alarm_widgets_position(self, main_x, main_y):
-        """Обновляет позиции всех виджетов будильников относительно главного окна"""
-        main_height = 100
+    def alarm_widgets_layout(self, main_x, main_y):
+        """Вычисляет позиции виджетов будильников относительно главного окна"""
+        main_height = self.main_height
         spacing = 5  # Уменьшенный отступ
         
-        for i, widget in enumerate(self.alarm_widgets):
+        # Виджеты, перемещенные пользователем, сохраняют свое смещение,
+        # остальные выстраиваются в столбик под основным окном
+        if self.overlay is not None:
+            # Один оверлей для всех будильников двигается как одно окно
+            if not self.alarm_widgets:
+                return []
+            if self.overlay.custom_offset is not None:
+                offset_x, offset_y = self.overlay.custom_offset
+                return [(self.overlay, (main_x + offset_x, main_y + offset_y))]
+            return [(self.overlay, (main_x, main_y + main_height + spacing))]
+        
+        layout = []
+        i = 0
+        for widget in self.alarm_widgets.values():
+            if widget.custom_offset is not None:
+                layout.append((widget, (main_x + widget.custom_offset[0], main_y + widget.custom_offset[1])))
+                continue
             widget_x = main_x
             widget_y = main_y + main_height + spacing + (i * (40 + spacing))  # 40 - высота виджета
-            widget.update_position(widget_x, widget_y)
+            layout.append((widget, (widget_x, widget_y)))
+            i += 1
+        return layout
+    
+    def update_alarm_widgets_position(self, main_x, main_y):
+        """Обновляет позиции всех виджетов будильников относительно главного окна"""
+        self.move_windows(self.alarm_widgets_layout(main_x, main_y))
+    
+    def get_game_clock(self):
+        """Возвращает (реальное время, час, минута) основного профиля (безопасно из других потоков)"""
+        now = self.time_source.now()
+        return (now, *self.profile.game_time(now, game_time.sync_base_for(now)))
     
     def real_time_to_game_time(self, real_time):
-        """Конвертирует реальное время в игровое с синхронизацией"""
-        # Вычисляем разницу от базового времени синхронизации
-        time_diff = real_time - self.sync_base
-        total_seconds = time_diff.total_seconds()
-        
-        # Конвертируем секунды в игровое время
-        # 2.5 реальных минуты = 150 секунд = 1 игровой час
-        game_hours_passed = (total_seconds / 150) % 24
-        game_hour = int(game_hours_passed)
-        game_minute = int((game_hours_passed - game_hour) * 60)
-        
-        return game_hour, game_minute
+        """Конвертирует реальное время в игровое время основного профиля"""
+        return self.profile.game_time(real_time, self.sync_base)
     
-    def update_time(self):
-        """Обновляет время на экране"""
-        current_time = datetime.now()
-        
-        # Конвертируем в игровое время
-        game_hour, game_minute = self.real_time_to_game_time(current_time)
+    def ms_until_next_game_minute(self, real_time):
+        """Вычисляет задержку (мс) до ближайшей границы игровой минуты"""
+        # Ближайшая граница среди всех профилей - один таймер на всех
+        seconds = self.scheduler.seconds_until_next(real_time, self.sync_base)
+        # +1 мс, чтобы гарантированно проснуться уже после границы
+        delay = math.ceil(seconds * 1000) + 1
+        # Никогда не спим дольше одной игровой минуты (страховка от скачков часов)
+        return max(1, min(delay, math.ceil(self.scheduler.max_sleep_seconds() * 1000) + 1))
+    
+    def get_tick_stats(self):
+        """Возвращает статистику пробуждений планировщика"""
+        elapsed = max(time.monotonic() - self.tick_started, 1e-6)
+        return {
+            'wakeups': self.tick_stats['wakeups'],
+            'minute_ticks': self.tick_stats['minute_ticks'],
+            'wakeups_per_hour': self.tick_stats['wakeups'] * 3600 / elapsed,
+            'legacy_wakeups_per_hour': 3600 * 1000 / LEGACY_POLL_MS,
+        }
+    
+    def on_game_minute(self, current_time, game_hour, game_minute):
+        """Смена игровой минуты основного профиля: время, иконка и будильники"""
+        tick_start = time.perf_counter()
+        self.tick_stats['minute_ticks'] += 1
+        self.profile.minute_boundary = self.profile.minute_start(current_time, self.sync_base)
         
         # Обновляем игровое время
         game_time_str = f"{game_hour:02d}:{game_minute:02d}"
-        self.game_time_label.config(text=game_time_str)
+        self.render.set(self.game_time_label, text=game_time_str)
         
         # Обновляем иконку (ночь с 00:00 до 06:00, день с 06:00 до 00:00)
-        if 0 <= game_hour < 6:
-            self.icon_label.config(image=self.night_icon)
+        if game_time.is_night(game_hour):
+            self.render.set(self.icon_label, image=self.night_icon)
         else:
-            self.icon_label.config(image=self.day_icon)
+            self.render.set(self.icon_label, image=self.day_icon)
         
         # Проверяем будильники
         self.check_alarms(game_hour, game_minute)
         
-        # Проверяем, не нужно ли обновить базу синхронизации (на случай смены часа)
-        if current_time.minute == 0 and current_time.second == 0:
-            self.sync_base = current_time.replace(second=0, microsecond=0)
+        if self.api is not None:
+            self.api.publish_minute(game_hour, game_minute)
         
-        # Обновляем каждые 100 мс для плавности
-        self.root.after(100, self.update_time)
+        real_time = current_time.timestamp()
+        self.history.record_tick(real_time, game_hour * 60 + game_minute,
+                                 (real_time - self.profile.minute_boundary) * 1000,
+                                 (time.perf_counter() - tick_start) * 1000)
+        self.history.flush()
+    
+    def on_profile_minute(self, profile, current_time, game_hour, game_minute):
+        """Смена игровой минуты дополнительного профиля: строка и будильники профиля"""
+        profile.minute_boundary = profile.minute_start(current_time, self.sync_base)
+        self.render_profile_row(profile)
+        if self.check_alarms(game_hour, game_minute, profile):
+            self.render_profile_row(profile)
+    
+    def render_profile_row(self, profile):
+        """Отрисовывает строку профиля: название, время, ночь и подсветку сигнала"""
+        label = self.profile_labels.get(profile.name)
+        if label is None or profile.last_game_time is None:
+            return
+        game_hour, game_minute = profile.last_game_time
+        night = " ☾" if game_time.is_night(game_hour) else ""
+        firing = self.profile_is_firing(profile)
+        self.render.set(label, text=f"{profile.name}  {game_hour:02d}:{game_minute:02d}{night}",
+                        fg='#ff4444' if firing and self.flash_state else '#cccccc')
+    
+    def update_time(self):
+        """Обновляет время на экране"""
+        current_time = self.time_source.now()
+        self.tick_stats['wakeups'] += 1
+        
+        # База синхронизации - всегда начало текущего реального часа
+        # (пересчитывается на каждом тике, поэтому смена часа не пропускается)
+        self.sync_base = game_time.sync_base_for(current_time)
+        
+        # Вся поминутная работа выполняется один раз на игровую минуту профиля
+        for profile, game_hour, game_minute in self.scheduler.due(current_time, self.sync_base):
+            if profile is self.profile:
+                self.on_game_minute(current_time, game_hour, game_minute)
+            else:
+                self.on_profile_minute(profile, current_time, game_hour, game_minute)
+        
+        # Засыпаем до следующей границы игровой минуты (или опрашиваем с заданным периодом)
+        if self.tick_resolution_ms:
+            delay = self.tick_resolution_ms
+        else:
+            delay = self.ms_until_next_game_minute(current_time)
+        self.tick_job = self.root.after(delay, self.update_time)
+
+def parse_args(argv=None):
+    """Разбирает параметры командной строки"""
+    parser = argparse.ArgumentParser(description="Игровые часы Russian Fishing 4")
+    parser.add_argument('--store', choices=STORE_BACKENDS,
+                        default=os.environ.get('RF4_CLOCK_STORE', 'json'),
+                        help="хранилище будильников (по умолчанию alarms.json)")
+    parser.add_argument('--overlay', choices=('windows', 'single'), default='windows',
+                        help="отображение будильников: окно на каждый будильник "
+                             "или все строками в одном окне")
+    parser.add_argument('--max-firing', type=int, default=None,
+                        help="сколько будильников может звонить одновременно "
+                             "(остальные ждут в очереди; по умолчанию без ограничения)")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_FILENAME,
+                        default=os.environ.get('RF4_CLOCK_PROFILE'),
+                        help="профилировать главный цикл и записать отчет в файл "
+                             f"(по умолчанию {PROFILE_FILENAME}; также RF4_CLOCK_PROFILE)")
+    parser.add_argument('--api-port', type=int,
+                        default=os.environ.get('RF4_CLOCK_API_PORT'),
+                        help="включить локальный HTTP/JSON API на 127.0.0.1 и указанном порту "
+                             "(также RF4_CLOCK_API_PORT)")
+    parser.add_argument('--tick-ms', type=int, default=None,
+                        help="опрашивать часы с фиксированным периодом (мс) вместо "
+                             "пробуждения на границе игровой минуты")
+    args = parser.parse_args(argv)
+    if args.profile == '1':
+        args.profile = PROFILE_FILENAME
+    return args
 
 def main():
+    args = parse_args()
     root = tk.Tk()
     
     # Устанавливаем прозрачность
@@ -717,8 +1910,11 @@ def main():
     # Всегда поверх всех окон
     root.attributes('-topmost', True)
     
-    app = GameClock(root)
+    app = GameClock(root, tick_resolution_ms=args.tick_ms, store_backend=args.store,
+                    overlay_mode=args.overlay, max_firing=args.max_firing,
+                    profile=args.profile, api_port=args.api_port)
     root.mainloop()
+    app.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""Движок игрового времени без зависимостей от Tkinter и pygame.
+
+2.5 реальных минуты = 150 секунд = 1 игровой час, отсчет ведется от базы
+синхронизации (начала текущего реального часа). Пакетное API использует
+NumPy, если он установлен.
+"""
+import math
+import time
+from datetime import datetime
+
+# 2.5 реальных минуты = 150 секунд = 1 игровой час
+GAME_HOUR_SECONDS = 150
+MINUTES_PER_DAY = 24 * 60
+
+# Точка отсчета скоростей, при которых реальный час не вмещает целое число игровых суток
+FIXED_EPOCH = 0.0
+
+# Ночь с 00:00 до 06:00, день с 06:00 до 00:00
+NIGHT_END_HOUR = 6
+
+
+def _to_epoch(value):
+    """Переводит datetime или число (секунды эпохи) в секунды эпохи"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def _numpy():
+    """Импортирует NumPy при первом пакетном вызове (обычным часам он не нужен)"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Для пакетной конвертации требуется NumPy")
+    return numpy
+
+
+def sync_base_for(real_time):
+    """Возвращает базу синхронизации - начало реального часа"""
+    return real_time.replace(minute=0, second=0, microsecond=0)
+
+
+def time_anchor(sync_base, hour_seconds=GAME_HOUR_SECONDS):
+    """Возвращает точку отсчета игрового времени для скорости hour_seconds.
+
+    Если в реальном часе целое число игровых суток, отсчет идет от базы
+    синхронизации (начала реального часа). Иначе - от фиксированной эпохи:
+    от начала часа время прыгало бы на каждой смене реального часа.
+    """
+    days = 3600 / (hour_seconds * 24)
+    if days >= 1 and abs(days - round(days)) < 1e-9:
+        return sync_base
+    return FIXED_EPOCH
+
+
+def is_night(game_hour):
+    """Проверяет, является ли игровой час ночным"""
+    return 0 <= game_hour < NIGHT_END_HOUR
+
+
+def game_minutes_since(real_time, sync_base, hour_seconds=GAME_HOUR_SECONDS):
+    """Возвращает число целых игровых минут, прошедших от базы синхронизации"""
+    elapsed = _to_epoch(real_time) - _to_epoch(sync_base)
+    return math.floor(elapsed / (hour_seconds / 60))
+
+
+def real_time_to_game_time(real_time, sync_base, hour_seconds=GAME_HOUR_SECONDS):
+    """Конвертирует реальное время в игровое: возвращает (час, минута)"""
+    minute_of_day = game_minutes_since(real_time, sync_base, hour_seconds) % MINUTES_PER_DAY
+    return divmod(minute_of_day, 60)
+
+
+def seconds_until_next_game_minute(real_time, sync_base, hour_seconds=GAME_HOUR_SECONDS):
+    """Возвращает число реальных секунд до ближайшей границы игровой минуты"""
+    minute_seconds = hour_seconds / 60
+    elapsed = _to_epoch(real_time) - _to_epoch(sync_base)
+    next_boundary = (math.floor(elapsed / minute_seconds) + 1) * minute_seconds
+    return next_boundary - elapsed
+
+
+def game_minute_start(real_time, sync_base, hour_seconds=GAME_HOUR_SECONDS):
+    """Возвращает момент (секунды эпохи) начала текущей игровой минуты"""
+    minutes = game_minutes_since(real_time, sync_base, hour_seconds)
+    return _to_epoch(sync_base) + minutes * (hour_seconds / 60)
+
+
+def next_real_instants(game_hour, game_minute, after, sync_base, count=1,
+                       hour_seconds=GAME_HOUR_SECONDS):
+    """Возвращает ближайшие count реальных моментов (datetime) начала игровой минуты.
+
+    Учитываются моменты не раньше after.
+    """
+    if not (0 <= game_hour <= 23 and 0 <= game_minute <= 59):
+        raise ValueError(f"Некорректное игровое время: {game_hour}:{game_minute}")
+    minute_seconds = hour_seconds / 60
+    base = _to_epoch(sync_base)
+    first = math.ceil((_to_epoch(after) - base) / minute_seconds)
+    first += (game_hour * 60 + game_minute - first) % MINUTES_PER_DAY
+    return [
+        datetime.fromtimestamp(base + (first + i * MINUTES_PER_DAY) * minute_seconds)
+        for i in range(count)
+    ]
+
+
+def game_time_batch(epochs, sync_base, hour_seconds=GAME_HOUR_SECONDS):
+    """Пакетно конвертирует массив секунд эпохи в игровое время.
+
+    Возвращает массивы (часы, минуты, флаг ночи).
+    """
+    np = _numpy()
+    elapsed = np.asarray(epochs, dtype=np.float64) - _to_epoch(sync_base)
+    minute_of_day = np.floor(elapsed / (hour_seconds / 60)).astype(np.int64) % MINUTES_PER_DAY
+    hours, minutes = np.divmod(minute_of_day, 60)
+    return hours, minutes, hours < NIGHT_END_HOUR
+
+
+def real_instants_batch(game_hour, game_minute, after, sync_base, count,
+                        hour_seconds=GAME_HOUR_SECONDS):
+    """Пакетная версия next_real_instants: возвращает массив секунд эпохи"""
+    np = _numpy()
+    first = next_real_instants(game_hour, game_minute, after, sync_base, 1, hour_seconds)[0]
+    day_seconds = MINUTES_PER_DAY * hour_seconds / 60
+    return first.timestamp() + np.arange(count, dtype=np.float64) * day_seconds
+
+
+def iter_game_minutes(start, end, sync_base, hour_seconds=GAME_HOUR_SECONDS):
+    """Лениво перебирает границы игровых минут в реальном интервале [start, end).
+
+    Выдает кортежи (datetime, час, минута, ночь) по одному, не строя
+    весь диапазон в памяти.
+    """
+    minute_seconds = hour_seconds / 60
+    base = _to_epoch(sync_base)
+    end_epoch = _to_epoch(end)
+    index = math.ceil((_to_epoch(start) - base) / minute_seconds)
+    while True:
+        instant = base + index * minute_seconds
+        if instant >= end_epoch:
+            return
+        game_hour, game_minute = divmod(index % MINUTES_PER_DAY, 60)
+        yield (datetime.fromtimestamp(instant), game_hour, game_minute,
+               is_night(game_hour))
+        index += 1
+
+
+
+class MonotonicTimeSource:
+    """Источник времени на основе time.monotonic(), привязанный к системным часам.
+
+    Между пересинхронизациями время не зависит от подстройки системных часов.
+    Пересинхронизация выполняется по расписанию и при обнаружении скачка
+    (NTP, сон/пробуждение, ручная смена времени).
+    """
+
+    def __init__(self, resync_interval=60.0, jump_threshold=1.0,
+                 wall_clock=time.time, monotonic=time.monotonic):
+        self.resync_interval = resync_interval  # плановая пересинхронизация (с)
+        self.jump_threshold = jump_threshold    # допустимое расхождение (с)
+        self.wall_clock = wall_clock
+        self.monotonic = monotonic
+        self.resync_count = 0
+        self.jump_count = 0
+        self.last_jump = 0.0
+        self.resync()
+
+    def resync(self):
+        """Заново привязывает монотонное время к системным часам"""
+        self.anchor_wall = self.wall_clock()
+        self.anchor_mono = self.monotonic()
+        self.resync_count += 1
+
+    def now_epoch(self):
+        """Возвращает текущее время в секундах эпохи"""
+        mono = self.monotonic()
+        projected = self.anchor_wall + (mono - self.anchor_mono)
+        wall = self.wall_clock()
+        if abs(wall - projected) > self.jump_threshold:
+            # Скачок системных часов - сразу пересинхронизируемся
+            self.jump_count += 1
+            self.last_jump = wall - projected
+            self.resync()
+            return self.anchor_wall
+        if mono - self.anchor_mono >= self.resync_interval:
+            self.resync()
+            return self.anchor_wall
+        return projected
+
+    def now(self):
+        """Возвращает текущее время как datetime"""
+        return datetime.fromtimestamp(self.now_epoch())
+
+    def get_stats(self):
+        """Возвращает статистику пересинхронизаций"""
+        return {
+            'resyncs': self.resync_count,
+            'jumps': self.jump_count,
+            'last_jump_seconds': self.last_jump,
+        }
+
+
+class SimulatedTimeSource:
+    """Управляемый источник времени для симуляции (тот же интерфейс, что у MonotonicTimeSource).
+
+    elapsed - виртуальное монотонное время от старта (по нему идут таймеры),
+    системные часы = старт + elapsed + offset; скачок часов меняет только offset.
+    """
+
+    def __init__(self, start):
+        self.start = _to_epoch(start)
+        self.elapsed = 0.0
+        self.offset = 0.0
+        self.resync_count = 0
+        self.jump_count = 0
+        self.last_jump = 0.0
+
+    def advance_to(self, elapsed):
+        """Переводит монотонное время вперед (назад не идет)"""
+        self.elapsed = max(self.elapsed, elapsed)
+
+    def jump(self, seconds):
+        """Скачок системных часов (NTP, сон, ручная смена времени)"""
+        self.offset += seconds
+        self.jump_count += 1
+        self.last_jump = seconds
+
+    def now_epoch(self):
+        """Возвращает текущее время в секундах эпохи"""
+        return self.start + self.elapsed + self.offset
+
+    def now(self):
+        """Возвращает текущее время как datetime"""
+        return datetime.fromtimestamp(self.now_epoch())
+
+    def get_stats(self):
+        """Возвращает статистику скачков"""
+        return {
+            'resyncs': self.resync_count,
+            'jumps': self.jump_count,
+            'last_jump_seconds': self.last_jump,
+        }
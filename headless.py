@@ -0,0 +1,177 @@
+"""Часы без окна: игровое время и будильники без Tkinter и PIL.
+
+Для маломощных машин и терминала без дисплея. События выводятся строками
+JSON в stdout, при --sound сработавший будильник проигрывает свой звук
+(по умолчанию signal.mp3).
+Будильники берутся из того же хранилища, что и у оконной версии, время -
+по основному профилю из profiles.json (сдвиг и скорость):
+
+    python headless.py [--store sqlite] [--sound] [--ticks] [--data-dir DIR]
+
+SIGHUP перечитывает будильники (Linux/macOS).
+"""
+import time
+
+# Момент запуска процесса - для замера времени старта
+PROCESS_START = time.perf_counter()
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+
+import game_time
+from alarms import AlarmIndex, AlarmRecord, ensure_alarm_ids, format_game_minute
+from history import History
+from profiles import load_profiles, ProfileScheduler, PROFILES_FILENAME
+from storage import open_store, STORE_BACKENDS
+
+
+def get_base_path():
+    """Папка с EXE или текущая папка (как у оконной версии)"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.abspath(".")
+
+
+class HeadlessClock:
+    """Часы с будильниками без интерфейса: один цикл сна до границы игровой минуты"""
+
+    def __init__(self, store_backend='json', data_dir=None, sound=False, ticks=False,
+                 out=None, time_source=None):
+        self.data_dir = data_dir or get_base_path()
+        self.out = out or sys.stdout
+        self.ticks = ticks  # выводить событие на каждую игровую минуту
+        self.time_source = time_source or game_time.MonotonicTimeSource()
+        # Время основного профиля - как у оконной версии
+        self.profile = load_profiles(os.path.join(self.data_dir, PROFILES_FILENAME))[0]
+        self.scheduler = ProfileScheduler([self.profile])
+        self.last_game_time = None
+        self.fired = 0
+
+        # Звук (pygame) импортируется только по запросу
+        self.sounds = None
+        if sound:
+            from audio import AudioBackend, SoundBank
+            audio = AudioBackend()
+            audio.start()
+            self.sounds = SoundBank(audio, self.get_sound_path)
+
+        self.store = open_store(store_backend, lambda filename: os.path.join(self.data_dir, filename))
+        self.history = History(lambda filename: os.path.join(self.data_dir, filename))
+        self.alarms = []
+        self.load_alarms()
+        self.startup_ms = (time.perf_counter() - PROCESS_START) * 1000
+
+    def emit(self, event, **fields):
+        """Выводит событие строкой JSON"""
+        print(json.dumps(dict(event=event, **fields), ensure_ascii=False), file=self.out, flush=True)
+
+    def load_alarms(self):
+        """Загружает будильники и перестраивает индекс"""
+        try:
+            alarms = [AlarmRecord.from_dict(alarm) for alarm in self.store.load() or []]
+            for alarm in alarms:
+                alarm.setdefault('name', "Будильник")
+            if ensure_alarm_ids(alarms):
+                self.store.save(alarms)
+            self.alarms = alarms
+        except Exception as e:
+            print(f"Ошибка загрузки настроек: {e}", file=sys.stderr)
+        self.alarm_index = AlarmIndex(self.alarms)
+
+    def tick(self):
+        """Обрабатывает текущий момент; возвращает секунды до следующей игровой минуты"""
+        now = self.time_source.now()
+        sync_base = game_time.sync_base_for(now)
+        game_hour, game_minute = self.profile.game_time(now, sync_base)
+
+        if (game_hour, game_minute) != self.last_game_time:
+            tick_start = time.perf_counter()
+            self.last_game_time = (game_hour, game_minute)
+            real_time = now.timestamp()
+            lateness_ms = (real_time - self.profile.minute_start(now, sync_base)) * 1000
+            if self.ticks:
+                self.emit('minute', time=f"{game_hour:02d}:{game_minute:02d}",
+                          is_night=game_time.is_night(game_hour))
+            minute_of_day = game_hour * 60 + game_minute
+            for alarm in self.alarm_index.advance(minute_of_day):
+                if alarm.enabled:
+                    self.fire(alarm, now, minute_of_day)
+                    self.history.record_fire(alarm.id, real_time, minute_of_day, lateness_ms)
+            self.history.record_tick(real_time, game_hour * 60 + game_minute, lateness_ms,
+                                     (time.perf_counter() - tick_start) * 1000)
+            self.history.flush()
+
+        return self.scheduler.seconds_until_next(now, sync_base)
+
+    def get_sound_path(self, filename):
+        """Путь к звуку: сначала папка данных, затем ресурсы приложения"""
+        data_path = os.path.join(self.data_dir, filename)
+        if os.path.exists(data_path):
+            return data_path
+        return os.path.join(getattr(sys, '_MEIPASS', os.path.abspath(".")), filename)
+
+    def fire(self, alarm, now, minute_of_day):
+        """Сообщает о срабатывании будильника (время - игровая минута срабатывания)"""
+        triggered_at = time.perf_counter()
+        self.fired += 1
+        self.emit('alarm', id=alarm.get('id'), time=format_game_minute(minute_of_day), name=alarm.get('name'),
+                  real_time=now.isoformat(timespec='seconds'))
+        if self.sounds is not None:
+            self.play_sound(alarm, triggered_at)
+
+    def play_sound(self, alarm, triggered_at):
+        """Проигрывает сигнал будильника один раз (свой звук и громкость, если заданы)"""
+        try:
+            self.sounds.play(alarm.get('id'), alarm.get('sound'), alarm.get('volume', 1.0),
+                             loops=0, triggered_at=triggered_at)
+        except Exception as e:
+            print(f"Ошибка воспроизведения звука: {e}", file=sys.stderr)
+
+    def run(self):
+        """Основной цикл: сон до границы игровой минуты"""
+        self.emit('start', alarms=len(self.alarms), startup_ms=round(self.startup_ms, 1))
+        if self.sounds is not None:
+            # Звук декодируется заранее, чтобы первое срабатывание не ждало диска
+            threading.Thread(target=self.sounds.preload, name="sound-preload", daemon=True).start()
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.load_alarms())
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            while True:
+                # +1 мс, чтобы гарантированно проснуться уже после границы
+                time.sleep(self.tick() + 0.001)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.store.flush()
+            self.history.close()
+            stats = {'fired': self.fired}
+            if self.sounds is not None:
+                stats['sound_latency'] = self.sounds.get_stats()
+            self.emit('stop', **stats)
+
+
+def parse_args(argv=None):
+    """Разбирает параметры командной строки"""
+    parser = argparse.ArgumentParser(description="Игровые часы Russian Fishing 4 без окна")
+    parser.add_argument('--store', choices=STORE_BACKENDS,
+                        default=os.environ.get('RF4_CLOCK_STORE', 'json'),
+                        help="хранилище будильников (по умолчанию alarms.json)")
+    parser.add_argument('--data-dir', default=None,
+                        help="папка с alarms.json/alarms.db и profiles.json (по умолчанию текущая)")
+    parser.add_argument('--sound', action='store_true', help="проигрывать signal.mp3 при срабатывании")
+    parser.add_argument('--ticks', action='store_true', help="выводить событие на каждую игровую минуту")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    HeadlessClock(args.store, data_dir=args.data_dir, sound=args.sound, ticks=args.ticks).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""История срабатываний будильников и тиков часов.
+
+Записи фиксированного размера хранятся в кольцевом буфере в памяти и в
+двоичном файле той же емкости, поэтому память и диск не растут, сколько бы
+недель ни работали часы: новые записи вытесняют самые старые.
+
+    history_fires.bin  срабатывания: время, игровая минута, задержка, длительность сигнала
+    history_ticks.bin  тики игровых минут: опоздание и длительность обработки
+
+Выгрузка в CSV/JSON:
+
+    python history.py [--ticks] [--format csv|json] [--since 2024-05-01T18:00]
+                      [--until ...] [--game 04:00-07:00] [--output FILE]
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import struct
+import sys
+import threading
+from datetime import datetime
+
+from alarms import parse_alarm_time, format_game_minute
+
+FIRES_FILENAME = 'history_fires.bin'
+TICKS_FILENAME = 'history_ticks.bin'
+
+# Срабатывание: реальное время (с эпохи), минута суток, id будильника,
+# задержка от границы минуты (мс), время до остановки (мс, NaN - еще звонит), чем закончилось
+FIRE_RECORD = struct.Struct('<dH16sffB')
+# Тик: реальное время (с эпохи), минута суток, опоздание от границы (мс), длительность обработки (мс)
+TICK_RECORD = struct.Struct('<dHff')
+
+FIRE_FIELDS = ('real_time', 'game_time', 'id', 'latency_ms', 'duration_ms', 'outcome')
+TICK_FIELDS = ('real_time', 'game_time', 'lateness_ms', 'duration_ms')
+
+# Чем закончился сигнал
+OUTCOMES = ('', 'stop', 'snooze', 'forget')
+
+FIRE_CAPACITY = 4096   # около 160 КБ
+TICK_CAPACITY = 8192   # около 150 КБ, почти 6 реальных часов тиков
+
+
+class RingLog:
+    """Кольцевой журнал записей одного формата в памяти с копией в файле.
+
+    Первое поле записи - реальное время; записи добавляются по времени,
+    поэтому диапазон по реальному времени ищется двоичным поиском. Если
+    системные часы переводились назад и порядок в буфере нарушен, диапазон
+    ищется перебором, пока такие записи не вытеснены.
+    Файл: заголовок и емкость * размер записи байт; на диск пишутся только
+    изменившиеся записи, каждые flush_every добавлений и при flush().
+    """
+
+    MAGIC = b'RF4H'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHIQ')  # метка, версия, размер записи, емкость, всего записано
+
+    def __init__(self, record, capacity, path=None, flush_every=1):
+        self.record = record
+        self.capacity = capacity
+        self.path = path
+        self.flush_every = flush_every
+        self.lock = threading.RLock()
+        self.buffer = bytearray(record.size * capacity)
+        self.total = 0          # записей за все время (номер следующей записи)
+        self.dirty = set()      # номера слотов, еще не записанных в файл
+        self.unordered = None   # номер последней записи раньше предыдущей (скачок часов назад)
+        self.file = None
+        if path:
+            self._open()
+
+    def _open(self):
+        """Открывает файл журнала и читает записи (несовместимый файл начинается заново)"""
+        try:
+            if os.path.exists(self.path):
+                self.file = open(self.path, 'r+b')
+                header = self.file.read(self.HEADER.size)
+                magic, version, size, capacity, total = (
+                    self.HEADER.unpack(header) if len(header) == self.HEADER.size else (None,) * 5)
+                if (magic, version, size) != (self.MAGIC, self.VERSION, self.record.size):
+                    print(f"Ошибка чтения истории {self.path}: несовместимый формат, история начата заново")
+                elif capacity == self.capacity:
+                    data = self.file.read(len(self.buffer))
+                    self.buffer[:len(data)] = data
+                    self.total = total
+                    self._check_order(self.first, self.total)
+                    return
+                else:
+                    # Другая емкость: переносим самые новые записи по порядку
+                    data = self.file.read(size * capacity)
+                    kept = min(total, capacity, self.capacity)
+                    for slot, seq in enumerate(range(total - kept, total)):
+                        offset = seq % capacity * size
+                        self.buffer[slot * size:(slot + 1) * size] = data[offset:offset + size]
+                    self.total = kept
+                    self.dirty.update(range(kept))
+                    self._check_order(0, kept)
+            else:
+                self.file = open(self.path, 'w+b')
+            self.file.truncate(self.HEADER.size + len(self.buffer))
+            self._write_header()
+            self.flush()
+        except OSError as e:
+            print(f"Ошибка открытия истории {self.path}: {e}")
+            self.file = None
+
+    def _write_header(self):
+        self.file.seek(0)
+        self.file.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.record.size, self.capacity, self.total))
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def first(self):
+        """Номер самой старой записи в буфере"""
+        return self.total - len(self)
+
+    def append(self, *values):
+        """Добавляет запись (вытесняя самую старую); возвращает ее номер"""
+        with self.lock:
+            seq = self.total
+            slot = seq % self.capacity
+            self.record.pack_into(self.buffer, slot * self.record.size, *values)
+            self.total += 1
+            self._check_order(seq, seq + 1)
+            self.dirty.add(slot)
+            if len(self.dirty) >= self.flush_every:
+                self.flush()
+            return seq
+
+    def get(self, seq):
+        """Возвращает запись по номеру или None, если она уже вытеснена"""
+        with self.lock:
+            if not self.first <= seq < self.total:
+                return None
+            return self.record.unpack_from(self.buffer, seq % self.capacity * self.record.size)
+
+    def update(self, seq, *values):
+        """Перезаписывает запись, если она еще в буфере"""
+        with self.lock:
+            if not self.first <= seq < self.total:
+                return False
+            slot = seq % self.capacity
+            self.record.pack_into(self.buffer, slot * self.record.size, *values)
+            self._check_order(seq, min(seq + 2, self.total))
+            self.dirty.add(slot)
+            if len(self.dirty) >= self.flush_every:
+                self.flush()
+            return True
+
+    def _time_at(self, seq):
+        return struct.unpack_from('<d', self.buffer, seq % self.capacity * self.record.size)[0]
+
+    def _check_order(self, start, end):
+        """Запоминает нарушение порядка времени среди записей [start, end)"""
+        for seq in range(max(start, self.first + 1), end):
+            if self._time_at(seq) < self._time_at(seq - 1):
+                self.unordered = max(seq, self.unordered or 0)
+
+    def _is_ordered(self):
+        """Проверяет, что записи в буфере идут по времени"""
+        return self.unordered is None or self.unordered <= self.first
+
+    def _bisect(self, real_time):
+        """Номер первой записи не раньше real_time"""
+        low, high = self.first, self.total
+        while low < high:
+            middle = (low + high) // 2
+            if self._time_at(middle) < real_time:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def range(self, since=None, until=None):
+        """Возвращает записи с реальным временем в [since, until)"""
+        with self.lock:
+            size = self.record.size
+            if not self._is_ordered():
+                records = (self.record.unpack_from(self.buffer, seq % self.capacity * size)
+                           for seq in range(self.first, self.total))
+                return [record for record in records
+                        if (since is None or record[0] >= since) and (until is None or record[0] < until)]
+            start = self.first if since is None else self._bisect(since)
+            end = self.total if until is None else self._bisect(until)
+            return [self.record.unpack_from(self.buffer, seq % self.capacity * size)
+                    for seq in range(start, end)]
+
+    def flush(self):
+        """Записывает изменившиеся записи и заголовок в файл"""
+        with self.lock:
+            if self.file is None or not self.dirty:
+                self.dirty.clear()
+                return
+            size = self.record.size
+            try:
+                for slot in sorted(self.dirty):
+                    self.file.seek(self.HEADER.size + slot * size)
+                    self.file.write(self.buffer[slot * size:(slot + 1) * size])
+                self._write_header()
+                self.file.flush()
+            except OSError as e:
+                print(f"Ошибка записи истории {self.path}: {e}")
+            self.dirty.clear()
+
+    def close(self):
+        """Дописывает изменения и закрывает файл"""
+        with self.lock:
+            self.flush()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def _in_game_range(minute, game_from, game_to):
+    """Проверяет минуту суток на попадание в диапазон (может переходить через полночь)"""
+    if game_from is None:
+        return True
+    if game_from <= game_to:
+        return game_from <= minute <= game_to
+    return minute >= game_from or minute <= game_to
+
+
+class History:
+    """История срабатываний будильников и тиков игровых минут"""
+
+    def __init__(self, get_data_path=None, fire_capacity=FIRE_CAPACITY, tick_capacity=TICK_CAPACITY):
+        path = get_data_path if get_data_path else (lambda filename: None)
+        # Срабатывания пишутся на диск одной пачкой на каждую группу сработавших
+        # будильников (flush_fires) и сразу при остановке сигнала; flush_every
+        # ограничивает пачку, если срабатывают тысячи будильников за минуту
+        self.fires = RingLog(FIRE_RECORD, fire_capacity, path(FIRES_FILENAME), flush_every=64)
+        self.ticks = RingLog(TICK_RECORD, tick_capacity, path(TICKS_FILENAME), flush_every=64)
+        self.open_fires = {}  # id будильника -> номер записи звонящего сигнала
+
+    def record_fire(self, alarm_id, real_time, minute_of_day, latency_ms):
+        """Записывает начало сигнала будильника"""
+        self.open_fires[alarm_id] = self.fires.append(
+            real_time, minute_of_day, alarm_id.encode('utf-8')[:16], latency_ms, math.nan, 0)
+
+    def record_stop(self, alarm_id, real_time, outcome='stop'):
+        """Записывает, когда и чем закончился сигнал"""
+        seq = self.open_fires.pop(alarm_id, None)
+        if seq is None:
+            return
+        record = self.fires.get(seq)
+        if record is not None:
+            started, minute, raw_id, latency_ms = record[:4]
+            self.fires.update(seq, started, minute, raw_id, latency_ms,
+                              (real_time - started) * 1000, OUTCOMES.index(outcome))
+            self.fires.flush()
+
+    def record_tick(self, real_time, minute_of_day, lateness_ms, duration_ms):
+        """Записывает тик игровой минуты"""
+        self.ticks.append(real_time, minute_of_day, lateness_ms, duration_ms)
+
+    def query_fires(self, since=None, until=None, game_from=None, game_to=None):
+        """Срабатывания за реальный период [since, until) и в диапазоне игровых минут суток"""
+        return [
+            {
+                'real_time': real_time,
+                'game_time': format_game_minute(minute),
+                'id': raw_id.rstrip(b'\0').decode('utf-8', 'replace'),
+                'latency_ms': round(latency_ms, 3),
+                'duration_ms': None if math.isnan(duration_ms) else round(duration_ms, 3),
+                'outcome': OUTCOMES[outcome] if outcome < len(OUTCOMES) else '',
+            }
+            for real_time, minute, raw_id, latency_ms, duration_ms, outcome in self.fires.range(since, until)
+            if _in_game_range(minute, game_from, game_to)
+        ]
+
+    def query_ticks(self, since=None, until=None, game_from=None, game_to=None):
+        """Тики за реальный период [since, until) и в диапазоне игровых минут суток"""
+        return [
+            {
+                'real_time': real_time,
+                'game_time': format_game_minute(minute),
+                'lateness_ms': round(lateness_ms, 3),
+                'duration_ms': round(duration_ms, 3),
+            }
+            for real_time, minute, lateness_ms, duration_ms in self.ticks.range(since, until)
+            if _in_game_range(minute, game_from, game_to)
+        ]
+
+    def flush_fires(self):
+        """Записывает на диск срабатывания (после группы сработавших будильников)"""
+        self.fires.flush()
+
+    def flush(self):
+        """Записывает накопленные изменения на диск"""
+        self.fires.flush()
+        self.ticks.flush()
+
+    def close(self):
+        """Дописывает изменения и закрывает файлы"""
+        self.fires.close()
+        self.ticks.close()
+
+
+def export_rows(rows, fields, out, fmt='csv'):
+    """Выгружает записи истории в CSV или JSON (реальное время - ISO 8601)"""
+    rows = [dict(row, real_time=datetime.fromtimestamp(row['real_time']).isoformat(timespec='milliseconds'))
+            for row in rows]
+    if fmt == 'json':
+        json.dump(rows, out, ensure_ascii=False, indent=2)
+        out.write('\n')
+    else:
+        writer = csv.DictWriter(out, fieldnames=fields, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_game_range(text):
+    """Разбирает диапазон игровых минут "HH:MM-HH:MM" в (начало, конец)"""
+    start, _, end = text.partition('-')
+    return parse_alarm_time(start.strip()), parse_alarm_time((end or start).strip())
+
+
+def parse_args(argv=None):
+    """Разбирает параметры командной строки"""
+    parser = argparse.ArgumentParser(description="Выгрузка истории будильников и тиков часов")
+    parser.add_argument('--data-dir', default=os.path.abspath("."),
+                        help="папка с файлами истории (по умолчанию текущая)")
+    parser.add_argument('--ticks', action='store_true', help="выгрузить тики вместо срабатываний")
+    parser.add_argument('--format', choices=('csv', 'json'), default='csv')
+    parser.add_argument('--since', type=datetime.fromisoformat, help="реальное время начала (ISO 8601)")
+    parser.add_argument('--until', type=datetime.fromisoformat, help="реальное время конца (ISO 8601)")
+    parser.add_argument('--game', type=parse_game_range, help="игровые минуты суток, например 04:00-07:00")
+    parser.add_argument('--output', help="файл для выгрузки (по умолчанию stdout)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    history = History(lambda filename: os.path.join(args.data_dir, filename))
+    game_from, game_to = args.game or (None, None)
+    query, fields = (history.query_ticks, TICK_FIELDS) if args.ticks else (history.query_fires, FIRE_FIELDS)
+    rows = query(args.since.timestamp() if args.since else None,
+                 args.until.timestamp() if args.until else None, game_from, game_to)
+    history.close()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            export_rows(rows, fields, f, args.format)
+    else:
+        export_rows(rows, fields, sys.stdout, args.format)
+
+
+if __name__ == "__main__":
+    main()
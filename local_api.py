@@ -0,0 +1,283 @@
+"""Локальный API часов: HTTP/JSON на 127.0.0.1.
+
+    GET  /time                 текущее игровое время
+    GET  /alarms               все будильники
+    GET  /alarms/next?count=N  ближайшие N включенных будильников
+    POST /alarms/batch         пакет операций add (time или rule, sound, volume)/toggle/delete
+    GET  /events               поток событий (Server-Sent Events): тики минут и срабатывания
+    GET  /history?kind=fires|ticks&since=ISO&until=ISO&game=HH:MM-HH:MM
+                               история срабатываний или тиков
+
+Сервер работает в фоновых потоках и отвечает из снимка состояния в памяти
+(диск не читается). Изменения выполняются в главном потоке через dispatch.
+
+Запросы из браузера отклоняются: Host должен быть 127.0.0.1 или localhost
+с портом API (защита от подмены DNS), заголовок Origin не допускается,
+а POST принимается только с Content-Type: application/json (защита от
+подделки запросов со сторонних страниц).
+"""
+import bisect
+import json
+import queue
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import game_time
+from alarms import alarm_minutes, format_game_minute
+from history import parse_game_range
+
+# Сколько событий может ждать медленный подписчик (лишние отбрасываются)
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Период пустых сообщений потока событий (с), чтобы обнаружить отключение клиента
+KEEPALIVE_SECONDS = 15
+
+
+def default_game_clock():
+    """Игровое время по системным часам со скоростью по умолчанию"""
+    now = datetime.now()
+    return (now, *game_time.real_time_to_game_time(now, game_time.sync_base_for(now)))
+
+
+class LocalApi:
+    """Локальный HTTP/JSON-сервер с подпиской на события.
+
+    dispatch(func) выполняет func в потоке, владеющем будильниками, и
+    возвращает результат; apply_batch(operations) применяет пакет операций;
+    game_clock() возвращает (реальное время, игровой час, игровая минута)
+    по часам приложения (источник времени, скорость и сдвиг профиля).
+    """
+
+    def __init__(self, port, apply_batch, dispatch=None, host='127.0.0.1', history=None,
+                 game_clock=None):
+        self.host = host
+        self.port = port
+        self.apply_batch = apply_batch
+        self.dispatch = dispatch or (lambda func: func())
+        self.history = history
+        self.game_clock = game_clock or default_game_clock
+
+        self.lock = threading.Lock()
+        self.alarms = []          # снимок всех будильников
+        self.upcoming = []        # (минута суток, будильник) включенных, по времени
+        self.upcoming_minutes = []
+        self.subscribers = set()
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """Запускает сервер в фоновом потоке"""
+        handler = type('Handler', (ApiRequestHandler,), {'api': self})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="local-api", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер и отключает подписчиков"""
+        if self.server is None:
+            return
+        self.publish(None)
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+
+    def set_alarms(self, alarms):
+        """Обновляет снимок будильников (вызывается после каждого изменения)"""
+        snapshot = [dict(alarm) for alarm in alarms]
+        upcoming = []
+        for alarm in snapshot:
+            if not alarm.get('enabled'):
+                continue
+            try:
+                # Будильник по правилу дает срабатывание в каждой своей минуте
+                upcoming.extend((minute, alarm) for minute in alarm_minutes(alarm))
+            except (KeyError, ValueError):
+                continue
+        upcoming.sort(key=lambda item: item[0])
+        with self.lock:
+            self.alarms = snapshot
+            self.upcoming = upcoming
+            self.upcoming_minutes = [minute for minute, _ in upcoming]
+
+    def current_time(self):
+        """Возвращает текущее игровое время"""
+        now, game_hour, game_minute = self.game_clock()
+        return {
+            'time': f"{game_hour:02d}:{game_minute:02d}",
+            'hour': game_hour,
+            'minute': game_minute,
+            'is_night': game_time.is_night(game_hour),
+            'real_time': now.isoformat(timespec='seconds'),
+        }
+
+    def next_alarms(self, count):
+        """Возвращает ближайшие count срабатываний после текущей игровой минуты"""
+        current = self.current_time()
+        minute_of_day = current['hour'] * 60 + current['minute']
+        with self.lock:
+            upcoming = self.upcoming
+            start = bisect.bisect_right(self.upcoming_minutes, minute_of_day)
+
+        result = []
+        for i in range(min(count, len(upcoming))):
+            minute, alarm = upcoming[(start + i) % len(upcoming)]
+            ahead = (minute - minute_of_day) % game_time.MINUTES_PER_DAY or game_time.MINUTES_PER_DAY
+            result.append(dict(alarm, minutes_ahead=ahead))
+        return {'now': current['time'], 'alarms': result}
+
+    def subscribe(self):
+        """Создает очередь событий для нового подписчика"""
+        events = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.add(events)
+        return events
+
+    def unsubscribe(self, events):
+        """Удаляет подписчика"""
+        with self.lock:
+            self.subscribers.discard(events)
+
+    def publish(self, event):
+        """Рассылает событие подписчикам (None - конец потока)"""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                pass  # медленный подписчик пропускает события
+
+    def publish_minute(self, game_hour, game_minute):
+        """Событие смены игровой минуты"""
+        if self.subscribers:
+            self.publish({'type': 'minute', 'time': format_game_minute(game_hour * 60 + game_minute)})
+
+    def publish_fire(self, alarm, minute_of_day):
+        """Событие срабатывания будильника (время - игровая минута срабатывания)"""
+        if self.subscribers:
+            self.publish({'type': 'alarm', 'id': alarm.get('id'), 'time': format_game_minute(minute_of_day),
+                          'name': alarm.get('name')})
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов локального API"""
+    api = None
+
+    def log_message(self, format, *args):
+        pass  # без вывода каждого запроса в консоль
+
+    def send_json(self, data, status=200):
+        """Отправляет ответ JSON"""
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def check_request(self, body=False):
+        """Проверяет, что запрос пришел от локальной программы, а не со страницы в браузере"""
+        port = self.api.port
+        allowed = {f"{name}:{port}" for name in ('127.0.0.1', 'localhost', self.api.host)}
+        if port == 80:
+            allowed |= {'127.0.0.1', 'localhost', self.api.host}
+        if self.headers.get('Host', '').strip().lower() not in allowed:
+            self.send_json({'error': "Недопустимый заголовок Host"}, 403)
+            return False
+        if self.headers.get('Origin') is not None:
+            self.send_json({'error': "Запросы из браузера не принимаются"}, 403)
+            return False
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if body and content_type != 'application/json':
+            self.send_json({'error': "Ожидается Content-Type: application/json"}, 415)
+            return False
+        return True
+
+    def do_GET(self):
+        if not self.check_request():
+            return
+        url = urlparse(self.path)
+        if url.path == '/time':
+            self.send_json(self.api.current_time())
+        elif url.path == '/alarms':
+            with self.api.lock:
+                alarms = self.api.alarms
+            self.send_json({'alarms': alarms})
+        elif url.path == '/alarms/next':
+            try:
+                count = int(parse_qs(url.query).get('count', ['5'])[0])
+            except ValueError:
+                self.send_json({'error': "count должен быть числом"}, 400)
+                return
+            self.send_json(self.api.next_alarms(max(0, count)))
+        elif url.path == '/events':
+            self.stream_events()
+        elif url.path == '/history' and self.api.history is not None:
+            self.send_history(parse_qs(url.query))
+        else:
+            self.send_json({'error': "Неизвестный путь"}, 404)
+
+    def do_POST(self):
+        if not self.check_request(body=True):
+            return
+        if urlparse(self.path).path != '/alarms/batch':
+            self.send_json({'error': "Неизвестный путь"}, 404)
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            operations = json.loads(self.rfile.read(length) or b'{}').get('operations')
+            if not isinstance(operations, list):
+                raise ValueError("ожидается список operations")
+        except (ValueError, AttributeError) as e:
+            self.send_json({'error': f"Некорректный запрос: {e}"}, 400)
+            return
+        try:
+            results = self.api.dispatch(lambda: self.api.apply_batch(operations))
+        except Exception as e:
+            self.send_json({'error': f"Ошибка выполнения: {e}"}, 500)
+            return
+        self.send_json({'results': results})
+
+    def send_history(self, params):
+        """Отвечает записями истории за реальный период и диапазон игровых минут"""
+        try:
+            since, until = (datetime.fromisoformat(params[key][0]).timestamp() if key in params else None
+                            for key in ('since', 'until'))
+            game_from, game_to = parse_game_range(params['game'][0]) if 'game' in params else (None, None)
+        except ValueError as e:
+            self.send_json({'error': f"Некорректный запрос: {e}"}, 400)
+            return
+        if params.get('kind', ['fires'])[0] == 'ticks':
+            records = self.api.history.query_ticks(since, until, game_from, game_to)
+        else:
+            records = self.api.history.query_fires(since, until, game_from, game_to)
+        self.send_json({'records': records})
+
+    def stream_events(self):
+        """Отдает события подписчику до его отключения"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        events = self.api.subscribe()
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    break
+                self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+        except OSError:
+            pass  # клиент отключился
+        finally:
+            self.api.unsubscribe(events)
@@ -0,0 +1,197 @@
+"""Импорт и экспорт наборов будильников (пресетов) в CSV и JSON.
+
+JSON - тот же формат, что у alarms.json ({"alarms": [...]}, можно просто
+список). CSV - строка заголовка и будильник на строку:
+
+    time,name,enabled,rule,sound,volume
+    06:30,Утро,1,,,
+    04:00,Клев,1,04:00-07:00/20,bell.wav,0.5
+
+Весь набор проверяется и очищается от повторов за один проход (множество
+ключей "время или правило + название"), затем будильники добавляются к
+текущим или заменяют их - с одной записью и одним обновлением виджетов.
+
+Из командной строки (часы при этом должны быть закрыты, иначе они
+перезапишут файл своим списком при следующем сохранении):
+
+    python presets.py import FILE [--replace] [--store sqlite] [--data-dir DIR]
+    python presets.py export FILE [--store sqlite] [--data-dir DIR]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+
+from alarms import AlarmRecord, parse_alarm_time, new_alarm_id
+from rules import rule_minutes
+from storage import open_store, STORE_BACKENDS
+
+CSV_FIELDS = ('time', 'name', 'enabled', 'rule', 'sound', 'volume')
+IMPORT_MODES = ('merge', 'replace')
+
+_TRUE = {'1', 'true', 'yes', 'on', 'да', 'вкл'}
+_FALSE = {'0', 'false', 'no', 'off', 'нет', 'выкл', ''}
+
+
+def preset_format(path):
+    """Определяет формат пресета по расширению файла"""
+    return 'csv' if path.lower().endswith('.csv') else 'json'
+
+
+def _parse_enabled(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"Некорректное значение enabled: {value}")
+
+
+def read_entries(text, fmt):
+    """Разбирает текст пресета в список словарей (без проверки полей)"""
+    if fmt == 'csv':
+        reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+        return [{key.strip(): value for key, value in row.items() if key} for row in reader]
+    data = json.loads(text)
+    entries = data.get('alarms') if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError("ожидается список будильников или {\"alarms\": [...]}")
+    return entries
+
+
+def alarm_key(alarm):
+    """Ключ повтора: правило или игровая минута и название"""
+    return alarm.rule or alarm.minute, alarm.name
+
+
+def validate_entry(entry):
+    """Проверяет запись пресета и создает из нее AlarmRecord"""
+    if not isinstance(entry, dict):
+        raise ValueError("запись должна быть объектом")
+    rule = str(entry.get('rule') or '').strip()
+    minute = rule_minutes(rule)[0] if rule else parse_alarm_time(str(entry.get('time') or '').strip())
+    name = str(entry.get('name') or '').strip() or "Будильник"
+    enabled = entry.get('enabled')
+    alarm = AlarmRecord(str(entry.get('id') or '').strip() or None, minute, name,
+                        True if enabled is None else _parse_enabled(enabled), rule=rule or None)
+    if entry.get('sound'):
+        alarm.sound = str(entry['sound']).strip()
+    volume = entry.get('volume')
+    if volume not in (None, ''):
+        alarm.volume = max(0.0, min(1.0, float(volume)))
+    return alarm
+
+
+def merge_alarms(current, entries, mode='merge'):
+    """Проверяет и объединяет набор с текущими будильниками за один проход.
+
+    Возвращает (новый список, отчет): отчет - число добавленных, пропущенных
+    повторов и ошибки по номерам записей. В режиме replace текущие будильники
+    отбрасываются. Текущие объекты будильников сохраняются как есть.
+    Если добавлять нечего или в режиме replace в наборе есть ошибки, импорт
+    отменяется: возвращаются текущие будильники и report['aborted'] = True.
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Неизвестный режим импорта: {mode}")
+    alarms = list(current) if mode == 'merge' else []
+    seen = {alarm_key(alarm) for alarm in alarms}
+    ids = {alarm['id'] for alarm in alarms}
+    report = {'added': 0, 'duplicates': 0, 'errors': []}
+
+    for number, entry in enumerate(entries, 1):
+        try:
+            alarm = validate_entry(entry)
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            report['errors'].append(f"запись {number}: {e}")
+            continue
+        key = alarm_key(alarm)
+        if key in seen:
+            report['duplicates'] += 1
+            continue
+        if alarm.id is None or alarm.id in ids:
+            alarm.id = new_alarm_id()
+        seen.add(key)
+        ids.add(alarm.id)
+        alarms.append(alarm)
+        report['added'] += 1
+
+    # Замена только целым проверенным набором: испорченный файл не стирает будильники
+    report['aborted'] = not report['added'] or (mode == 'replace' and bool(report['errors']))
+    if report['aborted']:
+        return list(current), report
+    return alarms, report
+
+
+def read_preset(path):
+    """Читает записи пресета из файла (CSV или JSON по расширению)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return read_entries(f.read(), preset_format(path))
+
+
+def write_preset(path, alarms):
+    """Записывает будильники в пресет (CSV или JSON по расширению)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        if preset_format(path) == 'csv':
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(CSV_FIELDS)
+            for alarm in alarms:
+                writer.writerow([
+                    alarm['time'], alarm['name'], 1 if alarm.get('enabled') else 0, alarm.get('rule', ''),
+                    alarm.get('sound', ''), alarm.get('volume', ''),
+                ])
+        else:
+            json.dump({'alarms': [dict(alarm) for alarm in alarms]}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def format_report(report):
+    """Краткое описание итога импорта"""
+    if report.get('aborted'):
+        text = "Импорт отменен, будильники не изменены"
+        if report['errors']:
+            text += " (в наборе есть ошибки)"
+        text += f"\nКорректных записей: {report['added']}, повторов: {report['duplicates']}"
+    else:
+        text = f"Добавлено: {report['added']}, повторов пропущено: {report['duplicates']}"
+    if report['errors']:
+        text += f", ошибок: {len(report['errors'])}\n" + "\n".join(report['errors'][:10])
+        if len(report['errors']) > 10:
+            text += f"\n... и еще {len(report['errors']) - 10}"
+    return text
+
+
+def parse_args(argv=None):
+    """Разбирает параметры командной строки"""
+    parser = argparse.ArgumentParser(description="Импорт и экспорт будильников (CSV/JSON)")
+    parser.add_argument('action', choices=('import', 'export'))
+    parser.add_argument('path', help="файл пресета (.csv или .json)")
+    parser.add_argument('--replace', action='store_true', help="заменить текущие будильники, а не добавить")
+    parser.add_argument('--store', choices=STORE_BACKENDS,
+                        default=os.environ.get('RF4_CLOCK_STORE', 'json'),
+                        help="хранилище будильников (по умолчанию alarms.json)")
+    parser.add_argument('--data-dir', default=os.path.abspath("."),
+                        help="папка с alarms.json/alarms.db (по умолчанию текущая)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    store = open_store(args.store, lambda filename: os.path.join(args.data_dir, filename))
+    current = [AlarmRecord.from_dict(alarm) for alarm in store.load() or []]
+    if args.action == 'export':
+        write_preset(args.path, current)
+        print(f"Экспортировано будильников: {len(current)}")
+        return
+    alarms, report = merge_alarms(current, read_preset(args.path), 'replace' if args.replace else 'merge')
+    if not report['aborted']:
+        store.save(alarms)
+        store.flush()
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
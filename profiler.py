@@ -0,0 +1,147 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Верхние границы корзин гистограмм (мс); последняя корзина - все, что дольше
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными корзинами"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        """Добавляет замер (мс)"""
+        index = 0
+        while index < len(HISTOGRAM_BOUNDS_MS) and ms > HISTOGRAM_BOUNDS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def to_dict(self):
+        """Возвращает гистограмму в виде словаря для JSON"""
+        labels = [f"<={bound}" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}"]
+        return {
+            'count': self.count,
+            'avg_ms': self.total / self.count if self.count else 0.0,
+            'max_ms': self.max,
+            'buckets': dict(zip(labels, self.buckets)),
+        }
+
+
+class Profiler:
+    """Профилирование главного цикла Tk: опоздание колбэков after и длительности.
+
+    Выключенный профилировщик ничего не оборачивает, поэтому почти ничего
+    не стоит. Включенный подменяет root.after и выбранные методы объекта
+    обертками с замером времени; медленные вызовы пишутся в журнал.
+    """
+
+    def __init__(self, path=None, slow_ms=16.0, slow_log_size=200):
+        self.enabled = path is not None
+        self.path = path          # куда записывать отчет
+        self.slow_ms = slow_ms    # порог медленного колбэка (один кадр)
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.durations = {}       # имя -> Histogram длительностей
+        self.lateness = {}        # имя колбэка after -> Histogram опозданий
+        self.slow_log = deque(maxlen=slow_log_size)
+        self.sections = {}        # имя -> функция, возвращающая дополнительный раздел отчета
+
+    def add_section(self, name, func):
+        """Добавляет в отчет раздел, который вычисляется при записи"""
+        self.sections[name] = func
+
+    def record(self, table, name, ms, kind):
+        """Записывает замер в гистограмму и, если он медленный, в журнал"""
+        with self.lock:
+            histogram = table.get(name)
+            if histogram is None:
+                histogram = table[name] = Histogram()
+            histogram.add(ms)
+            if ms >= self.slow_ms:
+                self.slow_log.append({'name': name, 'kind': kind, 'ms': ms, 'time': time.time()})
+
+    def timed(self, name, func):
+        """Оборачивает функцию замером длительности"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(self.durations, name, (time.perf_counter() - start) * 1000, 'duration')
+        return wrapper
+
+    def instrument(self, obj, names):
+        """Подменяет методы объекта обертками с замером (только если профилирование включено)"""
+        if not self.enabled:
+            return
+        for name in names:
+            setattr(obj, name, self.timed(name, getattr(obj, name)))
+
+    def instrument_after(self, root):
+        """Подменяет root.after: замеряет опоздание и длительность каждого колбэка"""
+        if not self.enabled:
+            return
+        original_after = root.after
+
+        def after(delay, func=None, *args):
+            if func is None:
+                return original_after(delay)
+            name = getattr(func, '__name__', repr(func))
+            due = time.perf_counter() + delay / 1000
+
+            def callback(*callback_args):
+                start = time.perf_counter()
+                self.record(self.lateness, name, max(0.0, (start - due) * 1000), 'lateness')
+                try:
+                    return func(*callback_args)
+                finally:
+                    self.record(self.durations, f"after:{name}",
+                                (time.perf_counter() - start) * 1000, 'duration')
+
+            return original_after(delay, callback, *args)
+
+        root.after = after
+
+    def get_report(self):
+        """Возвращает отчет: гистограммы и журнал медленных колбэков"""
+        with self.lock:
+            report = {
+                'started': self.started,
+                'dumped': time.time(),
+                'slow_ms': self.slow_ms,
+                'durations': {name: h.to_dict() for name, h in self.durations.items()},
+                'after_lateness': {name: h.to_dict() for name, h in self.lateness.items()},
+                'slow_log': list(self.slow_log),
+            }
+        for name, func in self.sections.items():
+            report[name] = func()
+        return report
+
+    def dump(self, path=None):
+        """Записывает отчет в JSON-файл; возвращает путь"""
+        path = path or self.path
+        if not self.enabled or not path:
+            return None
+        try:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.get_report(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            return path
+        except OSError as e:
+            print(f"Ошибка записи профиля: {e}")
+            return None
@@ -0,0 +1,159 @@
+"""Профили часов: серверы и регионы со своим сдвигом и скоростью игрового времени.
+
+Профили хранятся в profiles.json рядом с alarms.json:
+
+    {"profiles": [
+        {"name": "default"},
+        {"name": "eu", "offset_minutes": 180},
+        {"name": "fast", "ratio": 1.25}
+    ]}
+
+offset_minutes - сдвиг в игровых минутах, ratio - реальных минут на
+игровой час (по умолчанию 2.5). Если в реальном часе целое число игровых
+суток (ratio 2.5, 1.25, 0.5...), время отсчитывается от начала реального
+часа; при других скоростях - от фиксированной эпохи. Все профили обслуживает один таймер
+ProfileScheduler, который просыпается на ближайшей границе игровой
+минуты среди всех профилей.
+"""
+import json
+import os
+
+import game_time
+from alarms import AlarmIndex
+
+DEFAULT_PROFILE = 'default'
+PROFILES_FILENAME = 'profiles.json'
+
+# 2.5 реальных минуты = 1 игровой час
+DEFAULT_RATIO = game_time.GAME_HOUR_SECONDS / 60
+
+
+class ClockProfile:
+    """Профиль часов: сдвиг, скорость времени и собственные будильники"""
+
+    def __init__(self, name, offset_minutes=0, ratio=DEFAULT_RATIO):
+        if ratio <= 0:
+            raise ValueError(f"Некорректная скорость времени профиля {name}: {ratio}")
+        self.name = name
+        self.offset_minutes = int(offset_minutes)
+        self.ratio = float(ratio)
+        self.hour_seconds = self.ratio * 60  # реальных секунд на игровой час
+        self.store = None
+        self.alarms = []
+        self.alarm_index = AlarmIndex(self.alarms)
+        self.last_game_time = None
+        self.minute_boundary = None  # начало последней обработанной игровой минуты (секунды эпохи)
+
+    def set_alarms(self, alarms):
+        """Назначает будильники профиля и перестраивает индекс"""
+        self.alarms = alarms
+        self.alarm_index = AlarmIndex(alarms)
+
+    def game_minutes(self, real_time, sync_base):
+        """Возвращает номер игровой минуты от базы синхронизации с учетом сдвига"""
+        anchor = game_time.time_anchor(sync_base, self.hour_seconds)
+        return game_time.game_minutes_since(real_time, anchor, self.hour_seconds) + self.offset_minutes
+
+    def minute_start(self, real_time, sync_base):
+        """Возвращает момент (секунды эпохи) начала текущей игровой минуты профиля"""
+        anchor = game_time.time_anchor(sync_base, self.hour_seconds)
+        return game_time.game_minute_start(real_time, anchor, self.hour_seconds)
+
+    def game_time(self, real_time, sync_base):
+        """Конвертирует реальное время в игровое время профиля: (час, минута)"""
+        return divmod(self.game_minutes(real_time, sync_base) % game_time.MINUTES_PER_DAY, 60)
+
+    def to_dict(self):
+        """Возвращает настройки профиля для profiles.json"""
+        return {'name': self.name, 'offset_minutes': self.offset_minutes, 'ratio': self.ratio}
+
+
+def load_profiles(path):
+    """Загружает профили из файла; профиль по умолчанию всегда идет первым"""
+    profiles = []
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('profiles', [])
+            names = set()
+            for entry in entries:
+                name = str(entry['name'])
+                if name in names:
+                    raise ValueError(f"Профиль {name} указан дважды")
+                names.add(name)
+                profiles.append(ClockProfile(name, entry.get('offset_minutes', 0),
+                                             entry.get('ratio', DEFAULT_RATIO)))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Ошибка загрузки профилей: {e}")
+            profiles = []
+
+    default = next((profile for profile in profiles if profile.name == DEFAULT_PROFILE), None)
+    if default is None:
+        default = ClockProfile(DEFAULT_PROFILE)
+    return [default] + [profile for profile in profiles if profile is not default]
+
+
+class ProfileScheduler:
+    """Общий таймер профилей.
+
+    Профили с одинаковой скоростью времени делят границы игровых минут
+    (сдвиг задан целыми игровыми минутами), поэтому граница считается
+    один раз на группу. Пробуждение - на ближайшей границе среди групп,
+    сколько бы профилей ни было.
+    """
+
+    def __init__(self, profiles=()):
+        self.groups = {}        # реальных секунд на игровой час -> профили
+        self.group_minute = {}  # реальных секунд на игровой час -> последняя обработанная минута
+        for profile in profiles:
+            self.add(profile)
+
+    def add(self, profile):
+        """Добавляет профиль (его группа обработается на ближайшем тике)"""
+        self.groups.setdefault(profile.hour_seconds, []).append(profile)
+        self.group_minute.pop(profile.hour_seconds, None)
+
+    def remove(self, profile):
+        """Удаляет профиль"""
+        group = self.groups.get(profile.hour_seconds, [])
+        if profile in group:
+            group.remove(profile)
+            if not group:
+                del self.groups[profile.hour_seconds]
+                self.group_minute.pop(profile.hour_seconds, None)
+
+    def due(self, real_time, sync_base):
+        """Возвращает [(профиль, час, минута)] профилей, у которых сменилась игровая минута"""
+        changed = []
+        for hour_seconds, profiles in self.groups.items():
+            # Группа без новой границы пропускается целиком
+            anchor = game_time.time_anchor(sync_base, hour_seconds)
+            minute = game_time.game_minutes_since(real_time, anchor, hour_seconds)
+            if self.group_minute.get(hour_seconds) == minute:
+                continue
+            self.group_minute[hour_seconds] = minute
+            for profile in profiles:
+                current = divmod((minute + profile.offset_minutes) % game_time.MINUTES_PER_DAY, 60)
+                if current != profile.last_game_time:
+                    profile.last_game_time = current
+                    changed.append((profile, *current))
+        return changed
+
+    def reset(self):
+        """Заставляет пересчитать все профили на следующем тике"""
+        self.group_minute.clear()
+        for profiles in self.groups.values():
+            for profile in profiles:
+                profile.last_game_time = None
+
+    def seconds_until_next(self, real_time, sync_base):
+        """Возвращает реальные секунды до ближайшей границы игровой минуты среди профилей"""
+        return min(
+            game_time.seconds_until_next_game_minute(
+                real_time, game_time.time_anchor(sync_base, hour_seconds), hour_seconds)
+            for hour_seconds in self.groups
+        )
+
+    def max_sleep_seconds(self):
+        """Самая короткая игровая минута среди профилей (страховка от скачков часов)"""
+        return min(self.groups) / 60
@@ -0,0 +1,113 @@
+"""Правила повторяющихся будильников.
+
+Правило - одна или несколько частей через запятую:
+
+    06:30            одно время
+    04:00-07:00/20   каждые 20 игровых минут с 04:00 до 07:00 включительно
+    22:00-02:00/30   диапазон может переходить через полночь
+    */30             каждые 30 минут круглые сутки
+    night-15         за 15 минут до начала ночи (00:00)
+    day+30           через 30 минут после рассвета (06:00)
+
+Вместо night/day можно писать ночь/день, якоря допустимы и в диапазонах
+(night-60-day/15). Правило компилируется один раз в таблицу из 1440 игровых
+минут суток, поэтому проверка на тике - обращение по индексу.
+"""
+import re
+from functools import lru_cache
+
+from game_time import MINUTES_PER_DAY, NIGHT_END_HOUR
+
+# Якоря: начало ночи и рассвет (ночь с 00:00 до 06:00)
+ANCHORS = {'night': 0, 'ночь': 0, 'day': NIGHT_END_HOUR * 60, 'день': NIGHT_END_HOUR * 60}
+ANCHOR_NAMES = {0: "ночи", NIGHT_END_HOUR * 60: "рассвета"}
+ANCHOR_LABELS = {0: "ночь", NIGHT_END_HOUR * 60: "рассвет"}
+
+_POINT = r'\d{1,2}:\d{2}|(?:night|day|ночь|день)(?:[+-]\d+(?![\d:]))?'
+_CLAUSE = re.compile(rf'(?:(?P<all>\*)|(?P<start>{_POINT})(?:-(?P<end>{_POINT}))?)(?:/(?P<step>\d+))?')
+_ANCHOR = re.compile(r'(?P<anchor>[a-zа-я]+)(?P<offset>[+-]\d+)?')
+
+
+def _format(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def _parse_point(text):
+    """Возвращает (минута суток, якорь, сдвиг) для времени или якоря"""
+    if ':' in text:
+        hour, minute = (int(part) for part in text.split(':'))
+        if not (0 <= hour <= 23 and 0 <= minute <= 59):
+            raise ValueError(f"Некорректное время: {text}")
+        return hour * 60 + minute, None, 0
+    match = _ANCHOR.fullmatch(text)
+    anchor = ANCHORS[match['anchor']]
+    offset = int(match['offset'] or 0)
+    return (anchor + offset) % MINUTES_PER_DAY, anchor, offset
+
+
+def _parse_clauses(rule):
+    """Разбирает правило на части: (начало, конец, шаг, якорь, сдвиг)"""
+    clauses = []
+    for text in rule.lower().replace(' ', '').split(','):
+        match = _CLAUSE.fullmatch(text)
+        if match is None:
+            raise ValueError(f"Некорректное правило: {text or rule!r}")
+        step = int(match['step']) if match['step'] else None
+        if step is not None and not 0 < step < MINUTES_PER_DAY:
+            raise ValueError(f"Некорректный шаг: {step}")
+        if match['all']:
+            clauses.append((0, MINUTES_PER_DAY - 1, step or 1, None, 0))
+            continue
+        start, anchor, offset = _parse_point(match['start'])
+        if match['end']:
+            end = _parse_point(match['end'])[0]
+            clauses.append((start, end, step or 1, None, 0))
+        elif step is not None:
+            raise ValueError(f"Шаг без диапазона: {text}")
+        else:
+            clauses.append((start, start, 1, anchor, offset))
+    return clauses
+
+
+@lru_cache(maxsize=256)
+def compile_rule(rule):
+    """Компилирует правило в таблицу из 1440 байт (1 - срабатывание в эту минуту)"""
+    table = bytearray(MINUTES_PER_DAY)
+    for start, end, step, _, _ in _parse_clauses(rule):
+        length = (end - start) % MINUTES_PER_DAY + 1
+        for delta in range(0, length, step):
+            table[(start + delta) % MINUTES_PER_DAY] = 1
+    return bytes(table)
+
+
+@lru_cache(maxsize=256)
+def rule_minutes(rule):
+    """Возвращает отсортированные минуты суток срабатывания правила"""
+    minutes = tuple(minute for minute, fires in enumerate(compile_rule(rule)) if fires)
+    if not minutes:
+        raise ValueError(f"Правило ни разу не срабатывает: {rule}")
+    return minutes
+
+
+@lru_cache(maxsize=256)
+def describe_rule(rule):
+    """Возвращает краткое описание правила для списка будильников"""
+    parts = []
+    for start, end, step, anchor, offset in _parse_clauses(rule):
+        if start != end or step != 1:
+            every = f"каждые {step} мин" if step != 1 else "каждую минуту"
+            if (end - start) % MINUTES_PER_DAY + 1 == MINUTES_PER_DAY:
+                parts.append(every)
+            else:
+                parts.append(f"{_format(start)}–{_format(end)} {every}")
+        elif anchor is None:
+            parts.append(_format(start))
+        elif offset < 0:
+            parts.append(f"{_format(start)} (за {-offset} мин до {ANCHOR_NAMES[anchor]})")
+        elif offset > 0:
+            parts.append(f"{_format(start)} (через {offset} мин после {ANCHOR_NAMES[anchor]})")
+        else:
+            parts.append(f"{_format(start)} ({ANCHOR_LABELS[anchor]})")
+    count = len(rule_minutes(rule))
+    summary = "; ".join(parts)
+    return f"{summary} · {count}× в сутки" if count > 1 else summary
@@ -0,0 +1,294 @@
+"""Симуляция часов на виртуальном времени: сутки игрового времени за миллисекунды.
+
+Часы работают через ту же логику GameClock (update_time, check_alarms,
+срабатывание, очередь и откладывание), но без окна, звука и mainloop Tk:
+время дает SimulatedTimeSource, а root.after заменяет VirtualScheduler,
+который выполняет колбэки по порядку, сразу переводя виртуальные часы.
+Каждое срабатывание и переход (очередь, остановка, откладывание, смена
+дня и ночи, пересинхронизация на новом реальном часе, скачок системных
+часов) выводится строкой JSON, в конце - сводка:
+
+    python simulation.py --alarms preset.csv --start 2024-05-01T23:55 --hours 48
+                         [--max-firing 1] [--respond snooze:30] [--jump 12:-90]
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import game_time
+from alarms import AlarmIndex, AlarmRecord, format_game_minute
+from alarm_runtime import AlarmRuntime
+from clock import GameClock
+from history import History
+from presets import merge_alarms, read_preset
+from profiles import ClockProfile, DEFAULT_PROFILE
+
+
+class VirtualScheduler:
+    """Замена root.after: колбэки выполняются по виртуальному монотонному времени"""
+
+    def __init__(self, time_source):
+        self.time_source = time_source
+        self.queue = []           # куча (момент elapsed, номер, функция, аргументы)
+        self.cancelled = set()
+        self.counter = itertools.count()
+        self.callbacks = 0
+
+    def after(self, ms, func=None, *args):
+        job = next(self.counter)
+        heapq.heappush(self.queue, (self.time_source.elapsed + ms / 1000, job, func, args))
+        return job
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, job):
+        self.cancelled.add(job)
+
+    def run_until(self, elapsed):
+        """Выполняет все колбэки до момента elapsed, переводя виртуальные часы"""
+        while self.queue and self.queue[0][0] <= elapsed:
+            due, job, func, args = heapq.heappop(self.queue)
+            if job in self.cancelled:
+                self.cancelled.discard(job)
+                continue
+            self.time_source.advance_to(due)
+            self.callbacks += 1
+            if func is not None:
+                func(*args)
+        self.time_source.advance_to(elapsed)
+
+
+class SimulatedLabel:
+    """Заглушка метки Tk: сообщает часам об изменении параметров"""
+
+    def __init__(self, name, on_change):
+        self.name = name
+        self.on_change = on_change
+
+    def config(self, **options):
+        self.on_change(self.name, options)
+
+    def __str__(self):
+        return f".simulated.{self.name}"
+
+
+class SilentSounds:
+    """Заглушка SoundBank: сигналы не проигрываются"""
+
+    def play(self, key, filename=None, volume=1.0, loops=-1, triggered_at=None):
+        return None
+
+    def stop(self, key):
+        pass
+
+    def stop_all(self):
+        pass
+
+    def is_playing(self):
+        return False
+
+
+class RecordingRuntime(AlarmRuntime):
+    """AlarmRuntime, сообщающий о каждом переходе"""
+
+    def __init__(self, record, **kwargs):
+        super().__init__(**kwargs)
+        self.record = record
+
+    def log(self, event, alarm_id, game_minute):
+        super().log(event, alarm_id, game_minute)
+        self.record(event, game_minute=game_minute, alarm_id=alarm_id)
+
+
+class SimulatedClock(GameClock):
+    """GameClock без окна и звука на виртуальном времени.
+
+    Состояние создается тем же init_clock_state, что и у оконных часов,
+    без окна, звука и файлов; методы update_time, check_alarms, fire_alarms,
+    stop_alarm, snooze_alarm и остальные - общие.
+    """
+
+    def __init__(self, alarms, start, max_firing=None, profiles=None, tick_resolution_ms=None,
+                 respond=None, ticks=False):
+        self.events = []
+        self.ticks = ticks          # записывать каждую игровую минуту
+        self.respond = respond      # ('stop' или 'snooze', через сколько реальных секунд) или None
+
+        time_source = game_time.SimulatedTimeSource(start)
+        self.root = VirtualScheduler(time_source)
+        self.init_clock_state(profiles or [ClockProfile(DEFAULT_PROFILE)], time_source,
+                              tick_resolution_ms, max_firing, History())
+
+        # Отрисовка - в заглушки, которые сообщают о смене дня и ночи
+        self.game_time_label = SimulatedLabel('time', self.on_label_change)
+        self.icon_label = SimulatedLabel('icon', self.on_label_change)
+        self.day_icon, self.night_icon = 'day', 'night'
+        self.sounds = SilentSounds()
+
+        self.alarms = [alarm if isinstance(alarm, AlarmRecord) else AlarmRecord.from_dict(alarm)
+                       for alarm in alarms]
+        self.alarm_index = AlarmIndex(self.alarms)
+
+    def create_runtime(self, max_firing):
+        # Журнал переходов без ограничения размера - для отчета о прогоне
+        return RecordingRuntime(self.record, max_firing=max_firing, log_size=None,
+                                clock=self.time_source.now_epoch)
+
+    def record(self, event, game_minute=None, alarm_id=None, **fields):
+        """Записывает событие с реальным и игровым временем"""
+        now = self.time_source.now()
+        if game_minute is None:
+            game_hour, minute = self.profile.game_time(now, self.sync_base)
+            game_minute = game_hour * 60 + minute
+        entry = {'event': event, 'real_time': now.isoformat(timespec='milliseconds'),
+                 'game_time': format_game_minute(game_minute % game_time.MINUTES_PER_DAY)}
+        if alarm_id is not None:
+            entry['id'] = alarm_id
+            alarm = self.find_alarm(alarm_id)
+            entry['name'] = alarm.name if alarm is not None else None
+        entry.update(fields)
+        self.events.append(entry)
+
+    def on_label_change(self, name, options):
+        """Смена иконки - переход день/ночь; смена времени - тик (если включено)"""
+        if name == 'icon':
+            self.record(options['image'])
+        elif self.ticks:
+            self.record('minute')
+
+    def update_time(self):
+        sync_base = game_time.sync_base_for(self.time_source.now())
+        if sync_base != self.sync_base:
+            self.record('resync', sync_base=sync_base.isoformat())
+        super().update_time()
+
+    def on_alarms_started(self, alarm_ids):
+        super().on_alarms_started(alarm_ids)
+        if self.respond is not None:
+            action, seconds = self.respond
+            for alarm_id in alarm_ids:
+                self.root.after(int(seconds * 1000), self.respond_to, alarm_id, action)
+
+    def respond_to(self, alarm_id, action):
+        """Реакция пользователя: остановить или отложить звонящий будильник"""
+        alarm = self.find_alarm(alarm_id)
+        if alarm is None or not self.runtime.is_firing(alarm_id):
+            return
+        if action == 'snooze':
+            self.snooze_alarm(alarm)
+        else:
+            self.stop_alarm(alarm)
+
+    def jump(self, seconds):
+        """Скачок системных часов"""
+        self.time_source.jump(seconds)
+        self.record('jump', seconds=seconds)
+
+    def save_settings(self):
+        pass  # симуляция ничего не сохраняет
+
+    def create_alarm_widgets(self):
+        pass  # окон нет
+
+
+class Simulation:
+    """Прогон часов на виртуальном времени с отчетом о событиях"""
+
+    def __init__(self, alarms, start, **options):
+        self.clock = SimulatedClock(alarms, start, **options)
+        self.jumps = []  # (через сколько реальных секунд от старта, на сколько секунд)
+
+    def add_jump(self, after_seconds, seconds):
+        """Планирует скачок системных часов"""
+        self.jumps.append((after_seconds, seconds))
+
+    def run(self, game_hours):
+        """Прогоняет game_hours игровых часов; возвращает события и сводку"""
+        clock = self.clock
+        for after_seconds, seconds in self.jumps:
+            clock.root.after(int(after_seconds * 1000), clock.jump, seconds)
+
+        start = time.perf_counter()
+        clock.update_time()
+        clock.root.run_until(game_hours * clock.profile.hour_seconds)
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        fires = sum(1 for event in clock.events if event['event'] == 'fire')
+        return {
+            'events': clock.events,
+            'summary': {
+                'game_hours': game_hours,
+                'real_seconds': clock.time_source.elapsed,
+                'wall_ms': round(wall_ms, 3),
+                'speedup': round(clock.time_source.elapsed * 1000 / max(wall_ms, 1e-6)),
+                'fires': fires,
+                'callbacks': clock.root.callbacks,
+                'wakeups': clock.tick_stats['wakeups'],
+                'minute_ticks': clock.tick_stats['minute_ticks'],
+                'firing_at_end': list(clock.runtime.firing),
+                'latency': clock.get_alarm_latency_stats(),
+            },
+        }
+
+
+def parse_respond(text):
+    """Разбирает реакцию на сигнал: stop:СЕКУНДЫ или snooze:СЕКУНДЫ"""
+    action, _, seconds = text.partition(':')
+    if action not in ('stop', 'snooze'):
+        raise argparse.ArgumentTypeError("ожидается stop:СЕКУНДЫ или snooze:СЕКУНДЫ")
+    return action, float(seconds or 0)
+
+
+def parse_jump(text):
+    """Разбирает скачок часов: ИГРОВЫХ_ЧАСОВ_ОТ_СТАРТА:СЕКУНДЫ"""
+    at, _, seconds = text.partition(':')
+    return float(at), float(seconds)
+
+
+def parse_args(argv=None):
+    """Разбирает параметры командной строки"""
+    parser = argparse.ArgumentParser(description="Симуляция игровых часов на виртуальном времени")
+    parser.add_argument('--alarms', default=None,
+                        help="набор будильников (.json или .csv; по умолчанию alarms.json в --data-dir)")
+    parser.add_argument('--data-dir', default=os.path.abspath("."))
+    parser.add_argument('--start', type=datetime.fromisoformat, default=None,
+                        help="реальное время начала (ISO 8601, по умолчанию сейчас)")
+    parser.add_argument('--hours', type=float, default=24.0, help="сколько игровых часов прогнать")
+    parser.add_argument('--max-firing', type=int, default=None)
+    parser.add_argument('--respond', type=parse_respond, default=None,
+                        help="реакция на сигнал: stop:СЕКУНДЫ или snooze:СЕКУНДЫ (по умолчанию звонит)")
+    parser.add_argument('--jump', type=parse_jump, action='append', default=[],
+                        help="скачок системных часов: ИГРОВЫХ_ЧАСОВ_ОТ_СТАРТА:СЕКУНДЫ (можно несколько)")
+    parser.add_argument('--tick-ms', type=int, default=None)
+    parser.add_argument('--ticks', action='store_true', help="выводить событие на каждую игровую минуту")
+    parser.add_argument('--summary-only', action='store_true', help="вывести только сводку")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    path = args.alarms or os.path.join(args.data_dir, "alarms.json")
+    alarms, report = merge_alarms([], read_preset(path) if os.path.exists(path) else [])
+    for error in report['errors']:
+        print(f"Ошибка будильника: {error}", file=sys.stderr)
+
+    simulation = Simulation(alarms, args.start or datetime.now(), max_firing=args.max_firing,
+                            tick_resolution_ms=args.tick_ms, respond=args.respond, ticks=args.ticks)
+    for at_hours, seconds in args.jump:
+        simulation.add_jump(at_hours * simulation.clock.profile.hour_seconds, seconds)
+    result = simulation.run(args.hours)
+
+    if not args.summary_only:
+        for event in result['events']:
+            print(json.dumps(event, ensure_ascii=False))
+    print(json.dumps(dict(event='summary', **result['summary']), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from alarms import ensure_alarm_ids
+
+# Доступные хранилища будильников
+STORE_BACKENDS = ('json', 'sqlite')
+
+
+class WriteBehindStore:
+    """Основа хранилищ с отложенной записью в фоновом потоке.
+
+    Частые изменения собираются в одну запись после короткой паузы.
+    Наследники реализуют load() и _store(alarms).
+    """
+
+    def __init__(self, delay=0.5):
+        self.delay = delay  # пауза без изменений перед записью (с)
+
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()  # запись на диск вне блокировки очереди
+        self.pending = None      # снимок будильников, ожидающий записи
+        self.last_change = 0.0
+        self.thread = None
+        self.metrics = {
+            'saves': 0,
+            'writes': 0,
+            'writes_avoided': 0,
+            'errors': 0,
+            'last_write_ms': 0.0,
+            'max_write_ms': 0.0,
+            'total_write_ms': 0.0,
+        }
+
+        # Несохраненные изменения записываются при выходе
+        atexit.register(self.flush)
+
+    def save(self, alarms):
+        """Ставит будильники в очередь на запись (не блокирует вызывающий поток)"""
+        snapshot = [dict(alarm) for alarm in alarms]
+        with self.condition:
+            self.metrics['saves'] += 1
+            if self.pending is not None:
+                self.metrics['writes_avoided'] += 1
+            self.pending = snapshot
+            self.last_change = time.monotonic()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._writer, name="alarms-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def flush(self):
+        """Немедленно записывает ожидающие изменения в текущем потоке"""
+        with self.write_lock:
+            with self.condition:
+                snapshot, self.pending = self.pending, None
+            if snapshot is not None:
+                self._write(snapshot)
+
+    def _writer(self):
+        """Фоновый поток: ждет паузы в изменениях и записывает последний снимок"""
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                # Откладываем запись, пока изменения продолжают поступать
+                remaining = self.last_change + self.delay - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+            self.flush()
+
+    def _write(self, alarms):
+        """Записывает снимок и обновляет метрики"""
+        start = time.perf_counter()
+        try:
+            self._store(alarms)
+        except (OSError, sqlite3.Error) as e:
+            self.metrics['errors'] += 1
+            print(f"Ошибка сохранения настроек: {e}")
+            return
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics['writes'] += 1
+        self.metrics['last_write_ms'] = elapsed
+        self.metrics['max_write_ms'] = max(self.metrics['max_write_ms'], elapsed)
+        self.metrics['total_write_ms'] += elapsed
+
+    def get_metrics(self):
+        """Возвращает метрики записи"""
+        with self.condition:
+            metrics = dict(self.metrics)
+        writes = metrics['writes']
+        metrics['avg_write_ms'] = metrics['total_write_ms'] / writes if writes else 0.0
+        return metrics
+
+
+class JsonAlarmStore(WriteBehindStore):
+    """Хранилище будильников в alarms.json (используется по умолчанию).
+
+    Запись атомарная: временный файл, fsync и переименование, а предыдущая
+    удачная версия сохраняется в .bak.
+    """
+
+    def __init__(self, path, delay=0.5):
+        super().__init__(delay)
+        self.path = path
+        self.backup_path = path + '.bak'
+        self.main_is_good = False  # основной файл целый - его можно делать копией
+
+    def load(self):
+        """Загружает будильники; возвращает None, если файлов еще нет.
+
+        Поврежденный основной файл заменяется последней удачной копией.
+        """
+        error = None
+        for path in (self.path, self.backup_path):
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    alarms = json.load(f).get('alarms', [])
+                self.main_is_good = path == self.path
+                return alarms
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Ошибка чтения {path}: {e}")
+                error = e
+        if error is not None:
+            raise error
+        return None
+
+    def _store(self, alarms):
+        """Атомарно записывает файл: временный файл, fsync, переименование"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'alarms': alarms}, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        # Текущий файл целый - он становится резервной копией
+        if self.main_is_good and os.path.exists(self.path):
+            os.replace(self.path, self.backup_path)
+        os.replace(tmp_path, self.path)
+        self.main_is_good = True
+
+
+class SqliteAlarmStore(WriteBehindStore):
+    """Хранилище будильников во встроенной базе SQLite.
+
+    Будильники разных профилей лежат в одной таблице, id уникален в пределах
+    профиля. При сохранении в базу попадают только изменившиеся строки;
+    выборку по игровой минуте (с учетом правил) делает AlarmIndex в памяти.
+    Существующий alarms.json импортируется один раз при первом запуске.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS alarms (
+            id TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            enabled INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (profile, id)
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path, json_path=None, profile='default', delay=0.5):
+        super().__init__(delay)
+        self.path = path
+        self.json_path = json_path
+        self.profile = profile
+        self.known = {}  # id -> строка профиля, записанная в базу последней
+
+        # Соединение используется из нескольких потоков под write_lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(self.SCHEMA)
+
+    def _row(self, position, alarm):
+        """Преобразует будильник в строку таблицы"""
+        return (alarm['id'], self.profile, position,
+                1 if alarm.get('enabled') else 0,
+                json.dumps(alarm, ensure_ascii=False, sort_keys=True))
+
+    def import_json_once(self):
+        """Однократно импортирует будильники профиля из его alarms.json"""
+        # Отметка об импорте своя у каждого профиля
+        key = f"json_imported:{self.profile}"
+        with self.connection:
+            imported = self.connection.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone()
+            if imported or not self.json_path or not os.path.exists(self.json_path):
+                return 0
+            with open(self.json_path, 'r', encoding='utf-8') as f:
+                alarms = json.load(f).get('alarms', [])
+            ensure_alarm_ids(alarms)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO alarms VALUES (?, ?, ?, ?, ?)",
+                [self._row(position, alarm) for position, alarm in enumerate(alarms)]
+            )
+            self.connection.execute(
+                "INSERT INTO meta VALUES (?, ?)", (key, self.json_path))
+            return len(alarms)
+
+    def load(self):
+        """Загружает будильники профиля; возвращает None, если база пуста"""
+        with self.write_lock:
+            self.import_json_once()
+            rows = self.connection.execute(
+                "SELECT id, position, enabled, data FROM alarms "
+                "WHERE profile = ? ORDER BY position", (self.profile,)
+            ).fetchall()
+            if not rows and self.connection.execute("SELECT COUNT(*) FROM alarms").fetchone()[0] == 0:
+                return None
+
+            alarms = []
+            self.known = {}
+            for alarm_id, position, enabled, data in rows:
+                alarms.append(json.loads(data))
+                self.known[alarm_id] = (alarm_id, self.profile, position, enabled, data)
+            return alarms
+
+    def _store(self, alarms):
+        """Записывает только добавленные, измененные и удаленные строки"""
+        rows = {}
+        for position, alarm in enumerate(alarms):
+            row = self._row(position, alarm)
+            rows[row[0]] = row
+
+        changed = [row for alarm_id, row in rows.items() if self.known.get(alarm_id) != row]
+        removed = [(self.profile, alarm_id) for alarm_id in self.known if alarm_id not in rows]
+        if not changed and not removed:
+            return
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO alarms VALUES (?, ?, ?, ?, ?)", changed)
+            self.connection.executemany("DELETE FROM alarms WHERE profile = ? AND id = ?", removed)
+        self.known = rows
+
+
+def open_store(backend, get_data_path, profile='default'):
+    """Создает хранилище будильников: 'json' (по умолчанию) или 'sqlite'"""
+    # Будильники дополнительных профилей лежат в alarms_<профиль>.json
+    json_path = get_data_path("alarms.json" if profile == 'default' else f"alarms_{profile}.json")
+    if backend == 'sqlite':
+        return SqliteAlarmStore(get_data_path("alarms.db"), json_path=json_path, profile=profile)
+    if backend != 'json':
+        raise ValueError(f"Неизвестное хранилище будильников: {backend}")
+    return JsonAlarmStore(json_path)
@@ -0,0 +1,60 @@
+"""Проверки индекса будильников: python -m unittest discover tests"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarms import AlarmIndex, AlarmRecord, CATCH_UP_MINUTES
+
+
+def names(alarms):
+    return sorted(alarm.name for alarm in alarms)
+
+
+class AlarmIndexAdvanceTest(unittest.TestCase):
+    """Сдвиг курсора индекса: пропущенные минуты и шаги назад"""
+
+    def setUp(self):
+        self.alarms = [AlarmRecord('a', 360, "06:00", True), AlarmRecord('b', 361, "06:01", True),
+                       AlarmRecord('c', 362, "06:02", True), AlarmRecord('d', 0, "00:00", True),
+                       AlarmRecord('r', None, "Правило", True, rule='06:00-06:10/1')]
+        self.index = AlarmIndex(self.alarms)
+
+    def test_each_minute_fires_once(self):
+        fired = []
+        for minute in range(1440 * 2):
+            fired += [alarm.name for alarm in self.index.advance(minute % 1440)]
+        self.assertEqual(fired.count("06:01"), 2)
+        self.assertEqual(fired.count("00:00"), 2)
+
+    def test_skipped_minutes_are_caught_up(self):
+        self.index.advance(359)
+        self.assertEqual(names(self.index.advance(362)), ["06:00", "06:01", "06:02", "Правило"])
+        self.assertEqual(self.index.cursor, 362)
+
+    def test_catch_up_is_bounded(self):
+        self.index.advance(300)
+        self.assertEqual(names(self.index.advance(362 + CATCH_UP_MINUTES - 2)), ["06:01", "06:02", "Правило"])
+
+    def test_small_backward_step_is_resync(self):
+        self.index.advance(361)
+        cursor = self.index.cursor
+        self.assertEqual(list(self.index.advance(359)), [])
+        self.assertEqual(list(self.index.advance(360)), [])
+        self.assertEqual(list(self.index.advance(361)), [])
+        self.assertEqual(self.index.cursor, cursor)
+        self.assertEqual(names(self.index.advance(362)), ["06:02", "Правило"])
+
+    def test_midnight_wrap_is_a_new_day(self):
+        self.index.advance(1439)
+        self.assertEqual(names(self.index.advance(0)), ["00:00"])
+        self.assertEqual(self.index.cursor, 1440)
+
+    def test_first_call_returns_only_current_minute(self):
+        self.assertEqual(names(self.index.advance(361)), ["06:01", "Правило"])
+        self.assertEqual(self.index.next_alarm()[0], 362)
+
+
+if __name__ == "__main__":
+    unittest.main()
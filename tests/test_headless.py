@@ -0,0 +1,50 @@
+"""Проверки часов без окна: python -m unittest discover tests"""
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_time
+from headless import HeadlessClock
+from profiles import load_profiles, PROFILES_FILENAME
+from simulation import SimulatedClock
+
+
+class HeadlessTimeTest(unittest.TestCase):
+    """Игровое время без окна совпадает с оконными часами"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_profiles(self, entry):
+        path = os.path.join(self.tmp.name, PROFILES_FILENAME)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'profiles': [entry]}, f)
+        return path
+
+    def test_matches_gui_clock_across_real_hour(self):
+        for entry in ({'name': 'default', 'offset_minutes': 45, 'ratio': 1.25},
+                      {'name': 'default', 'offset_minutes': 600, 'ratio': 1.7}):
+            path = self.write_profiles(entry)
+            start = datetime(2024, 5, 1, 10, 50)
+            headless = HeadlessClock(data_dir=self.tmp.name, out=io.StringIO(),
+                                     time_source=game_time.SimulatedTimeSource(start))
+            self.addCleanup(headless.history.close)
+            gui = SimulatedClock([], start, profiles=load_profiles(path))
+
+            # Двадцать реальных минут, через смену реального часа
+            while headless.time_source.elapsed < 1200:
+                delay = headless.tick()
+                self.assertEqual(headless.last_game_time, gui.get_game_clock()[1:], f"{entry}")
+                headless.time_source.advance_to(headless.time_source.elapsed + delay + 0.001)
+                gui.time_source.advance_to(headless.time_source.elapsed)
+
+
+if __name__ == "__main__":
+    unittest.main()
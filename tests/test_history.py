@@ -0,0 +1,52 @@
+"""Проверки истории срабатываний и тиков: python -m unittest discover tests"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import RingLog, TICK_RECORD
+
+
+def times(records):
+    return [record[0] for record in records]
+
+
+class RingLogRangeTest(unittest.TestCase):
+    """Выборка журнала по реальному времени"""
+
+    def make_log(self, real_times, capacity=16, path=None):
+        log = RingLog(TICK_RECORD, capacity, path)
+        self.addCleanup(log.close)
+        for real_time in real_times:
+            log.append(real_time, 0, 0.0, 0.0)
+        return log
+
+    def test_range_in_order(self):
+        log = self.make_log([100, 101, 102, 103])
+        self.assertEqual(times(log.range(101, 103)), [101, 102])
+        self.assertEqual(times(log.range()), [100, 101, 102, 103])
+
+    def test_range_after_backward_clock_jump(self):
+        # Системные часы переведены назад после 102
+        log = self.make_log([100, 101, 102, 50, 51, 103])
+        self.assertEqual(times(log.range(100, 104)), [100, 101, 102, 103])
+        self.assertEqual(times(log.range(50, 52)), [50, 51])
+        self.assertEqual(times(log.range(until=101)), [100, 50, 51])
+
+    def test_backward_jump_survives_reopen_and_eviction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ticks.bin')
+            self.make_log([100, 101, 50, 51], capacity=4, path=path).close()
+            log = self.make_log([], capacity=4, path=path)
+            self.assertEqual(times(log.range(50, 52)), [50, 51])
+            # Записи до скачка вытеснены - порядок снова не нарушен
+            log.append(52, 0, 0.0, 0.0)
+            log.append(53, 0, 0.0, 0.0)
+            self.assertEqual(times(log.range(51, 53)), [51, 52])
+            log.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
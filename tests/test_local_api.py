@@ -0,0 +1,54 @@
+"""Проверки локального API: python -m unittest discover tests"""
+import http.client
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_api import LocalApi
+
+
+class LocalApiRequestCheckTest(unittest.TestCase):
+    """Запросы со сторонних страниц и подмененных имен отклоняются"""
+
+    def setUp(self):
+        self.batches = []
+        self.api = LocalApi(0, lambda operations: self.batches.append(operations) or []).start()
+        self.addCleanup(self.api.stop)
+
+    def request(self, method, path, body=None, headers=None):
+        connection = http.client.HTTPConnection('127.0.0.1', self.api.port, timeout=5)
+        self.addCleanup(connection.close)
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b'null')
+
+    def post_batch(self, headers):
+        body = json.dumps({'operations': [{'op': 'delete', 'id': 'x'}]})
+        return self.request('POST', '/alarms/batch', body, headers)[0]
+
+    def test_local_requests_are_accepted(self):
+        self.assertEqual(self.request('GET', '/alarms')[0], 200)
+        self.assertEqual(self.request('GET', '/alarms', headers={'Host': f"localhost:{self.api.port}"})[0], 200)
+        self.assertEqual(self.post_batch({'Content-Type': 'application/json'}), 200)
+        self.assertEqual(len(self.batches), 1)
+
+    def test_foreign_host_is_rejected(self):
+        status, _ = self.request('GET', '/alarms', headers={'Host': f"attacker.example:{self.api.port}"})
+        self.assertEqual(status, 403)
+
+    def test_browser_origin_is_rejected(self):
+        self.assertEqual(self.request('GET', '/time', headers={'Origin': 'https://example.com'})[0], 403)
+        self.assertEqual(self.post_batch({'Content-Type': 'application/json', 'Origin': 'null'}), 403)
+        self.assertEqual(self.batches, [])
+
+    def test_post_requires_json_content_type(self):
+        self.assertEqual(self.post_batch({'Content-Type': 'text/plain'}), 415)
+        self.assertEqual(self.post_batch({}), 415)
+        self.assertEqual(self.batches, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""Проверки импорта наборов будильников: python -m unittest discover tests"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarms import AlarmRecord
+from presets import merge_alarms, read_entries
+
+
+class MergeAlarmsTest(unittest.TestCase):
+    """Объединение набора с текущими будильниками"""
+
+    def setUp(self):
+        self.current = [AlarmRecord('a1', 390, "Утро", True), AlarmRecord('a2', 240, "Клев", True)]
+
+    def test_replace_with_invalid_file_keeps_alarms(self):
+        entries = read_entries("time,name\n25:99,Плохо\nabc,Тоже\n", 'csv')
+        alarms, report = merge_alarms(self.current, entries, 'replace')
+        self.assertTrue(report['aborted'])
+        self.assertEqual([alarm.id for alarm in alarms], ['a1', 'a2'])
+
+    def test_replace_with_partly_invalid_file_keeps_alarms(self):
+        entries = read_entries("time,name\n05:00,Рассвет\n25:99,Плохо\n", 'csv')
+        alarms, report = merge_alarms(self.current, entries, 'replace')
+        self.assertTrue(report['aborted'])
+        self.assertEqual(report['added'], 1)
+        self.assertEqual([alarm.id for alarm in alarms], ['a1', 'a2'])
+
+    def test_replace_with_valid_file(self):
+        entries = read_entries("time,name\n05:00,Рассвет\n", 'csv')
+        alarms, report = merge_alarms(self.current, entries, 'replace')
+        self.assertFalse(report['aborted'])
+        self.assertEqual([alarm.name for alarm in alarms], ["Рассвет"])
+
+    def test_merge_skips_invalid_entries(self):
+        entries = read_entries("time,name\n05:00,Рассвет\n25:99,Плохо\n06:30,Утро\n", 'csv')
+        alarms, report = merge_alarms(self.current, entries)
+        self.assertFalse(report['aborted'])
+        self.assertEqual((report['added'], report['duplicates'], len(report['errors'])), (1, 1, 1))
+        self.assertEqual(len(alarms), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
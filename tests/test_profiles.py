@@ -0,0 +1,54 @@
+"""Проверки профилей часов: python -m unittest discover tests"""
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_time
+from profiles import ClockProfile, ProfileScheduler
+
+
+def game_minutes(profile, real_time):
+    """Игровая минута суток профиля"""
+    game_hour, game_minute = profile.game_time(real_time, game_time.sync_base_for(real_time))
+    return game_hour * 60 + game_minute
+
+
+class ProfileTimeTest(unittest.TestCase):
+    """Игровое время профилей на смене реального часа"""
+
+    def test_default_ratio_restarts_at_real_hour(self):
+        profile = ClockProfile('default')
+        self.assertEqual(game_minutes(profile, datetime(2024, 5, 1, 11, 0, 0)), 0)
+        self.assertEqual(game_minutes(profile, datetime(2024, 5, 1, 10, 59, 57, 500000)), 1439)
+
+    def test_custom_ratio_is_continuous_across_real_hour(self):
+        for ratio in (2.0, 3.0, 1.7):
+            profile = ClockProfile('fast', ratio=ratio)
+            minute_seconds = profile.hour_seconds / 60
+            start = datetime(2024, 5, 1, 10, 55)
+            previous = game_minutes(profile, start)
+            # Каждые полминуты игрового времени в течение 10 реальных минут
+            for step in range(1, int(600 / (minute_seconds / 2))):
+                current = game_minutes(profile, start + timedelta(seconds=step * minute_seconds / 2))
+                self.assertIn((current - previous) % game_time.MINUTES_PER_DAY, (0, 1),
+                              f"ratio {ratio}, шаг {step}")
+                previous = current
+
+    def test_scheduler_visits_every_minute_of_custom_ratio(self):
+        profile = ClockProfile('fast', ratio=2.0)
+        scheduler = ProfileScheduler([profile])
+        now = datetime(2024, 5, 1, 10, 50)
+        seen = []
+        while now < datetime(2024, 5, 1, 11, 10):
+            for _, game_hour, game_minute in scheduler.due(now, game_time.sync_base_for(now)):
+                seen.append(game_hour * 60 + game_minute)
+            now += timedelta(seconds=scheduler.seconds_until_next(now, game_time.sync_base_for(now)) + 0.001)
+        steps = {(b - a) % game_time.MINUTES_PER_DAY for a, b in zip(seen, seen[1:])}
+        self.assertEqual(steps, {1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Проверки симуляции на виртуальном времени: python -m unittest discover tests"""
+import os
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarms import AlarmRecord
+from profiles import ClockProfile
+from simulation import Simulation
+
+
+def events(result, kind):
+    return [event for event in result['events'] if event['event'] == kind]
+
+
+class SimulationTest(unittest.TestCase):
+    """Прогон часов GameClock без окна"""
+
+    def make_alarms(self):
+        return [AlarmRecord('morning', 390, "Утро", True), AlarmRecord('off', 720, "Выкл", False),
+                AlarmRecord('bite', None, "Клев", True, rule='04:00-05:00/20')]
+
+    def test_game_day(self):
+        result = Simulation(self.make_alarms(), datetime(2024, 5, 1, 0, 0), respond=('stop', 5)).run(24)
+        fires = [(event['game_time'], event['id']) for event in events(result, 'fire')]
+        self.assertEqual(fires, [('04:00', 'bite'), ('04:20', 'bite'), ('04:40', 'bite'),
+                                 ('05:00', 'bite'), ('06:30', 'morning')])
+        self.assertEqual(len(events(result, 'stop')), 5)
+        self.assertEqual([event['event'] for event in result['events']
+                          if event['event'] in ('day', 'night')], ['night', 'day'])
+        self.assertEqual(result['summary']['minute_ticks'], 1440)
+        self.assertEqual(result['summary']['firing_at_end'], [])
+
+    def test_queue_with_max_firing(self):
+        alarms = [AlarmRecord('a', 60, "A", True), AlarmRecord('b', 60, "B", True)]
+        result = Simulation(alarms, datetime(2024, 5, 1, 0, 0), max_firing=1, respond=('stop', 5)).run(2)
+        self.assertEqual([event['id'] for event in events(result, 'queue')], ['b'])
+        self.assertEqual([event['id'] for event in events(result, 'fire')], ['a', 'b'])
+
+    def test_forward_clock_jump_does_not_skip_alarms(self):
+        alarms = [AlarmRecord('a', 361, "06:01", True)]
+        simulation = Simulation(alarms, datetime(2024, 5, 1, 0, 0))
+        # Скачок на 4 с (почти две игровые минуты) сразу после 06:00
+        simulation.add_jump(6 * simulation.clock.profile.hour_seconds + 0.5, 4)
+        result = simulation.run(7)
+        self.assertEqual([event['id'] for event in events(result, 'fire')], ['a'])
+
+    def test_snooze_of_extra_profile_alarm_fires_again(self):
+        eu = ClockProfile('eu', offset_minutes=180)
+        eu.set_alarms([AlarmRecord('eu1', 210, "Клев", True)])
+        simulation = Simulation([AlarmRecord('a', 10, "A", True)], datetime(2024, 5, 1, 0, 0),
+                                profiles=[ClockProfile('default'), eu], respond=('snooze', 6))
+        result = simulation.run(1)
+        fires = [(event['game_time'], event['id']) for event in events(result, 'fire')]
+        # Повтор через 10 игровых минут профиля после откладывания (6 с = 2,4 игровой минуты)
+        self.assertEqual([fire for fire in fires if fire[1] == 'eu1'],
+                         [('03:30', 'eu1'), ('03:42', 'eu1'), ('03:54', 'eu1')])
+        self.assertEqual([fire for fire in fires if fire[1] == 'a'],
+                         [('00:10', 'a'), ('00:22', 'a'), ('00:34', 'a'), ('00:46', 'a'), ('00:58', 'a')])
+
+
+if __name__ == "__main__":
+    unittest.main()
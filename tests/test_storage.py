@@ -0,0 +1,70 @@
+"""Проверки хранилищ будильников: python -m unittest discover tests"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import open_store
+
+
+class SqliteJsonImportTest(unittest.TestCase):
+    """Однократный импорт alarms.json в базу SQLite"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def data_path(self, filename):
+        return os.path.join(self.tmp.name, filename)
+
+    def write_json(self, filename, alarms):
+        with open(self.data_path(filename), 'w', encoding='utf-8') as f:
+            json.dump({'alarms': alarms}, f, ensure_ascii=False)
+
+    def open_sqlite(self, profile='default'):
+        store = open_store('sqlite', self.data_path, profile=profile)
+        self.addCleanup(store.connection.close)
+        return store
+
+    def test_each_profile_imports_its_own_json(self):
+        self.write_json("alarms.json", [{'id': 'a1', 'time': '06:30', 'name': "Утро", 'enabled': True}])
+        self.write_json("alarms_eu.json", [{'id': 'e1', 'time': '04:00', 'name': "Клев", 'enabled': True},
+                                           {'id': 'e2', 'time': '21:00', 'name': "Ночь", 'enabled': False}])
+
+        default = self.open_sqlite().load()
+        eu = self.open_sqlite('eu').load()
+
+        self.assertEqual([alarm['id'] for alarm in default], ['a1'])
+        self.assertEqual([alarm['id'] for alarm in eu], ['e1', 'e2'])
+
+    def test_import_happens_once_per_profile(self):
+        self.write_json("alarms_eu.json", [{'id': 'e1', 'time': '04:00', 'name': "Клев", 'enabled': True}])
+        store = self.open_sqlite('eu')
+        store.load()
+        store.save([{'id': 'e9', 'time': '05:00', 'name': "Рассвет", 'enabled': True}])
+        store.flush()
+
+        self.assertEqual([alarm['id'] for alarm in self.open_sqlite('eu').load()], ['e9'])
+
+    def test_same_id_in_two_profiles(self):
+        # Пресет, импортированный в два профиля, дает одинаковые id
+        alarm = {'id': 'p1', 'time': '04:00', 'name': "Клев", 'enabled': True}
+        default, eu = self.open_sqlite(), self.open_sqlite('eu')
+        default.load()
+        eu.load()
+        default.save([alarm])
+        default.flush()
+        eu.save([dict(alarm, name="Клев EU")])
+        eu.flush()
+        eu.save([])
+        eu.flush()
+
+        self.assertEqual([alarm['name'] for alarm in self.open_sqlite().load()], ["Клев"])
+        self.assertEqual(self.open_sqlite('eu').load(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()